@@ -7,13 +7,22 @@ import plotly.express as px
 import numpy as np
 import json
 import re
-from urllib.parse import quote_plus
+import argparse
+from urllib.parse import quote_plus, urlparse
 from urllib.parse import unquote_plus  # tweak: décoder + gère les '+'
 
+from rapport_crawl import RapportCrawl
+from cache_rejeu import StockageCompresse
+from selecteurs_hotel import extraire_hotel
+from pipeline_sqlite import PipelineSQLite
+from recrawl_incremental import RequetesConditionnelles
+
 # Liste des villes
 df = pd.read_csv("classement_villes_pour_hotels.csv")
 list_top_cities = df['Ville'].astype(str).tolist()
 
+URL_BOOKING = "https://www.booking.com"
+
 
 class Spider_booking(scrapy.Spider):
     name = 'booking_spider'
@@ -24,10 +33,16 @@ class Spider_booking(scrapy.Spider):
     "COOKIES_ENABLED": True,   # garder les cookies de consentement
     }
     
-    start_urls = [
-        f"https://www.booking.com/searchresults.fr.html?ss={quote_plus(city)}&rows=25&order=popularity"
-        for city in list_top_cities
-    ]
+    def __init__(self, url_base=URL_BOOKING, villes=None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        villes = list_top_cities if villes is None else villes
+        self.start_urls = [
+            f"{url_base}/searchresults.fr.html?ss={quote_plus(city)}&rows=25&order=popularity"
+            for city in villes
+        ]
+        if url_base != URL_BOOKING:
+            # Site local (fixture de benchmark)
+            self.allowed_domains = [urlparse(url_base).hostname]
     
     def parse(self, response):       
         hotels_names = response.xpath("//h3/a/div[1]/text()").getall()
@@ -50,7 +65,8 @@ class Spider_booking(scrapy.Spider):
                 callback=self.parse_hotel,
                 meta={
                     'hotel_name': hotel_name.strip() if hotel_name else None,
-                    'city_name': city_name
+                    'city_name': city_name,
+                    'fiche_hotel': True,   # requête conditionnelle en mode incrémental
                 }
             )
 
@@ -58,69 +74,143 @@ class Spider_booking(scrapy.Spider):
     def parse_hotel(self, response):
         city_name = response.meta['city_name']
 
-        # SCORE : essayer plusieurs sélecteurs en cascade
-        hotel_score_text = (
-        response.xpath('//div[@data-testid="review-score-right-component"]/div[@aria-hidden="true"]/text()').get()
-        or response.css('[data-testid="review-score"]::text').get()
-        or response.css('[data-testid="external-review-score"]::text').get()
-        or response.css('[data-testid="review-score-subcomponent"]::text').get()
-        )
-        # Nettoyage si trouvé, sinon "N/A"
-        hotel_score_text = hotel_score_text.strip() if hotel_score_text else 'N/A'
-
-        # DESCRIPTION : essayer plusieurs sélecteurs en cascade
-        description_text = (
-            " ".join(d.strip() for d in response.css('[data-testid="property-description"]::text').getall() if d.strip())
-            or " ".join(d.strip() for d in response.css('#property_description_content p::text').getall() if d.strip())
-            or response.xpath("//meta[@name='description']/@content").get()
-        )
-        # Nettoyage si trouvé, sinon "N/A"
-        description_text = description_text.strip() if description_text else 'N/A'
-
-        # LATITUDE et LONGITUDE : fallbacks en cascade
-        latlng = (
-            response.css('[data-atlas-latlng]::attr(data-atlas-latlng)').get()
-            or response.css('meta[property="booking_com:location:latitude"]::attr(content)').get() + "," +
-            response.css('meta[property="booking_com:location:longitude"]::attr(content)').get()
-            or response.css('[data-lat]::attr(data-lat)').get() + "," +
-            response.css('[data-lon]::attr(data-lon)').get()
-        )
-
-        latitude, longitude = (None, None)
-        if latlng and "," in latlng:
-            parts = latlng.split(",", 1)
-            latitude = parts[0].strip() if parts[0] else None
-            longitude = parts[1].strip() if len(parts) > 1 else None
-
+        # SCORE, DESCRIPTION, LATITUDE et LONGITUDE : mêmes cascades de sélecteurs,
+        # compilées une fois et évaluées en un seul parcours du DOM (selecteurs_hotel.py)
+        champs = extraire_hotel(response.selector.root)
+
+        # Mode incrémental : fiche inchangée depuis le dernier passage -> rien à émettre
+        changement = None
+        etat_fiches = getattr(self, 'etat_fiches', None)
+        if etat_fiches is not None:
+            changement = etat_fiches.comparer(response.url, champs, response.headers)
+            if changement is None:
+                self.crawler.stats.inc_value('incremental/inchangees')
+                return
+            self.crawler.stats.inc_value(f'incremental/{changement}')
      
-        yield {
+        item = {
             'City': city_name,
             'Hotel_name': response.meta['hotel_name'],
             'Hotel_url': response.url,
-            'Hotel_score': hotel_score_text,
-            'Hotel_description': description_text,
-            'Latitude': latitude,
-            'Longitude': longitude,
+            'Hotel_score': champs['score'],                       # float, None si absent
+            'Hotel_description': champs['description'] or 'N/A',
+            'Latitude': champs['latitude'],                       # float, None si absent
+            'Longitude': champs['longitude'],
         }
+        if changement:
+            item['Changement'] = changement   # 'nouveau' ou 'modifie'
+        yield item
 
 filename = "Destinations_infos.json" # Fichier sauvegarde
 
-if filename in os.listdir():
-    os.remove(filename) # Si jamais le nom existe deja
-
-process = CrawlerProcess(settings={
+SETTINGS = {
     'USER_AGENT': "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127.0.0.1 Safari/537.36",
-    'LOG_LEVEL': logging.DEBUG,
-    'AUTOTHROTTLE_ENABLED': True,
-    'DOWNLOAD_DELAY': 1.0,
     'COOKIES_ENABLED': False,   # <- tu peux laisser False ici, on force True seulement dans la classe (Étape 1)
     'DEFAULT_REQUEST_HEADERS': {
         'Accept-Language': 'fr-FR,fr;q=0.9',
         'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
         'Referer': 'https://www.booking.com/',
     },
-    'FEEDS': {"Destinations_infos.json": {"format": "json"}}
-})
-
-process.crawl(Spider_booking)
-process.start()
\ No newline at end of file
+    # Pages/s, latence, octets : affichés en fin de crawl
+    'EXTENSIONS': {RapportCrawl: 500},
+    # Hôtels écrits par lots dans SQLite pendant le crawl (upsert sur l'URL de la fiche)
+    'ITEM_PIPELINES': {PipelineSQLite: 300},
+    'SQLITE_HOTELS_CHEMIN': 'Destinations_infos.sqlite',
+    'SQLITE_TAILLE_LOT': 200,
+    # Requêtes conditionnelles (ETag / Last-Modified), actives avec INCREMENTAL_ACTIF
+    # (état des fiches dans le fichier SQLite des hôtels, table etat_fiches)
+    'DOWNLOADER_MIDDLEWARES': {RequetesConditionnelles: 950},
+}
+
+PROFILS = {
+    # Réglages d'origine : une requête à la fois derrière un délai global d'1 s
+    'prudent': {
+        'LOG_LEVEL': logging.DEBUG,
+        'AUTOTHROTTLE_ENABLED': True,
+        'DOWNLOAD_DELAY': 1.0,
+    },
+    # Plusieurs requêtes en parallèle, régulées par AutoThrottle sur la latence observée
+    'debit': {
+        'LOG_LEVEL': logging.INFO,
+        'CONCURRENT_REQUESTS': 32,
+        'CONCURRENT_REQUESTS_PER_DOMAIN': 8,
+        'DOWNLOAD_DELAY': 0,
+        'AUTOTHROTTLE_ENABLED': True,
+        'AUTOTHROTTLE_START_DELAY': 0.25,
+        'AUTOTHROTTLE_MAX_DELAY': 10.0,
+        'AUTOTHROTTLE_TARGET_CONCURRENCY': 4.0,
+        # Résolution DNS mise en cache, pool de threads élargi pour les résolutions
+        'DNSCACHE_ENABLED': True,
+        'DNSCACHE_SIZE': 10000,
+        'DNS_TIMEOUT': 10,
+        'REACTOR_THREADPOOL_MAXSIZE': 20,
+        # Cache HTTP : une relance ne retélécharge pas les pages déjà vues
+        'HTTPCACHE_ENABLED': True,
+        'HTTPCACHE_STORAGE': StockageCompresse,
+        'HTTPCACHE_DIR': 'httpcache',
+        'HTTPCACHE_EXPIRATION_SECS': 24 * 3600,
+        'HTTPCACHE_IGNORE_HTTP_CODES': [202, 403, 429, 500, 502, 503, 504],
+        'DOWNLOAD_TIMEOUT': 30,
+        'RETRY_TIMES': 2,
+    },
+    # Hors ligne : rejoue les pages enregistrées par le profil 'debit', sans expiration ;
+    # une page absente du cache est ignorée (aucune requête réseau)
+    'rejeu': {
+        'LOG_LEVEL': logging.INFO,
+        'CONCURRENT_REQUESTS': 64,
+        'CONCURRENT_REQUESTS_PER_DOMAIN': 64,
+        'DOWNLOAD_DELAY': 0,
+        'AUTOTHROTTLE_ENABLED': False,
+        'HTTPCACHE_ENABLED': True,
+        'HTTPCACHE_STORAGE': StockageCompresse,
+        'HTTPCACHE_DIR': 'httpcache',
+        'HTTPCACHE_EXPIRATION_SECS': 0,
+        'HTTPCACHE_IGNORE_MISSING': True,
+        'HTTPCACHE_IGNORE_HTTP_CODES': [202, 403, 429, 500, 502, 503, 504],
+    },
+}
+
+# Relance régulière : mêmes réglages que 'debit', sans cache HTTP (il masquerait
+# les changements) ; requêtes conditionnelles et sortie limitée aux fiches
+# nouvelles ou modifiées. AutoThrottle ne baisse jamais son délai sur une
+# réponse autre que 200 : avec des fiches presque toutes en 304, il resterait
+# au délai de départ. Désactivé ici ; la charge sur le site reste bornée par
+# CONCURRENT_REQUESTS_PER_DOMAIN (8 requêtes en vol, 304 sans corps)
+PROFILS['incremental'] = {
+    **PROFILS['debit'],
+    'HTTPCACHE_ENABLED': False,
+    'AUTOTHROTTLE_ENABLED': False,
+    'DOWNLOAD_DELAY': 0,
+    'INCREMENTAL_ACTIF': True,
+}
+
+# Le profil incrémental n'émet que le delta : il ne doit pas écraser l'export
+# complet relu par Kayak.ipynb (la liste complète reste dans le SQLite)
+SORTIES = {'incremental': "Destinations_infos_delta.json"}
+
+
+def lancer_crawl(profil='debit', url_base=URL_BOOKING, villes=None, reglages=None, sortie=None):
+    sortie = sortie or SORTIES.get(profil, filename)
+    if os.path.exists(sortie):
+        os.remove(sortie) # Si jamais le nom existe deja
+
+    settings = {**SETTINGS, **PROFILS[profil], 'FEEDS': {sortie: {"format": "json"}}, **(reglages or {})}
+    process = CrawlerProcess(settings=settings)
+    process.crawl(Spider_booking, url_base=url_base, villes=villes)
+    process.start()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scraping des hôtels Booking pour les villes du classement")
+    parser.add_argument("--profil", choices=list(PROFILS), default='debit')
+    parser.add_argument("--url-base", default=URL_BOOKING, help="autre site (fixture locale de benchmark)")
+    parser.add_argument("--villes", type=int, default=None, help="limiter aux n premières villes")
+    parser.add_argument("--sortie", default=None,
+                        help=f"fichier JSON (défaut : {filename}, {SORTIES['incremental']} en profil incremental)")
+    parser.add_argument("--set", action="append", default=[], metavar="REGLAGE=VALEUR",
+                        help="réglage Scrapy supplémentaire, ex. HTTPCACHE_ENABLED=False")
+    args = parser.parse_args()
+
+    reglages = dict(r.split("=", 1) for r in args.set)
+    villes = list_top_cities[:args.villes] if args.villes else None
+    lancer_crawl(args.profil, args.url_base, villes, reglages, args.sortie)
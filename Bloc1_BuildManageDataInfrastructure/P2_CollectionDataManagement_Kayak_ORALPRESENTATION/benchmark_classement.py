@@ -0,0 +1,113 @@
+"""
+Classement du notebook (quatre sort_values + trois merge + un tri final)
+contre classement.MoteurClassement (un rank, un produit, un argpartition).
+
+Parité sur moyenne_meteo_5jours.csv, puis temps sur des villes et hôtels
+synthétiques : construction du moteur (une fois), puis requête top k avec
+des poids différents à chaque appel, comme dans une interface interactive.
+
+Usage : python benchmark_classement.py [--villes 5000] [--hotels 200000] [--k 10]
+"""
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from classement import MoteurClassement, POIDS, lire_hotels
+
+
+def classement_notebook(df_resultats, poids):
+    """
+    Cellules 29 et 30 du notebook, sans les affichages. Tris stables : les ex
+    aequo gardent leur ordre d'apparition, comme rank(method="first") du moteur
+    (le tri par défaut du notebook les départage au hasard de l'algorithme).
+    """
+    df_sorted_temp = df_resultats.sort_values(by="Temperature Moy (°C)", ascending=False, kind="stable")
+    df_sorted_temp["rank_temp"] = range(1, len(df_sorted_temp) + 1)
+    df_sorted_humidity = df_resultats.sort_values(by="Humidite Moy (%)", ascending=True, kind="stable")
+    df_sorted_humidity["rank_humidity"] = range(1, len(df_sorted_humidity) + 1)
+    df_sorted_vent = df_resultats.sort_values(by="Vent Moy (m/s)", ascending=True, kind="stable")
+    df_sorted_vent["rank_vent"] = range(1, len(df_sorted_vent) + 1)
+    df_sorted_nuage = df_resultats.sort_values(by="Couverture nuageuse (%)", ascending=True, kind="stable")
+    df_sorted_nuage["rank_nuage"] = range(1, len(df_sorted_nuage) + 1)
+
+    df_sorted_all = df_sorted_temp[["Ville", "rank_temp"]].merge(df_sorted_humidity[["Ville", "rank_humidity"]], on="Ville") \
+        .merge(df_sorted_vent[["Ville", "rank_vent"]], on="Ville") \
+        .merge(df_sorted_nuage[["Ville", "rank_nuage"]], on="Ville")
+
+    df_sorted_all["score_final"] = (
+        poids["rank_temp"] * df_sorted_all["rank_temp"] +
+        poids["rank_humidity"] * df_sorted_all["rank_humidity"] +
+        poids["rank_vent"] * df_sorted_all["rank_vent"] +
+        poids["rank_nuage"] * df_sorted_all["rank_nuage"]
+    )
+    return df_sorted_all.sort_values(by="score_final", ascending=True, kind="stable")
+
+
+def verifier_parite(meteo, hotels, poids):
+    """Même score final pour chaque ville ; renvoie le nombre de villes comparées."""
+    attendu = classement_notebook(meteo, poids).set_index("Ville")["score_final"]
+    obtenu = MoteurClassement(meteo, hotels).classement(poids).set_index("Ville")["score_final"]
+    ecarts = (attendu - obtenu.reindex(attendu.index)).abs() > 1e-9
+    assert not ecarts.any(), f"{int(ecarts.sum())} score(s) différent(s) : {list(attendu.index[ecarts][:10])}"
+    return len(attendu)
+
+
+def donnees_synthetiques(n_villes, n_hotels, graine=0):
+    rng = np.random.default_rng(graine)
+    meteo = pd.DataFrame({
+        "Ville": [f"Ville {i}" for i in range(n_villes)],
+        "Temperature Moy (°C)": rng.normal(15, 5, n_villes).round(1),
+        "Humidite Moy (%)": rng.uniform(40, 95, n_villes).round(1),
+        "Vent Moy (m/s)": rng.gamma(2, 2, n_villes).round(1),
+        "Couverture nuageuse (%)": rng.uniform(0, 100, n_villes).round(1),
+    })
+    hotels = pd.DataFrame({
+        "City": meteo["Ville"].to_numpy()[rng.integers(0, n_villes, n_hotels)],
+        "Hotel_name": [f"Hôtel {i}" for i in range(n_hotels)],
+        "Hotel_score": rng.uniform(5, 10, n_hotels).round(1),
+    })
+    return meteo, hotels
+
+
+def poids_aleatoires(rng):
+    valeurs = rng.dirichlet(np.ones(len(POIDS)))
+    return dict(zip(POIDS, valeurs))
+
+
+def chronometrer(fonction, repetitions=1):
+    debut = time.perf_counter()
+    for _ in range(repetitions):
+        resultat = fonction()
+    return (time.perf_counter() - debut) / repetitions, resultat
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--villes", type=int, default=5000)
+    parser.add_argument("--hotels", type=int, default=200_000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--requetes", type=int, default=50)
+    args = parser.parse_args()
+
+    # Parité sur les données du projet (poids du notebook), puis sur les villes
+    # synthétiques, où les moyennes arrondies à 0,1 font beaucoup d'ex aequo
+    n = verifier_parite(pd.read_csv("moyenne_meteo_5jours.csv"), lire_hotels(), POIDS)
+    print(f"parité sur {n} villes : scores identiques")
+
+    meteo, hotels = donnees_synthetiques(args.villes, args.hotels)
+    rng = np.random.default_rng(1)
+    n = verifier_parite(meteo, hotels, {**poids_aleatoires(rng), "rank_hotel": 0.0})   # pas de note hôtel dans le notebook
+    print(f"parité sur {n} villes synthétiques : scores identiques")
+    print(f"{args.villes} villes, {args.hotels} hôtels, top {args.k}")
+
+    t_notebook, _ = chronometrer(lambda: classement_notebook(meteo, poids_aleatoires(rng)).head(args.k), args.requetes)
+    t_construction, moteur = chronometrer(lambda: MoteurClassement(meteo, hotels))
+    t_requete, top = chronometrer(lambda: moteur.top_destinations(args.k, poids_aleatoires(rng)), args.requetes)
+    t_hotels, _ = chronometrer(lambda: moteur.meilleurs_hotels(top["Ville"].iat[0], args.k), args.requetes)
+
+    print(f"notebook (tris + merges)     : {t_notebook * 1e3:8.2f} ms / requête")
+    print(f"moteur, construction (1 fois): {t_construction * 1e3:8.2f} ms")
+    print(f"moteur, top {args.k:<3} destinations  : {t_requete * 1e3:8.2f} ms / requête (x{t_notebook / t_requete:.0f})")
+    print(f"moteur, top {args.k:<3} hôtels/ville  : {t_hotels * 1e3:8.2f} ms / requête")
@@ -0,0 +1,164 @@
+"""
+Collecte coordonnées + météo contre les faux services de stub_api_meteo.py :
+boucles du notebook (un requests.get après l'autre, sans session) contre
+collecte_meteo.py, cache de géocodage vide puis rempli.
+
+Vérifie que les deux versions écrivent les mêmes CSV (moyennes à 0,05 près
+des moyennes exactes du notebook), que Nominatim ne reçoit jamais plus d'une
+requête par seconde, 503 relancés compris, et qu'une relance du script ne le
+sollicite plus. Mesure enfin l'agrégation seule (boucles Python du notebook
+contre table longue + groupby) sur des prévisions horaires de nombreuses villes.
+
+Usage : python benchmark_collecte.py [--latence 0.2] [--taux-erreur 0.05]
+"""
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+import requests
+
+from collecte_meteo import CITIES, MOYENNES, CollecteMeteo, table_previsions, agreger
+from stub_api_meteo import demarrer, intervalle_min_nominatim, reponse_forecast
+
+
+def moyennes_notebook(ville, lat, lon, data, arrondir=round):
+    """Moyennes de la cellule 16 : listes Python remplies prévision par prévision."""
+    temperatures, humidites, vents, couverture_nuageuse, conditions = [], [], [], [], []
+    for item in data["list"]:
+        temperatures.append(item["main"]["temp"])
+        humidites.append(item["main"]["humidity"])
+        vents.append(item["wind"]["speed"])
+        couverture_nuageuse.append(item["clouds"]["all"])
+        weather_main = item["weather"][0]["main"]
+        if weather_main == "Clear":
+            conditions.append(0.1)
+        elif weather_main == "Rain":
+            conditions.append(1)
+        elif weather_main == "Clouds":
+            conditions.append(0.6)
+        elif weather_main in ("Snow", "Mist"):
+            conditions.append(1)
+
+    condition_moyenne = sum(conditions) / len(conditions)
+    if condition_moyenne < 0.21:
+        condition_text = "Le temps est majoritairement beau sur 5 jours."
+    elif condition_moyenne < 0.45:
+        condition_text = "Le temps est généralement beau avec quelques nuages."
+    elif condition_moyenne < 0.8:
+        condition_text = "Le temps est partiellement nuageux."
+    else:
+        condition_text = "Le temps sera majoritairement pluvieux ou nuageux."
+
+    return {
+        "Ville": ville,
+        "Latitude": lat,
+        "Longitude": lon,
+        "Temperature Moy (°C)": arrondir(sum(temperatures) / len(temperatures), 1),
+        "Humidite Moy (%)": arrondir(sum(humidites) / len(humidites), 1),
+        "Vent Moy (m/s)": arrondir(sum(vents) / len(vents), 1),
+        "Couverture nuageuse (%)": arrondir(sum(couverture_nuageuse) / len(couverture_nuageuse), 1),
+        "Conditions Meteo": condition_text,
+    }
+
+
+def sans_arrondi(valeur, _):
+    return valeur
+
+
+def comparer(meteo, reponses, meteo_ref):
+    """
+    Villes, coordonnées et textes identiques au notebook ; chaque moyenne à 0,05
+    près de la moyenne exacte du notebook. Renvoie le nombre de moyennes qui
+    diffèrent d'un dixième de l'arrondi du notebook (demi-dixièmes, voir agreger).
+    """
+    exactes = pd.DataFrame([moyennes_notebook(*r, arrondir=sans_arrondi) for r in reponses])
+    moyennes = list(MOYENNES)
+    autres = [c for c in meteo_ref.columns if c not in moyennes]
+    pd.testing.assert_frame_equal(meteo[autres], meteo_ref[autres])
+    ecarts = (meteo[moyennes] - exactes[moyennes]).abs()
+    assert (ecarts <= 0.05 + 1e-9).all().all(), ecarts.max()
+    return int((meteo[moyennes] - meteo_ref[moyennes]).abs().gt(1e-9).sum().sum())
+
+
+def notebook(url_nominatim, url_owm, cle):
+    """Cellules 11 et 16 du notebook, sans les affichages ; renvoie aussi les réponses brutes."""
+    data = []
+    for city in CITIES:
+        params = {"q": f"{city}, France", "format": "json", "limit": 1}
+        results = requests.get(url_nominatim, params=params, headers={"User-Agent": "MyPythonApp/1.0"}).json()
+        if results:
+            data.append({"Ville": city, "Latitude": float(results[0]["lat"]), "Longitude": float(results[0]["lon"])})
+        else:
+            data.append({"Ville": city, "Latitude": None, "Longitude": None})
+    df_villes = pd.DataFrame(data)
+
+    resultats, reponses = [], []
+    for index, row in df_villes.iterrows():
+        response = requests.get(f"{url_owm}?lat={row['Latitude']}&lon={row['Longitude']}&appid={cle}&units=metric")
+        data = response.json()
+        if response.status_code == 200 and "list" in data:
+            resultats.append(moyennes_notebook(row["Ville"], row["Latitude"], row["Longitude"], data))
+            reponses.append((row["Ville"], row["Latitude"], row["Longitude"], data))
+    return df_villes, pd.DataFrame(resultats), reponses
+
+
+def chronometrer(fonction):
+    debut = time.perf_counter()
+    resultat = fonction()
+    return time.perf_counter() - debut, resultat
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latence", type=float, default=0.2)
+    parser.add_argument("--taux-erreur", type=float, default=0.05, help="part de 503 par service (pool seulement)")
+    parser.add_argument("--concurrence", type=int, default=8)
+    parser.add_argument("--villes-agregation", type=int, default=1000)
+    args = parser.parse_args()
+
+    serveur, url = demarrer(latence=args.latence)
+    url_nominatim, url_owm = f"{url}/search", f"{url}/data/2.5/forecast"
+
+    duree_notebook, (villes_ref, meteo_ref, reponses_ref) = chronometrer(lambda: notebook(url_nominatim, url_owm, "cle"))
+    print(f"notebook (série)      : {duree_notebook:6.1f} s")
+
+    # Le pool relance les 503 : on les active seulement maintenant
+    serveur.RequestHandlerClass.taux_erreur = args.taux_erreur
+    with tempfile.TemporaryDirectory() as dossier:
+        sorties = {"sortie_coordonnees": Path(dossier) / "coordonnees.csv", "sortie_meteo": Path(dossier) / "meteo.csv",
+                   "sortie_brute": Path(dossier) / "previsions_brutes.parquet"}
+        cache = Path(dossier) / "cache_geocodage.json"
+
+        for passage in ("froid", "chaud"):
+            serveur.compteurs = {"nominatim": 0, "forecast": 0}
+            serveur.horaires = []
+            collecte = CollecteMeteo("cle", url_nominatim, url_owm, cache, args.concurrence)
+            duree, (villes, meteo) = chronometrer(lambda: collecte.executer(**sorties))
+            ecart = intervalle_min_nominatim(serveur)
+            print(f"pool, cache {passage:<6}     : {duree:6.1f} s  "
+                  f"nominatim {serveur.compteurs['nominatim']:>3} req. "
+                  f"(écart min {ecart if ecart is None else f'{ecart:.2f} s'}), "
+                  f"forecast {serveur.compteurs['forecast']:>3} req.")
+
+            # Relances comprises ; quelques ms de gigue entre l'envoi et la réception
+            assert ecart is None or ecart >= 0.95, f"Nominatim : deux requêtes à {ecart:.3f} s d'écart"
+            pd.testing.assert_frame_equal(pd.read_csv(sorties["sortie_coordonnees"]), villes_ref)
+            differences = comparer(pd.read_csv(sorties["sortie_meteo"]), reponses_ref, meteo_ref)
+        print(f"CSV conformes au notebook : textes identiques, moyennes à 0,05 près "
+              f"({differences} demi-dixièmes arrondis autrement)")
+
+    serveur.shutdown()
+
+    # Agrégation seule, sur des prévisions horaires de nombreuses villes
+    reponses = [(f"Ville {i}", 43 + i % 70 / 10, 1 + i % 90 / 10, reponse_forecast(43 + i % 70 / 10, 1 + i % 90 / 10, n=120))
+                for i in range(args.villes_agregation)]
+    duree_boucle, meteo_ref = chronometrer(lambda: pd.DataFrame([moyennes_notebook(*r) for r in reponses]))
+    duree_table, table = chronometrer(lambda: table_previsions(reponses))
+    duree_agregation, meteo = chronometrer(lambda: agreger(table))
+    differences = comparer(meteo, reponses, meteo_ref)
+    print(f"agrégation, {args.villes_agregation} villes x 120 prévisions : boucles {duree_boucle * 1e3:.0f} ms, "
+          f"table longue {duree_table * 1e3:.0f} ms + agrégation {duree_agregation * 1e3:.0f} ms "
+          f"(agrégation seule, sans retéléchargement : x{duree_boucle / duree_agregation:.1f}), "
+          f"{differences} demi-dixièmes arrondis autrement sur {meteo_ref.shape[0] * len(MOYENNES)} moyennes")
@@ -0,0 +1,100 @@
+"""
+Index spatial (index_spatial.IndexHotels, BallTree haversine) contre matrice
+de distances complète villes x hôtels calculée en NumPy.
+
+Vérifie que les deux donnent les mêmes k plus proches voisins et les mêmes
+hôtels dans le rayon, sur les hôtels scrapés puis sur des hôtels synthétiques
+répartis sur la France.
+
+Usage : python benchmark_index_spatial.py [--hotels 500000] [--villes 2000] [--k 10] [--rayon-km 5]
+"""
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from index_spatial import IndexHotels, RAYON_TERRE_KM
+
+
+def matrice_haversine(lat1, lon1, lat2, lon2):
+    """Distances km entre chaque point 1 (lignes) et chaque point 2 (colonnes)."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype=np.float64)) for x in (lat1, lon1, lat2, lon2))
+    dlat = lat2[None, :] - lat1[:, None]
+    dlon = lon2[None, :] - lon1[:, None]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1)[:, None] * np.cos(lat2)[None, :] * np.sin(dlon / 2) ** 2
+    return 2 * RAYON_TERRE_KM * np.arcsin(np.sqrt(a))
+
+
+def force_brute(hotels, villes, k, rayon_km):
+    distances = matrice_haversine(villes["Latitude"], villes["Longitude"], hotels["Latitude"], hotels["Longitude"])
+    k = min(k, distances.shape[1])
+    proches = np.sort(np.partition(distances, k - 1, axis=1)[:, :k], axis=1)
+    dans_rayon = (distances <= rayon_km).sum(axis=1)
+    return proches, dans_rayon
+
+
+def avec_index(index, villes, k, rayon_km):
+    proches, _ = index.plus_proches(villes["Latitude"], villes["Longitude"], k)
+    distances, _ = index.dans_rayon(villes["Latitude"], villes["Longitude"], rayon_km)
+    return proches, np.array([len(d) for d in distances])
+
+
+def comparer(nom, hotels, villes, k, rayon_km):
+    """Force brute calculée par blocs de villes, pour borner la matrice (villes x hôtels x 8 octets)."""
+    debut = time.perf_counter()
+    index = IndexHotels(hotels)
+    t_construction = time.perf_counter() - debut
+
+    # Même jeu d'hôtels des deux côtés : ceux qui ont des coordonnées
+    hotels = index.hotels
+
+    taille_bloc = max(1, int(2e8 // (8 * max(len(hotels), 1))))
+    debut = time.perf_counter()
+    resultats = [force_brute(hotels, villes.iloc[i:i + taille_bloc], k, rayon_km)
+                 for i in range(0, len(villes), taille_bloc)]
+    proches_ref = np.vstack([r[0] for r in resultats])
+    rayon_ref = np.concatenate([r[1] for r in resultats])
+    t_brute = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    proches, rayon = avec_index(index, villes, k, rayon_km)
+    t_index = time.perf_counter() - debut
+
+    # Tolérance : hôtels situés exactement à la limite du rayon (arrondi flottant)
+    ok_knn = np.allclose(proches, proches_ref, atol=1e-6)
+    ecarts_rayon = int(np.abs(rayon - rayon_ref).sum())
+    print(f"{nom} : {len(hotels)} hôtels, {len(villes)} villes, k={k}, rayon {rayon_km:g} km")
+    print(f"  parité : kNN {'identiques' if ok_knn else 'DIFFÉRENTS'}, {ecarts_rayon} écart(s) sur les rayons")
+    print(f"  force brute (matrice)     : {t_brute * 1e3:9.1f} ms")
+    print(f"  index : construction      : {t_construction * 1e3:9.1f} ms (une fois)")
+    print(f"  index : requêtes groupées : {t_index * 1e3:9.1f} ms (x{t_brute / t_index:.1f})")
+
+
+def points_france(n, rng):
+    return pd.DataFrame({
+        "Latitude": rng.uniform(42.3, 51.1, n),
+        "Longitude": rng.uniform(-4.8, 8.2, n),
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hotels", type=int, default=500_000)
+    parser.add_argument("--villes", type=int, default=2000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rayon-km", type=float, default=5.0)
+    args = parser.parse_args()
+
+    hotels = pd.read_csv("Destinations_infos.csv", encoding="utf-8-sig")
+    villes = pd.read_csv("coordonnees_villes.csv").dropna(subset=["Latitude", "Longitude"])
+    comparer("données du projet", hotels, villes, args.k, 10.0)
+
+    # Aucun hôtel géolocalisé : résultats vides, pas d'erreur de BallTree
+    vide = IndexHotels(hotels.assign(Latitude=None, Longitude=None))
+    assert vide.plus_proches_villes(villes, args.k).empty and vide.dans_rayon_villes(villes, 10.0).empty
+
+    rng = np.random.default_rng(0)
+    hotels = points_france(args.hotels, rng)
+    villes = points_france(args.villes, rng)
+    comparer("synthétique", hotels, villes, args.k, args.rayon_km)
@@ -0,0 +1,162 @@
+"""
+Micro-benchmark de l'extraction des fiches hôtel : cascade de sélecteurs
+d'origine (un response.xpath / response.css par sélecteur) contre
+selecteurs_hotel.extraire_hotel (XPath lxml compilés, évalués au besoin).
+
+Pages : celles enregistrées dans le cache de rejeu (cache_rejeu.py) si le
+fichier SQLite est donné, sinon des pages générées par site_fixture_booking.py.
+Vérifie aussi que les deux versions donnent les mêmes valeurs, et compte les
+pages sur lesquelles la cascade d'origine lève une exception (None + ",") :
+elle s'y arrête tôt, d'où une seconde mesure sur les seules pages où elle
+aboutit. --remplissage grossit les pages (avis, blocs annexes) pour se
+rapprocher de vraies fiches Booking.
+
+Usage : python benchmark_selecteurs.py [--cache .scrapy/httpcache/booking_spider.sqlite] [--repetitions 20]
+                                       [--remplissage 2000]
+"""
+import time
+import zlib
+import sqlite3
+import argparse
+
+from parsel import Selector
+
+from selecteurs_hotel import extraire_hotel, convertir_score
+from site_fixture_booking import page_hotel
+
+
+def cascade_origine(response):
+    """Sélecteurs de parse_hotel avant selecteurs_hotel.py, à l'identique."""
+    hotel_score_text = (
+        response.xpath('//div[@data-testid="review-score-right-component"]/div[@aria-hidden="true"]/text()').get()
+        or response.css('[data-testid="review-score"]::text').get()
+        or response.css('[data-testid="external-review-score"]::text').get()
+        or response.css('[data-testid="review-score-subcomponent"]::text').get()
+    )
+    hotel_score_text = hotel_score_text.strip() if hotel_score_text else 'N/A'
+
+    description_text = (
+        " ".join(d.strip() for d in response.css('[data-testid="property-description"]::text').getall() if d.strip())
+        or " ".join(d.strip() for d in response.css('#property_description_content p::text').getall() if d.strip())
+        or response.xpath("//meta[@name='description']/@content").get()
+    )
+    description_text = description_text.strip() if description_text else 'N/A'
+
+    latlng = (
+        response.css('[data-atlas-latlng]::attr(data-atlas-latlng)').get()
+        or response.css('meta[property="booking_com:location:latitude"]::attr(content)').get() + "," +
+        response.css('meta[property="booking_com:location:longitude"]::attr(content)').get()
+        or response.css('[data-lat]::attr(data-lat)').get() + "," +
+        response.css('[data-lon]::attr(data-lon)').get()
+    )
+
+    latitude, longitude = (None, None)
+    if latlng and "," in latlng:
+        parts = latlng.split(",", 1)
+        latitude = parts[0].strip() if parts[0] else None
+        longitude = parts[1].strip() if len(parts) > 1 else None
+    return hotel_score_text, description_text, latitude, longitude
+
+
+# Cas absents du site fixture, vérifiés en parité seulement
+PAGES_LIMITES = [
+    # Le bloc de description est lui-même un <p> : '#property_description_content p' ne le prend pas
+    '<html><head><meta name="description" content="Meta"></head><body>'
+    '<p id="property_description_content">Texte direct</p><a data-atlas-latlng="45.1,6.2">carte</a>'
+    '<span data-testid="review-score">8,1</span></body></html>',
+    # Note dans external-review-score, description dans des <p> imbriqués
+    '<html><head><meta property="booking_com:location:latitude" content="43.2">'
+    '<meta property="booking_com:location:longitude" content="-1.5"></head><body>'
+    '<div data-testid="external-review-score"> 7.5 </div>'
+    '<div id="property_description_content"><div><p>Un</p></div><p>Deux <b>gras</b> fin</p></div>'
+    '</body></html>',
+]
+
+
+def pages_cache(chemin):
+    with sqlite3.connect(chemin) as connexion:
+        lignes = connexion.execute("SELECT url, corps FROM reponses WHERE url LIKE '%/hotel/%'").fetchall()
+    return [zlib.decompress(corps).decode("utf-8", errors="replace") for _, corps in lignes]
+
+
+def pages_fixture(n=120):
+    villes = ["Nimes", "Annecy", "Colmar", "Biarritz"]
+    return [page_hotel(villes[i % len(villes)], i) for i in range(n)]
+
+
+def remplir(html, blocs):
+    """Ajoute `blocs` avis factices avant </body>."""
+    avis = '<div class="avis"><span class="auteur">Client</span><p>Très bon séjour, personnel accueillant.</p></div>'
+    return html.replace("</body>", avis * blocs + "</body>")
+
+
+def chronometrer(fonction, selecteurs, repetitions):
+    debut = time.perf_counter()
+    for _ in range(repetitions):
+        for sel in selecteurs:
+            fonction(sel)
+    return (time.perf_counter() - debut) / (repetitions * len(selecteurs))
+
+
+def ancien(sel):
+    try:
+        return cascade_origine(sel)
+    except TypeError:
+        return None
+
+
+def nouveau(sel):
+    return extraire_hotel(sel.root)
+
+
+def comparer(pages):
+    """Écarts entre les deux versions, sur les pages où l'ancienne ne plante pas."""
+    ecarts, plantages = 0, 0
+    for html in pages:
+        sel = Selector(text=html)
+        origine = ancien(sel)
+        if origine is None:
+            plantages += 1
+            continue
+        score, description, latitude, longitude = origine
+        champs = extraire_hotel(sel.root)
+        attendu = (
+            convertir_score(score),
+            description if description != 'N/A' else None,
+            float(latitude) if latitude else None,
+            float(longitude) if longitude else None,
+        )
+        if attendu != (champs["score"], champs["description"], champs["latitude"], champs["longitude"]):
+            ecarts += 1
+    return ecarts, plantages
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cache", help="fichier SQLite du cache de rejeu")
+    parser.add_argument("--repetitions", type=int, default=20)
+    parser.add_argument("--remplissage", type=int, default=0, help="avis factices ajoutés à chaque page")
+    args = parser.parse_args()
+
+    pages = pages_cache(args.cache) if args.cache else pages_fixture()
+    if args.remplissage:
+        pages = [remplir(html, args.remplissage) for html in pages]
+    print(f"{len(pages)} pages hôtel, {sum(map(len, pages)) / len(pages) / 1e3:.0f} Ko en moyenne")
+
+    ecarts, plantages = comparer(pages + PAGES_LIMITES)
+    print(f"parité : {ecarts} écart(s) ; la cascade d'origine plante sur {plantages} page(s)")
+
+    # Extraction seule : le DOM est déjà construit (comme response.selector dans Scrapy)
+    selecteurs = [Selector(text=html) for html in pages]
+    sans_plantage = [sel for sel in selecteurs if ancien(sel) is not None]
+    for nom, lot in [("extraction seule", selecteurs), ("pages sans plantage", sans_plantage)]:
+        t_ancien = chronometrer(ancien, lot, args.repetitions)
+        t_nouveau = chronometrer(nouveau, lot, args.repetitions)
+        print(f"{nom:<21}: origine {t_ancien * 1e6:9.1f} µs/page, "
+              f"XPath compilés {t_nouveau * 1e6:9.1f} µs/page (x{t_ancien / t_nouveau:.1f})")
+
+    # Parsing HTML compris
+    t_ancien = chronometrer(lambda html: ancien(Selector(text=html)), pages, max(args.repetitions // 4, 1))
+    t_nouveau = chronometrer(lambda html: nouveau(Selector(text=html)), pages, max(args.repetitions // 4, 1))
+    print(f"{'parsing + extraction':<21}: origine {t_ancien * 1e6:9.1f} µs/page, "
+          f"XPath compilés {t_nouveau * 1e6:9.1f} µs/page (x{t_ancien / t_nouveau:.1f})")
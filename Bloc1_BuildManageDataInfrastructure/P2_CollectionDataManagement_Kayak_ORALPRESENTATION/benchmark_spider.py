@@ -0,0 +1,82 @@
+"""
+Débit du spider Booking sur le site fixture local (site_fixture_booking.py).
+
+Chaque passage tourne dans un processus séparé (le reactor Twisted ne
+redémarre pas) :
+- prudent        : réglages d'origine (DOWNLOAD_DELAY 1 s, une requête à la fois)
+- debit (froid)  : profil concurrent, cache HTTP vide
+- debit (chaud)  : même profil, relance servie par le cache HTTP
+- incr. (1er)    : profil incremental, aucun état : toutes les fiches sont nouvelles
+- incr. (stable) : relance sans changement côté site : fiches en 304, aucun item
+- incr. (modif)  : un hôtel sur dix modifié sur le site : seuls ceux-là sont émis
+- rejeu          : site arrêté, parsing rejoué hors ligne depuis le cache
+
+Usage : python benchmark_spider.py [--villes 5] [--latence 0.05]
+"""
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+from site_fixture_booking import demarrer
+
+BASE_DIR = Path(__file__).parent
+SPIDER = BASE_DIR / "Part3_kayak_donnees_hotels_VF.py"
+
+
+def passage(url, profil, villes, dossier, reglages=()):
+    rapport = Path(dossier) / f"rapport_{profil}.json"
+    rapport.unlink(missing_ok=True)
+    commande = [
+        sys.executable, str(SPIDER), "--profil", profil, "--url-base", url,
+        "--villes", str(villes), "--sortie", str(Path(dossier) / f"hotels_{profil}.json"),
+        "--set", f"RAPPORT_CRAWL_FICHIER={rapport}", "--set", "LOG_LEVEL=WARNING",
+        "--set", f"SQLITE_HOTELS_CHEMIN={Path(dossier) / 'hotels.sqlite'}",
+    ]
+    for reglage in reglages:
+        commande += ["--set", reglage]
+    subprocess.run(commande, cwd=BASE_DIR, check=True)
+    return json.loads(rapport.read_text(encoding="utf-8"))
+
+
+def afficher(nom, r):
+    print(f"{nom:<16} {r['pages']:>6} {r['pages_cache']:>6} {r['duree_s']:>8.1f} {r['pages_par_s']:>8.1f} "
+          f"{r['latence_p50_s']:>8.3f} {r['latence_p95_s']:>8.3f} {r['octets'] / 1e6:>8.2f} {r['items']:>6}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--villes", type=int, default=5)
+    parser.add_argument("--latence", type=float, default=0.05)
+    args = parser.parse_args()
+
+    serveur, url = demarrer(latence=args.latence)
+    with tempfile.TemporaryDirectory() as dossier:
+        cache = f"HTTPCACHE_DIR={Path(dossier) / 'httpcache'}"
+        resultats = {
+            "prudent": passage(url, "prudent", args.villes, dossier),
+            "debit (froid)": passage(url, "debit", args.villes, dossier, [cache]),
+            "debit (chaud)": passage(url, "debit", args.villes, dossier, [cache]),
+            "incr. (1er)": passage(url, "incremental", args.villes, dossier),
+            "incr. (stable)": passage(url, "incremental", args.villes, dossier),
+        }
+        serveur.revision += 1
+        resultats["incr. (modif)"] = passage(url, "incremental", args.villes, dossier)
+        # Plus de serveur : toute page servie vient du cache
+        serveur.shutdown()
+        serveur.server_close()
+        resultats["rejeu"] = passage(url, "rejeu", args.villes, dossier, [cache])
+
+    print(f"{'profil':<16} {'pages':>6} {'cache':>6} {'durée s':>8} {'pages/s':>8} "
+          f"{'p50 s':>8} {'p95 s':>8} {'Mo':>8} {'items':>6}")
+    for nom, r in resultats.items():
+        afficher(nom, r)
+    stable, premier, complet = resultats['incr. (stable)'], resultats['incr. (1er)'], resultats['debit (froid)']
+    # Une fiche en 304 coûte encore un aller-retour : l'écart avec le 1er passage
+    # croît avec la taille des pages (quelques Ko ici, bien plus sur Booking)
+    print(f"relance incrémentale stable : {stable['octets'] / premier['octets']:.0%} des octets, "
+          f"{stable['duree_s'] / premier['duree_s']:.0%} de la durée du 1er passage, "
+          f"{stable['duree_s'] / complet['duree_s']:.0%} de celle d'un crawl complet (debit, froid)")
+    print(f"accélération debit (froid) / prudent : x{resultats['prudent']['duree_s'] / resultats['debit (froid)']['duree_s']:.1f}")
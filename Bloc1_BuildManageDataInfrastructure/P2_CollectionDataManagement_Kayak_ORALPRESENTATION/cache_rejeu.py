@@ -0,0 +1,104 @@
+"""
+Stockage du cache HTTP Scrapy pour l'enregistrement / rejeu des pages Booking.
+
+Un seul fichier SQLite par spider (<HTTPCACHE_DIR>/<spider>.sqlite), une ligne
+par requête, clé = empreinte Scrapy de la requête, corps compressé en zlib.
+Une réponse plus ancienne que HTTPCACHE_EXPIRATION_SECS (0 = jamais) est
+ignorée à la lecture et purgée à l'ouverture.
+
+Avec HTTPCACHE_IGNORE_MISSING, les requêtes absentes du cache ne partent pas
+sur le réseau : le parsing se rejoue entièrement hors ligne (profil "rejeu").
+
+    HTTPCACHE_STORAGE = cache_rejeu.StockageCompresse
+"""
+import json
+import time
+import zlib
+import sqlite3
+import logging
+from pathlib import Path
+
+from scrapy.http import Headers
+from scrapy.responsetypes import responsetypes
+from scrapy.utils.project import data_path
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reponses (
+    empreinte TEXT PRIMARY KEY,
+    url       TEXT NOT NULL,
+    statut    INTEGER NOT NULL,
+    entetes   TEXT NOT NULL,
+    corps     BLOB NOT NULL,
+    date      REAL NOT NULL
+)
+"""
+
+# Écritures regroupées : un commit toutes les N réponses (et à la fermeture)
+COMMIT_TOUTES_LES = 100
+
+
+class StockageCompresse:
+
+    def __init__(self, settings):
+        self.dossier = Path(data_path(settings["HTTPCACHE_DIR"], createdir=True))
+        self.expiration = settings.getint("HTTPCACHE_EXPIRATION_SECS")
+        self.niveau = settings.getint("HTTPCACHE_COMPRESSION_NIVEAU", 6)
+        self.connexion = None
+        self._en_attente = 0
+
+    def open_spider(self, spider):
+        self._empreinte = spider.crawler.request_fingerprinter.fingerprint
+        chemin = self.dossier / f"{spider.name}.sqlite"
+        self.connexion = sqlite3.connect(chemin)
+        self.connexion.execute("PRAGMA journal_mode=WAL")
+        self.connexion.execute(SCHEMA)
+
+        if self.expiration:
+            purgees = self.connexion.execute(
+                "DELETE FROM reponses WHERE date < ?", (time.time() - self.expiration,)
+            ).rowcount
+            self.connexion.commit()
+            if purgees:
+                logger.info("Cache HTTP : %d réponses expirées supprimées", purgees)
+        logger.debug("Cache HTTP ouvert : %s", chemin)
+
+    def close_spider(self, spider):
+        self.connexion.commit()
+        self.connexion.close()
+
+    def retrieve_response(self, spider, request):
+        ligne = self.connexion.execute(
+            "SELECT url, statut, entetes, corps, date FROM reponses WHERE empreinte = ?",
+            (self._empreinte(request).hex(),)
+        ).fetchone()
+        if ligne is None:
+            return None
+
+        url, statut, entetes, corps, date = ligne
+        if self.expiration and time.time() - date > self.expiration:
+            return None
+
+        headers = Headers({
+            cle.encode("latin-1"): [v.encode("latin-1") for v in valeurs]
+            for cle, valeurs in json.loads(entetes)
+        })
+        body = zlib.decompress(corps)
+        respcls = responsetypes.from_args(headers=headers, url=url, body=body)
+        return respcls(url=url, headers=headers, status=statut, body=body)
+
+    def store_response(self, spider, request, response):
+        entetes = json.dumps([
+            (cle.decode("latin-1"), [v.decode("latin-1") for v in valeurs])
+            for cle, valeurs in response.headers.items()
+        ])
+        self.connexion.execute(
+            "INSERT OR REPLACE INTO reponses VALUES (?, ?, ?, ?, ?, ?)",
+            (self._empreinte(request).hex(), response.url, response.status, entetes,
+             zlib.compress(response.body, self.niveau), time.time())
+        )
+        self._en_attente += 1
+        if self._en_attente >= COMMIT_TOUTES_LES:
+            self.connexion.commit()
+            self._en_attente = 0
@@ -0,0 +1,159 @@
+"""
+Classement des destinations : rangs météo pondérés + notes des hôtels.
+
+- Tous les rangs (température, humidité, vent, nuages et note moyenne des
+  hôtels) sont calculés en un seul DataFrame.rank, une fois pour toutes.
+- Le score final est une moyenne pondérée des rangs (plus petit = meilleur),
+  avec les poids du notebook par défaut ou ceux de l'utilisateur : un simple
+  produit matrice-vecteur.
+- Les k meilleures destinations (et les k meilleurs hôtels d'une ville)
+  sortent d'un np.argpartition, sans trier toute la table.
+
+Usage : python classement.py [--k 5] [--poids rank_temp=0.5 --poids rank_hotel=0.2]
+                             [--sortie classement_villes_pour_hotels.csv]
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Rang -> (colonne, True si la plus petite valeur est la meilleure)
+CRITERES = {
+    "rank_temp": ("Temperature Moy (°C)", False),
+    "rank_humidity": ("Humidite Moy (%)", True),       # Moins d'humidité est mieux
+    "rank_vent": ("Vent Moy (m/s)", True),             # Moins de vent est mieux
+    "rank_nuage": ("Couverture nuageuse (%)", True),   # Moins de nuages est mieux
+    "rank_hotel": ("score_moyen_hotels", False),       # Villes sans hôtel classées en dernier
+}
+
+# Poids du notebook (la note des hôtels n'y entrait pas)
+POIDS = {
+    "rank_temp": 0.3,
+    "rank_humidity": 0.2,
+    "rank_vent": 0.2,
+    "rank_nuage": 0.3,
+    "rank_hotel": 0.0,
+}
+
+
+def normaliser_nom(s):
+    """Retire accents, espaces superflus et met en minuscule pour une jointure robuste."""
+    return (
+        s.astype(str)
+         .str.normalize('NFKD')
+         .str.encode('ascii', errors='ignore')
+         .str.decode('utf-8')
+         .str.strip()
+         .str.lower()
+    )
+
+
+def lire_hotels(chemin="Destinations_infos.csv"):
+    hotels = pd.read_csv(chemin, encoding="utf-8-sig")
+    hotels["Hotel_score"] = pd.to_numeric(hotels["Hotel_score"], errors="coerce")
+    return hotels
+
+
+def top_k(valeurs, k):
+    """Indices des k plus petites valeurs, triés ; argpartition en O(n) puis tri des k seuls."""
+    k = min(k, len(valeurs))
+    if k == 0:
+        return np.array([], dtype=np.intp)
+    indices = np.argpartition(valeurs, k - 1)[:k]
+    return indices[np.argsort(valeurs[indices], kind="stable")]
+
+
+class MoteurClassement:
+
+    def __init__(self, df_meteo, df_hotels=None):
+        villes = df_meteo.reset_index(drop=True)
+        villes["cle"] = normaliser_nom(villes["Ville"])
+
+        if df_hotels is None:
+            df_hotels = pd.DataFrame({"City": pd.Series(dtype=str), "Hotel_score": pd.Series(dtype=float)})
+        hotels = df_hotels.assign(cle=normaliser_nom(df_hotels["City"]))
+
+        # Notes des hôtels agrégées par ville, jointes sur le nom normalisé
+        notes = hotels.groupby("cle").agg(
+            nb_hotels=("Hotel_score", "size"),
+            score_moyen_hotels=("Hotel_score", "mean"),
+            score_max_hotels=("Hotel_score", "max"),
+        )
+        villes = villes.join(notes, on="cle").drop(columns="cle")
+        villes["nb_hotels"] = villes["nb_hotels"].fillna(0).astype(int)
+        self.villes = villes
+
+        # Tous les rangs en un seul passage (ex aequo : ordre d'apparition)
+        colonnes = [colonne for colonne, _ in CRITERES.values()]
+        signes = np.array([1 if croissant else -1 for _, croissant in CRITERES.values()])
+        rangs = (villes[colonnes] * signes).rank(method="first", na_option="bottom")
+        self.rangs = rangs.to_numpy(dtype=np.float64)
+
+        # Hôtels regroupés par ville : une tranche contiguë par clé
+        hotels = hotels.sort_values("cle", kind="stable").reset_index(drop=True)
+        self.hotels = hotels
+        self.notes_hotels = -hotels["Hotel_score"].fillna(-np.inf).to_numpy()   # plus petit = meilleur
+        debuts = np.flatnonzero(np.r_[True, hotels["cle"].to_numpy()[1:] != hotels["cle"].to_numpy()[:-1]])
+        fins = np.r_[debuts[1:], len(hotels)]
+        self.tranches = {hotels["cle"].iat[d]: slice(d, f) for d, f in zip(debuts, fins)} if len(hotels) else {}
+
+    def vecteur_poids(self, poids=None):
+        poids = POIDS if poids is None else poids
+        inconnus = set(poids) - set(CRITERES)
+        if inconnus:
+            raise ValueError(f"Critères inconnus : {sorted(inconnus)} (attendus : {list(CRITERES)})")
+        return np.array([float(poids.get(critere, 0.0)) for critere in CRITERES])
+
+    def scores(self, poids=None):
+        """Score final de chaque ville : moyenne pondérée des rangs."""
+        return self.rangs @ self.vecteur_poids(poids)
+
+    def classement(self, poids=None):
+        """Toutes les villes triées, colonnes du classement_villes_pour_hotels.csv du notebook."""
+        tableau = pd.DataFrame(self.rangs.astype(int), columns=list(CRITERES))
+        tableau.insert(0, "Ville", self.villes["Ville"])
+        tableau["score_final"] = self.scores(poids)
+        return tableau.sort_values("score_final", kind="stable").reset_index(drop=True)
+
+    def top_destinations(self, k=5, poids=None, min_hotels=0):
+        scores = self.scores(poids)
+        if min_hotels:
+            scores = np.where(self.villes["nb_hotels"].to_numpy() >= min_hotels, scores, np.inf)
+        indices = top_k(scores, k)
+        indices = indices[np.isfinite(scores[indices])]
+
+        top = self.villes.iloc[indices].reset_index(drop=True)
+        top.insert(0, "Rank", np.arange(1, len(top) + 1))
+        top["score_final"] = scores[indices]
+        return top
+
+    def meilleurs_hotels(self, ville, k=5):
+        tranche = self.tranches.get(normaliser_nom(pd.Series([ville])).iat[0])
+        if tranche is None:
+            return self.hotels.iloc[0:0]
+        indices = top_k(self.notes_hotels[tranche], k) + tranche.start
+        return self.hotels.iloc[indices].drop(columns="cle").reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Top k des destinations selon la météo et les hôtels")
+    parser.add_argument("--meteo", default="moyenne_meteo_5jours.csv")
+    parser.add_argument("--hotels", default="Destinations_infos.csv")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--poids", action="append", default=[], metavar="CRITERE=POIDS",
+                        help=f"remplace un poids par défaut ; critères : {', '.join(CRITERES)}")
+    parser.add_argument("--min-hotels", type=int, default=0)
+    parser.add_argument("--sortie", help="écrire le classement complet (ex. classement_villes_pour_hotels.csv)")
+    args = parser.parse_args()
+
+    poids = {**POIDS, **{c: float(p) for c, p in (r.split("=", 1) for r in args.poids)}}
+    moteur = MoteurClassement(pd.read_csv(args.meteo), lire_hotels(args.hotels))
+
+    if args.sortie:
+        moteur.classement(poids).to_csv(args.sortie, index=False, encoding="utf-8")
+
+    top = moteur.top_destinations(args.k, poids, args.min_hotels)
+    print(top[["Rank", "Ville", "score_final", "nb_hotels", "score_moyen_hotels"]].to_string(index=False))
+    for ville in top["Ville"]:
+        print(f"\n{ville} :")
+        print(moteur.meilleurs_hotels(ville, 3)[["Hotel_name", "Hotel_score"]].to_string(index=False))
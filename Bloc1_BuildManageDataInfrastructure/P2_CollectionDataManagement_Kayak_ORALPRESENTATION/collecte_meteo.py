@@ -0,0 +1,289 @@
+"""
+Parties 1 et 2 du notebook en un seul passage : géocodage des villes
+(Nominatim) puis prévisions 5 jours (OpenWeatherMap), écrit
+coordonnees_villes.csv et moyenne_meteo_5jours.csv.
+
+Les réponses d'OpenWeatherMap sont mises à plat dans une table longue (une
+ligne par ville et par prévision 3 h : température, humidité, vent, nuages,
+condition), gardée dans previsions_brutes.parquet ; les moyennes par ville
+en sortent en un seul groupby, arrondies à 0,1 (au dernier chiffre près du
+notebook quand la moyenne tombe sur un demi-dixième).
+
+- Sessions requests partagées : connexions HTTP gardées ouvertes et
+  réutilisées (pool dimensionné sur la concurrence), relances sur 429 / 5xx
+  en respectant Retry-After.
+- Requêtes en parallèle dans un pool de threads borné.
+- Nominatim : au plus une requête par seconde (règle d'usage du service),
+  quel que soit le nombre de threads, relances comprises : elles passent par
+  le limiteur et non par l'adaptateur HTTP.
+- Coordonnées gardées sur disque (cache_geocodage.json) : une ville déjà
+  géocodée n'est plus jamais redemandée.
+
+Usage : python collecte_meteo.py [--concurrence 8]  (clé OpenWeatherMap : OW_KEY dans .env)
+"""
+import os
+import json
+import time
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import InvalidHeader
+from urllib3.util.retry import Retry
+
+URL_NOMINATIM = "https://nominatim.openstreetmap.org/search"
+URL_OWM = "https://api.openweathermap.org/data/2.5/forecast"
+USER_AGENT = "MyPythonApp/1.0"
+
+CITIES = ["Mont Saint Michel", "St Malo", "Bayeux", "Le Havre", "Rouen", "Paris", "Amiens", "Lille", "Strasbourg",
+    "Chateau du Haut Koenigsbourg", "Colmar", "Eguisheim", "Besancon", "Dijon", "Annecy", "Grenoble",
+    "Lyon", "Gorges du Verdon", "Bormes les Mimosas", "Cassis", "Marseille", "Aix en Provence",
+    "Avignon", "Uzes", "Nimes", "Aigues Mortes", "Saintes Maries de la mer", "Collioure", "Carcassonne",
+    "Ariege", "Toulouse", "Montauban", "Biarritz", "Bayonne", "La Rochelle"]
+
+# Valeur numérique de chaque condition (0 = beau temps, 1 = mauvais temps) ;
+# les autres conditions ne comptent pas dans la moyenne, comme dans le notebook
+SCORES_CONDITIONS = {"Clear": 0.1, "Rain": 1, "Clouds": 0.6, "Snow": 1, "Mist": 1}
+
+# Texte selon la condition moyenne : [0, 0.21[, [0.21, 0.45[, [0.45, 0.8[, [0.8, +inf[
+SEUILS_CONDITIONS = [-np.inf, 0.21, 0.45, 0.8, np.inf]
+TEXTES_CONDITIONS = [
+    "Le temps est majoritairement beau sur 5 jours.",
+    "Le temps est généralement beau avec quelques nuages.",
+    "Le temps est partiellement nuageux.",
+    "Le temps sera majoritairement pluvieux ou nuageux.",
+]
+
+COLONNES_BRUTES = ["Ville", "Latitude", "Longitude", "horodatage", "temperature", "humidite", "vent", "nuages", "condition"]
+
+# Colonne de moyenne_meteo_5jours.csv -> colonne de la table brute
+MOYENNES = {
+    "Temperature Moy (°C)": "temperature",
+    "Humidite Moy (%)": "humidite",
+    "Vent Moy (m/s)": "vent",
+    "Couverture nuageuse (%)": "nuages",
+}
+
+
+def table_previsions(reponses):
+    """
+    reponses : [(ville, lat, lon, json forecast)].
+    Table longue, une ligne par prévision 3 h et par ville.
+    """
+    lignes = [
+        (ville, lat, lon, p["dt"], p["main"]["temp"], p["main"]["humidity"],
+         p["wind"]["speed"], p["clouds"]["all"], p["weather"][0]["main"])
+        for ville, lat, lon, data in reponses
+        for p in data["list"]
+    ]
+    table = pd.DataFrame.from_records(lignes, columns=COLONNES_BRUTES)
+    table["horodatage"] = pd.to_datetime(table["horodatage"], unit="s", utc=True)
+    table["condition"] = table["condition"].astype("category")
+    return table
+
+
+def agreger(table):
+    """Moyennes 5 jours de chaque ville (moyenne_meteo_5jours.csv) en un seul groupby."""
+    score_condition = table["condition"].map(SCORES_CONDITIONS).astype(float)   # NaN : non comptée
+    # sort=False : villes dans l'ordre d'apparition, comme les lignes du notebook
+    groupes = table.assign(score_condition=score_condition).groupby("Ville", sort=False)
+    moyennes = groupes[["Latitude", "Longitude"]].first()
+    valeurs = groupes[[*MOYENNES.values(), "score_condition"]].mean()
+
+    # Arrondi de pandas (x * 10, arrondi au pair, / 10) : sur une moyenne qui
+    # tombe sur un demi-dixième, comme 21.15, il peut donner 21.2 là où le
+    # round() du notebook écrit 21.1 ; jamais plus d'un dixième d'écart
+    moyennes[list(MOYENNES)] = valeurs[list(MOYENNES.values())].round(1).to_numpy()
+    moyennes["Conditions Meteo"] = pd.cut(
+        valeurs["score_condition"].to_numpy(), SEUILS_CONDITIONS, right=False, labels=TEXTES_CONDITIONS
+    ).astype(object)
+    return moyennes.reset_index()
+
+
+class Limiteur:
+    """Espace les requêtes d'au moins `intervalle` secondes, entre tous les threads."""
+
+    def __init__(self, intervalle):
+        self.intervalle = intervalle
+        self.verrou = threading.Lock()
+        self.prochain = 0.0
+
+    def attendre(self):
+        with self.verrou:
+            maintenant = time.monotonic()
+            attente = self.prochain - maintenant
+            self.prochain = max(maintenant, self.prochain) + self.intervalle
+        if attente > 0:
+            time.sleep(attente)
+
+
+class CacheGeocodage:
+    """Fichier JSON {requête: [lat, lon] ou null}, réécrit de façon atomique."""
+
+    def __init__(self, chemin):
+        self.chemin = chemin
+        self.verrou = threading.Lock()
+        self.entrees = {}
+        if os.path.exists(chemin):
+            with open(chemin, encoding="utf-8") as f:
+                self.entrees = json.load(f)
+
+    def __contains__(self, requete):
+        return requete in self.entrees
+
+    def __getitem__(self, requete):
+        return self.entrees[requete]
+
+    def ajouter(self, requete, coordonnees):
+        with self.verrou:
+            self.entrees[requete] = coordonnees
+
+    def sauvegarder(self):
+        dossier = os.path.dirname(os.path.abspath(self.chemin))
+        with self.verrou:
+            fd, temporaire = tempfile.mkstemp(dir=dossier, prefix=".", suffix=".json")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.entrees, f, ensure_ascii=False, indent=1)
+            os.replace(temporaire, self.chemin)
+
+
+STATUTS_RELANCE = [429, 500, 502, 503, 504]
+
+
+def delai_retry_after(response):
+    """En-tête Retry-After (secondes ou date HTTP) en secondes ; 0 s'il manque ou est illisible."""
+    try:
+        return Retry().parse_retry_after(response.headers.get("Retry-After", "0"))
+    except InvalidHeader:
+        return 0
+
+
+def session_partagee(taille_pool, tentatives=3):
+    """tentatives=0 : aucune relance dans l'adaptateur (l'appelant relance lui-même)."""
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+    relances = Retry(
+        total=tentatives, backoff_factor=0.5,
+        status_forcelist=STATUTS_RELANCE,
+        respect_retry_after_header=True,
+    )
+    adaptateur = HTTPAdapter(pool_connections=4, pool_maxsize=taille_pool, max_retries=relances if tentatives else 0)
+    session.mount("http://", adaptateur)
+    session.mount("https://", adaptateur)
+    return session
+
+
+class CollecteMeteo:
+
+    def __init__(self, cle_owm, url_nominatim=URL_NOMINATIM, url_owm=URL_OWM,
+                 cache="cache_geocodage.json", concurrence=8, intervalle_nominatim=1.0, timeout=30,
+                 tentatives=3):
+        self.cle_owm = cle_owm
+        self.url_nominatim = url_nominatim
+        self.url_owm = url_owm
+        self.cache = CacheGeocodage(cache)
+        self.concurrence = concurrence
+        self.limiteur_nominatim = Limiteur(intervalle_nominatim)
+        self.timeout = timeout
+        self.tentatives = tentatives
+        self.session = session_partagee(concurrence, tentatives)
+        # Les relances de l'adaptateur ne passeraient pas par le limiteur
+        self.session_nominatim = session_partagee(concurrence, tentatives=0)
+
+    def get_nominatim(self, params):
+        """GET Nominatim : chaque essai, relances comprises, attend son tour au limiteur."""
+        for tentative in range(self.tentatives + 1):
+            self.limiteur_nominatim.attendre()
+            response = self.session_nominatim.get(self.url_nominatim, params=params, timeout=self.timeout)
+            if response.status_code not in STATUTS_RELANCE or tentative == self.tentatives:
+                return response
+            # Retry-After s'ajoute à l'intervalle du limiteur
+            time.sleep(delai_retry_after(response))
+
+    def geocoder(self, ville):
+        requete = f"{ville}, France"
+        if requete not in self.cache:
+            try:
+                response = self.get_nominatim({"q": requete, "format": "json", "limit": 1})
+                response.raise_for_status()
+                results = response.json()
+            except (requests.RequestException, ValueError) as e:
+                # Erreur réseau : rien en cache, la ville sera redemandée au prochain passage
+                print(f"Erreur pour {ville}: {e}")
+                return {"Ville": ville, "Latitude": None, "Longitude": None}
+            # Ville introuvable : mise en cache aussi (réponse stable de Nominatim)
+            self.cache.ajouter(requete, [float(results[0]["lat"]), float(results[0]["lon"])] if results else None)
+
+        coordonnees = self.cache[requete]
+        if coordonnees is None:
+            print(f"Aucune donnée trouvée pour {ville}")
+            return {"Ville": ville, "Latitude": None, "Longitude": None}
+        return {"Ville": ville, "Latitude": coordonnees[0], "Longitude": coordonnees[1]}
+
+    def prevision(self, ville, lat, lon):
+        """Réponse brute d'OpenWeatherMap : (ville, lat, lon, json), None en cas d'échec."""
+        try:
+            response = self.session.get(
+                self.url_owm, params={"lat": lat, "lon": lon, "appid": self.cle_owm, "units": "metric"},
+                timeout=self.timeout,
+            )
+            data = response.json()
+        except (requests.RequestException, ValueError) as e:
+            print(f"Erreur pour {ville}: {e}")
+            return None
+        if response.status_code != 200 or not data.get("list"):
+            print(f"Aucune donnee pour {ville}")
+            return None
+        return ville, lat, lon, data
+
+    def executer(self, villes=CITIES, sortie_coordonnees="coordonnees_villes.csv",
+                 sortie_meteo="moyenne_meteo_5jours.csv", sortie_brute="previsions_brutes.parquet"):
+        with ThreadPoolExecutor(max_workers=self.concurrence) as pool:
+            coordonnees = list(pool.map(self.geocoder, villes))
+            self.cache.sauvegarder()
+            df_villes = pd.DataFrame(coordonnees, columns=["Ville", "Latitude", "Longitude"])
+            df_villes.to_csv(sortie_coordonnees, index=False)
+
+            a_prevoir = [c for c in coordonnees if c["Latitude"] is not None]
+            reponses = pool.map(lambda c: self.prevision(c["Ville"], c["Latitude"], c["Longitude"]), a_prevoir)
+            table = table_previsions([r for r in reponses if r is not None])
+
+        # Table brute conservée : une nouvelle mesure se calcule sans rien retélécharger
+        table.to_parquet(sortie_brute, index=False)
+        df_resultats = agreger(table)
+        df_resultats.to_csv(sortie_meteo, index=False, encoding="utf-8")
+        return df_villes, df_resultats
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Coordonnées et météo 5 jours des villes du classement")
+    parser.add_argument("--concurrence", type=int, default=8)
+    parser.add_argument("--url-nominatim", default=URL_NOMINATIM, help="autre service (stub local)")
+    parser.add_argument("--url-owm", default=URL_OWM, help="autre service (stub local)")
+    parser.add_argument("--intervalle-nominatim", type=float, default=1.0, help="secondes entre deux requêtes Nominatim")
+    parser.add_argument("--cache", default="cache_geocodage.json")
+    parser.add_argument("--depuis-brut", action="store_true",
+                        help="recalculer moyenne_meteo_5jours.csv depuis previsions_brutes.parquet, sans requête")
+    args = parser.parse_args()
+
+    if args.depuis_brut:
+        agreger(pd.read_parquet("previsions_brutes.parquet")).to_csv("moyenne_meteo_5jours.csv", index=False, encoding="utf-8")
+        raise SystemExit
+
+    load_dotenv()
+    OW_KEY = os.getenv("OW_KEY")
+    if OW_KEY is None:
+        raise SystemExit("Erreur Clé API : OW_KEY absente du .env")
+
+    debut = time.perf_counter()
+    collecte = CollecteMeteo(OW_KEY, args.url_nominatim, args.url_owm, args.cache,
+                             args.concurrence, args.intervalle_nominatim)
+    df_villes, df_resultats = collecte.executer()
+    print(f"{len(df_villes)} villes géocodées, {len(df_resultats)} prévisions en {time.perf_counter() - debut:.1f} s")
@@ -0,0 +1,98 @@
+"""
+Index spatial des hôtels : plus proches voisins et hôtels dans un rayon
+autour d'un point (centre-ville de coordonnees_villes.csv par exemple),
+au lieu d'un filtre sur la chaîne City du scraping.
+
+BallTree de scikit-learn en métrique haversine (distance sur la sphère,
+coordonnées en radians), construit une fois sur tous les hôtels géolocalisés ;
+chaque requête accepte un point ou un tableau de points (toutes les villes
+d'un coup).
+
+Usage : python index_spatial.py [--k 5] [--rayon-km 10]
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import BallTree
+
+RAYON_TERRE_KM = 6371.0088
+
+
+def en_radians(lat, lon):
+    return np.radians(np.column_stack([np.atleast_1d(lat), np.atleast_1d(lon)]).astype(np.float64))
+
+
+class IndexHotels:
+
+    def __init__(self, df_hotels, leaf_size=40):
+        hotels = df_hotels.assign(
+            Latitude=pd.to_numeric(df_hotels["Latitude"], errors="coerce"),
+            Longitude=pd.to_numeric(df_hotels["Longitude"], errors="coerce"),
+        )
+        # Hôtels sans coordonnées : hors index
+        self.hotels = hotels.dropna(subset=["Latitude", "Longitude"]).reset_index(drop=True)
+        # BallTree refuse un jeu vide : aucun hôtel géolocalisé, aucun arbre et des résultats vides
+        self.arbre = BallTree(
+            en_radians(self.hotels["Latitude"], self.hotels["Longitude"]), leaf_size=leaf_size, metric="haversine"
+        ) if len(self.hotels) else None
+
+    def plus_proches(self, lat, lon, k=5):
+        """(distances km, indices) des k hôtels les plus proches, une ligne par point."""
+        k = min(k, len(self.hotels))
+        if self.arbre is None:
+            n = len(en_radians(lat, lon))
+            return np.empty((n, 0)), np.empty((n, 0), dtype=np.intp)
+        distances, indices = self.arbre.query(en_radians(lat, lon), k=k)
+        return distances * RAYON_TERRE_KM, indices
+
+    def dans_rayon(self, lat, lon, rayon_km):
+        """(distances km, indices) des hôtels à moins de rayon_km, triés, un tableau par point."""
+        if self.arbre is None:
+            n = len(en_radians(lat, lon))
+            return [np.empty(0)] * n, [np.empty(0, dtype=np.intp)] * n
+        indices, distances = self.arbre.query_radius(
+            en_radians(lat, lon), r=rayon_km / RAYON_TERRE_KM, return_distance=True, sort_results=True
+        )
+        return [d * RAYON_TERRE_KM for d in distances], indices
+
+    def _tableau(self, df_points, distances, indices):
+        """Table longue : une ligne par (point, hôtel), avec le rang et la distance."""
+        tailles = np.array([len(i) for i in indices], dtype=np.intp)
+        # Tableau vide ajouté : concaténation valide même sans aucun point
+        lignes = self.hotels.iloc[np.concatenate([*indices, np.empty(0, np.intp)]).astype(np.intp)].reset_index(drop=True)
+        resultat = pd.DataFrame({
+            "Ville": np.repeat(df_points["Ville"].to_numpy(), tailles),
+            "rang": np.concatenate([*(np.arange(1, n + 1) for n in tailles), np.empty(0, np.intp)]),
+            "distance_km": np.concatenate([*distances, np.empty(0)]),
+        })
+        return pd.concat([resultat, lignes], axis=1)
+
+    def plus_proches_villes(self, df_villes, k=5):
+        """k hôtels les plus proches du centre de chaque ville, en une requête groupée."""
+        distances, indices = self.plus_proches(df_villes["Latitude"], df_villes["Longitude"], k)
+        return self._tableau(df_villes, list(distances), list(indices))
+
+    def dans_rayon_villes(self, df_villes, rayon_km):
+        """Hôtels à moins de rayon_km du centre de chaque ville, en une requête groupée."""
+        distances, indices = self.dans_rayon(df_villes["Latitude"], df_villes["Longitude"], rayon_km)
+        return self._tableau(df_villes, distances, indices)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hôtels proches du centre de chaque ville")
+    parser.add_argument("--hotels", default="Destinations_infos.csv")
+    parser.add_argument("--villes", default="coordonnees_villes.csv")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--rayon-km", type=float, default=10.0)
+    args = parser.parse_args()
+
+    index = IndexHotels(pd.read_csv(args.hotels, encoding="utf-8-sig"))
+    df_villes = pd.read_csv(args.villes).dropna(subset=["Latitude", "Longitude"])
+
+    proches = index.plus_proches_villes(df_villes, args.k)
+    print(proches[["Ville", "rang", "distance_km", "City", "Hotel_name", "Hotel_score"]].to_string(index=False))
+
+    rayon = index.dans_rayon_villes(df_villes, args.rayon_km)
+    print(f"\nHôtels à moins de {args.rayon_km:g} km du centre :")
+    print(rayon.groupby("Ville", sort=False).size().reindex(df_villes["Ville"], fill_value=0).to_string())
@@ -0,0 +1,98 @@
+"""
+Pipeline Scrapy : écriture des hôtels dans SQLite au fil du crawl.
+
+Les items sont regroupés par lots (SQLITE_TAILLE_LOT, ou toutes les
+SQLITE_INTERVALLE_S secondes) puis insérés en une seule requête executemany.
+Une ligne par hôtel, clé = URL de la fiche sans paramètres de suivi : une
+relance met à jour la ligne existante (INSERT ... ON CONFLICT DO UPDATE,
+syntaxe commune à SQLite et PostgreSQL).
+
+Le fichier est en mode WAL : il peut être interrogé pendant le crawl.
+Mémoire bornée par la taille d'un lot.
+"""
+import time
+import sqlite3
+import logging
+from datetime import datetime, timezone
+from urllib.parse import urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+COLONNES = ["Hotel_url", "City", "Hotel_name", "Hotel_score", "Hotel_description", "Latitude", "Longitude"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hotels (
+    url_canonique     TEXT PRIMARY KEY,
+    Hotel_url         TEXT NOT NULL,
+    City              TEXT,
+    Hotel_name        TEXT,
+    Hotel_score       REAL,
+    Hotel_description TEXT,
+    Latitude          REAL,
+    Longitude         REAL,
+    maj_le            TEXT NOT NULL
+)
+"""
+
+UPSERT = f"""
+INSERT INTO hotels (url_canonique, {", ".join(COLONNES)}, maj_le)
+VALUES ({", ".join(["?"] * (len(COLONNES) + 2))})
+ON CONFLICT (url_canonique) DO UPDATE SET
+    {", ".join(f"{c} = excluded.{c}" for c in COLONNES)},
+    maj_le = excluded.maj_le
+"""
+
+
+def url_canonique(url):
+    """URL de la fiche sans paramètres (aid, label, srpvid... changent à chaque recherche)."""
+    morceaux = urlsplit(url)
+    return urlunsplit((morceaux.scheme, morceaux.netloc, morceaux.path, "", ""))
+
+
+class PipelineSQLite:
+
+    def __init__(self, chemin, taille_lot=200, intervalle=5.0):
+        self.chemin = chemin
+        self.taille_lot = taille_lot
+        self.intervalle = intervalle
+        self.lot = []
+        self.connexion = None
+        self.ecrits = 0
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        return cls(
+            settings.get("SQLITE_HOTELS_CHEMIN", "Destinations_infos.sqlite"),
+            settings.getint("SQLITE_TAILLE_LOT", 200),
+            settings.getfloat("SQLITE_INTERVALLE_S", 5.0),
+        )
+
+    def open_spider(self, spider):
+        self.connexion = sqlite3.connect(self.chemin)
+        self.connexion.execute("PRAGMA journal_mode=WAL")
+        self.connexion.execute(SCHEMA)
+        self.connexion.commit()
+        self.dernier_envoi = time.monotonic()
+
+    def process_item(self, item, spider):
+        maintenant = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.lot.append((url_canonique(item["Hotel_url"]), *(item.get(c) for c in COLONNES), maintenant))
+
+        if len(self.lot) >= self.taille_lot or time.monotonic() - self.dernier_envoi >= self.intervalle:
+            self.envoyer()
+        return item
+
+    def envoyer(self):
+        if self.lot:
+            with self.connexion:
+                self.connexion.executemany(UPSERT, self.lot)
+            self.ecrits += len(self.lot)
+            logger.debug("SQLite : %d hôtels écrits (%d au total)", len(self.lot), self.ecrits)
+            self.lot = []
+        self.dernier_envoi = time.monotonic()
+
+    def close_spider(self, spider):
+        self.envoyer()
+        self.connexion.close()
+        logger.info("SQLite : %d hôtels écrits dans %s", self.ecrits, self.chemin)
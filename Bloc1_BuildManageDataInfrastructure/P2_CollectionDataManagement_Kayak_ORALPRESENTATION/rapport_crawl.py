@@ -0,0 +1,79 @@
+"""
+Extension Scrapy : rapport de débit en fin de crawl.
+
+Pages par seconde, latence de téléchargement (moyenne, p50, p95, max),
+octets reçus et réponses servies par le cache HTTP. Le rapport est écrit
+dans le log, dans les stats Scrapy (rapport/*) et, si le réglage
+RAPPORT_CRAWL_FICHIER est défini, dans un fichier JSON.
+"""
+import json
+import time
+import logging
+
+import numpy as np
+from scrapy import signals
+
+logger = logging.getLogger(__name__)
+
+
+class RapportCrawl:
+
+    def __init__(self, stats, fichier=None):
+        self.stats = stats
+        self.fichier = fichier
+        self.latences = []
+        self.octets = 0
+        self.pages = 0
+        self.pages_cache = 0
+        self.debut = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        ext = cls(crawler.stats, crawler.settings.get("RAPPORT_CRAWL_FICHIER"))
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.response_received, signal=signals.response_received)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def spider_opened(self, spider):
+        self.debut = time.monotonic()
+
+    def response_received(self, response, request, spider):
+        self.pages += 1
+        self.octets += len(response.body)
+        if "cached" in response.flags:
+            # Servie par le cache : pas de téléchargement, donc pas de latence
+            self.pages_cache += 1
+        elif "download_latency" in request.meta:
+            self.latences.append(request.meta["download_latency"])
+
+    def rapport(self):
+        duree = max(time.monotonic() - self.debut, 1e-9)
+        latences = np.asarray(self.latences) if self.latences else np.zeros(1)
+        return {
+            "pages": self.pages,
+            "pages_cache": self.pages_cache,
+            "duree_s": round(duree, 3),
+            "pages_par_s": round(self.pages / duree, 2),
+            "latence_moyenne_s": round(float(latences.mean()), 4),
+            "latence_p50_s": round(float(np.percentile(latences, 50)), 4),
+            "latence_p95_s": round(float(np.percentile(latences, 95)), 4),
+            "latence_max_s": round(float(latences.max()), 4),
+            "octets": self.octets,
+            "octets_par_s": round(self.octets / duree),
+            "items": self.stats.get_value("item_scraped_count", 0),
+        }
+
+    def spider_closed(self, spider, reason):
+        rapport = self.rapport()
+        for cle, valeur in rapport.items():
+            self.stats.set_value(f"rapport/{cle}", valeur)
+
+        logger.info(
+            "Rapport crawl : %(pages)d pages (%(pages_cache)d depuis le cache) en %(duree_s).1f s, "
+            "%(pages_par_s).1f pages/s, latence p50 %(latence_p50_s).3f s / p95 %(latence_p95_s).3f s, "
+            "%(octets)d octets, %(items)d items", rapport
+        )
+        if self.fichier:
+            with open(self.fichier, "w", encoding="utf-8") as f:
+                json.dump(rapport, f, indent=2)
@@ -0,0 +1,161 @@
+"""
+Recrawl incrémental des fiches hôtel (profil "incremental").
+
+Pour chaque fiche (URL sans paramètres de suivi), la table etat_fiches garde
+l'ETag, le Last-Modified et l'empreinte des champs extraits (note,
+description, coordonnées) du dernier passage.
+
+- RequetesConditionnelles (middleware de téléchargement) ajoute If-None-Match /
+  If-Modified-Since aux requêtes de fiches : une fiche inchangée côté serveur
+  revient en 304, sans corps, et n'est pas parsée.
+- Sur une réponse 200, EtatFiches.comparer() confronte l'empreinte des champs
+  à la précédente : le spider n'émet que les fiches nouvelles ou modifiées.
+"""
+import json
+import sqlite3
+import hashlib
+import logging
+from datetime import datetime, timezone
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+
+from pipeline_sqlite import url_canonique
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS etat_fiches (
+    url_canonique TEXT PRIMARY KEY,
+    etag          TEXT,
+    last_modified TEXT,
+    empreinte     TEXT,
+    vu_le         TEXT NOT NULL
+)
+"""
+
+CHAMPS_SUIVIS = ["score", "description", "latitude", "longitude"]
+
+
+def empreinte_champs(champs):
+    contenu = json.dumps([champs.get(c) for c in CHAMPS_SUIVIS], ensure_ascii=False)
+    return hashlib.sha1(contenu.encode("utf-8")).hexdigest()
+
+
+def _entete(headers, nom):
+    valeur = headers.get(nom)
+    return valeur.decode("latin-1") if valeur else None
+
+
+class EtatFiches:
+    """État du dernier passage, chargé en mémoire à l'ouverture, réécrit à la fermeture."""
+
+    def __init__(self, chemin):
+        self.chemin = chemin
+        self.connexion = sqlite3.connect(chemin)
+        self.connexion.execute("PRAGMA journal_mode=WAL")
+        self.connexion.execute(SCHEMA)
+        self.etats = {
+            url: {"etag": etag, "last_modified": lm, "empreinte": empreinte}
+            for url, etag, lm, empreinte in self.connexion.execute(
+                "SELECT url_canonique, etag, last_modified, empreinte FROM etat_fiches"
+            )
+        }
+        self.modifies = {}
+        self.vus = set()
+
+    def entetes_conditionnels(self, url):
+        etat = self.etats.get(url_canonique(url))
+        if etat is None:
+            return {}
+        entetes = {}
+        if etat["etag"]:
+            entetes["If-None-Match"] = etat["etag"]
+        if etat["last_modified"]:
+            entetes["If-Modified-Since"] = etat["last_modified"]
+        return entetes
+
+    def non_modifiee(self, url):
+        # 304 : rien à relire, seule la date de passage change
+        self.vus.add(url_canonique(url))
+
+    def comparer(self, url, champs, headers):
+        """
+        Enregistre le nouvel état ; renvoie 'nouveau' / 'modifie', ou None si
+        les champs suivis n'ont pas changé depuis le dernier passage.
+        """
+        cle = url_canonique(url)
+        empreinte = empreinte_champs(champs)
+        precedent = self.etats.get(cle)
+
+        etat = {
+            "etag": _entete(headers, "ETag"),
+            "last_modified": _entete(headers, "Last-Modified"),
+            "empreinte": empreinte,
+        }
+        self.etats[cle] = etat
+        self.modifies[cle] = etat
+        self.vus.add(cle)
+
+        if precedent is None:
+            return "nouveau"
+        return None if precedent["empreinte"] == empreinte else "modifie"
+
+    def fermer(self):
+        maintenant = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        with self.connexion:
+            self.connexion.executemany(
+                """INSERT INTO etat_fiches VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT (url_canonique) DO UPDATE SET
+                       etag = excluded.etag, last_modified = excluded.last_modified,
+                       empreinte = excluded.empreinte, vu_le = excluded.vu_le""",
+                [(cle, e["etag"], e["last_modified"], e["empreinte"], maintenant) for cle, e in self.modifies.items()]
+            )
+            self.connexion.executemany(
+                "UPDATE etat_fiches SET vu_le = ? WHERE url_canonique = ?",
+                [(maintenant, cle) for cle in self.vus - self.modifies.keys()]
+            )
+        self.connexion.close()
+
+
+class RequetesConditionnelles:
+
+    def __init__(self, chemin, stats):
+        self.chemin = chemin
+        self.stats = stats
+        self.etat = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("INCREMENTAL_ACTIF"):
+            raise NotConfigured
+        settings = crawler.settings
+        chemin = settings.get("INCREMENTAL_CHEMIN") or settings.get("SQLITE_HOTELS_CHEMIN", "Destinations_infos.sqlite")
+        mw = cls(chemin, crawler.stats)
+        crawler.signals.connect(mw.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(mw.spider_closed, signal=signals.spider_closed)
+        return mw
+
+    def spider_opened(self, spider):
+        self.etat = EtatFiches(self.chemin)
+        # Utilisé par parse_hotel pour n'émettre que les différences
+        spider.etat_fiches = self.etat
+        logger.info("Incrémental : %d fiches connues", len(self.etat.etats))
+
+    def spider_closed(self, spider):
+        self.etat.fermer()
+
+    def process_request(self, request, spider):
+        if request.meta.get("fiche_hotel"):
+            for nom, valeur in self.etat.entetes_conditionnels(request.url).items():
+                request.headers.setdefault(nom, valeur)
+        return None
+
+    def process_response(self, request, response, spider):
+        if request.meta.get("fiche_hotel"):
+            if response.status == 304:
+                self.etat.non_modifiee(request.url)
+                self.stats.inc_value("incremental/non_modifiees_304")
+            else:
+                self.stats.inc_value("incremental/telechargees")
+        return response
@@ -0,0 +1,110 @@
+"""
+Extraction des champs d'une fiche hôtel Booking (note, description, coordonnées).
+
+Même cascade que les sélecteurs d'origine de parse_hotel, dans le même ordre,
+mais chaque règle est une expression XPath lxml compilée une seule fois et
+évaluée directement sur l'arbre (sans passer par parsel ni retraduire le CSS).
+Les règles ne sont évaluées qu'au besoin : un champ s'arrête à la première
+règle qui donne une valeur.
+
+Résultats typés : note et coordonnées en float, None si absentes.
+"""
+import re
+
+from lxml import etree
+
+# Règle -> expression. Les filtres passent par l'axe attribut
+# (*/@data-testid[.='x']/..) plutôt que par un prédicat sur chaque élément
+# (*[@data-testid='x']) : libxml2 parcourt ainsi le DOM environ trois fois plus vite
+REGLES = {
+    "score_composant": "descendant-or-self::div/@data-testid[.='review-score-right-component']"
+                       "/../div[@aria-hidden='true']/text()",
+    "score": "descendant-or-self::*/@data-testid[.='review-score']/../text()",
+    "score_externe": "descendant-or-self::*/@data-testid[.='external-review-score']/../text()",
+    "score_sous_composant": "descendant-or-self::*/@data-testid[.='review-score-subcomponent']/../text()",
+    "description": "descendant-or-self::*/@data-testid[.='property-description']/../text()",
+    # '#property_description_content p' : paragraphes descendants, pas l'élément lui-même
+    "description_contenu": "descendant-or-self::*/@id[.='property_description_content']/../descendant::p/text()",
+    "description_meta": "descendant-or-self::meta/@name[.='description']/../@content",
+    "atlas": "descendant-or-self::*/@data-atlas-latlng",
+    "lat_meta": "descendant-or-self::meta/@property[.='booking_com:location:latitude']/../@content",
+    "lng_meta": "descendant-or-self::meta/@property[.='booking_com:location:longitude']/../@content",
+    "lat_data": "descendant-or-self::*/@data-lat",
+    "lng_data": "descendant-or-self::*/@data-lon",
+}
+XPATHS = {regle: etree.XPath(expression, smart_strings=False) for regle, expression in REGLES.items()}
+
+# Cascades, de la règle prioritaire à la dernière solution
+CASCADE_SCORE = ["score_composant", "score", "score_externe", "score_sous_composant"]
+CASCADE_LATLNG = [("atlas",), ("lat_meta", "lng_meta"), ("lat_data", "lng_data")]
+
+RE_SCORE = re.compile(r"\d+[.,]?\d*")
+
+
+def _premier(root, regle):
+    valeurs = XPATHS[regle](root)
+    return valeurs[0] if valeurs else None
+
+
+def _tous(root, regles):
+    """Première valeur de chaque règle ; None dès qu'une manque, sans évaluer les suivantes."""
+    valeurs = []
+    for regle in regles:
+        valeur = _premier(root, regle)
+        if not valeur:
+            return None
+        valeurs.append(valeur)
+    return valeurs
+
+
+def _joindre(root, regle):
+    return " ".join(t.strip() for t in XPATHS[regle](root) if t.strip())
+
+
+def _float(texte):
+    try:
+        return float(texte.strip().replace(",", "."))
+    except (AttributeError, ValueError):
+        return None
+
+
+def convertir_score(texte):
+    """'8,9' / 'Note : 8.9' -> 8.9 ; None si aucun nombre."""
+    if not texte:
+        return None
+    nombre = RE_SCORE.search(texte)
+    return float(nombre.group(0).replace(",", ".")) if nombre else None
+
+
+def extraire_hotel(root):
+    """
+    root : élément lxml de la page (response.selector.root).
+    Renvoie score (float), description (str), latitude / longitude (float) ; None si absent.
+    """
+    score_texte = next((v for v in (_premier(root, r) for r in CASCADE_SCORE) if v), None)
+
+    description = (
+        _joindre(root, "description")
+        or _joindre(root, "description_contenu")
+        or _premier(root, "description_meta")
+    )
+
+    latitude, longitude = None, None
+    for regles in CASCADE_LATLNG:
+        valeurs = _tous(root, regles)
+        if valeurs is None:
+            # Paire incomplète (ex. latitude sans longitude) : règle suivante
+            continue
+        if len(valeurs) == 1:
+            if "," not in valeurs[0]:
+                continue
+            valeurs = valeurs[0].split(",", 1)
+        latitude, longitude = _float(valeurs[0]), _float(valeurs[1])
+        break
+
+    return {
+        "score": convertir_score(score_texte),
+        "description": description.strip() if description else None,
+        "latitude": latitude,
+        "longitude": longitude,
+    }
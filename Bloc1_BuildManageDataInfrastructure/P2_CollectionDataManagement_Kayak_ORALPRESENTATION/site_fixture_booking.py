@@ -0,0 +1,171 @@
+"""
+Faux site Booking local pour mesurer le spider sans toucher booking.com.
+
+- /searchresults.fr.html?ss=<ville> : 25 cartes d'hôtel, même structure que
+  les résultats Booking (h3/a/div pour le nom, lien vers la fiche).
+- /hotel/fr/<ville>-<i>.fr.html : fiche d'hôtel avec note, description et
+  coordonnées, en alternant les variantes rencontrées sur le vrai site
+  (data-atlas-latlng, balises meta booking_com:location, data-lat / data-lon,
+  aucune coordonnée ; note principale ou de repli ; description principale
+  ou dans #property_description_content).
+
+Chaque réponse est retardée de `latence` secondes pour simuler le réseau.
+Les fiches portent un ETag et un Last-Modified et répondent 304 à une requête
+conditionnelle si elles n'ont pas changé ; `revision` (serveur.revision)
+modifie la note d'un hôtel sur dix pour simuler une mise à jour du site.
+
+Usage : python site_fixture_booking.py [--port 8000] [--latence 0.05]
+"""
+import re
+import time
+import zlib
+import argparse
+import threading
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, quote, unquote
+
+N_HOTELS = 25
+DATE_PUBLICATION = 1_700_000_000   # Last-Modified des fiches (horodatage fixe)
+
+DESCRIPTION = (
+    "L'établissement {nom} vous accueille à {ville}, à quelques minutes du centre. "
+    "Il propose une connexion Wi-Fi gratuite, une terrasse et un parking privé. "
+) * 4
+
+
+def _graine(texte):
+    return zlib.crc32(texte.encode("utf-8"))
+
+
+def page_recherche(ville):
+    cartes = []
+    for i in range(N_HOTELS):
+        nom = f"Hôtel {ville} {i}"
+        lien = f"/hotel/fr/{quote(ville.lower().replace(' ', '-'))}-{i}.fr.html?aid=304142&hpos={i + 1}"
+        cartes.append(
+            f'<div data-testid="property-card"><h3><a data-testid="title-link" href="{escape(lien)}">'
+            f'<div data-testid="title">{escape(nom)}</div></a></h3>'
+            f'<div class="prix">{80 + _graine(nom) % 200} €</div></div>'
+        )
+    return (
+        f"<html><head><title>{escape(ville)} : hôtels</title></head><body>"
+        f"<h1>{escape(ville)} : {N_HOTELS} établissements trouvés</h1>{''.join(cartes)}</body></html>"
+    )
+
+
+def page_hotel(ville, i, revision=0):
+    nom = f"Hôtel {ville} {i}"
+    graine = _graine(nom)
+    if i % 10 == 0:
+        graine += revision
+    score = f"{6 + graine % 40 / 10:.1f}".replace(".", ",")
+    lat = 42.5 + (graine % 10000) / 2000
+    lng = -1.0 + (graine // 10000 % 10000) / 1200
+    description = escape(DESCRIPTION.format(nom=nom, ville=ville))
+
+    variante = i % 6
+    meta = ""
+    if variante == 3:
+        # Sans data-atlas-latlng : coordonnées dans les balises meta
+        meta = (f'<meta property="booking_com:location:latitude" content="{lat:.6f}">'
+                f'<meta property="booking_com:location:longitude" content="{lng:.6f}">')
+        carte = '<div id="carte"></div>'
+    elif variante == 4:
+        carte = f'<div id="carte" data-lat="{lat:.6f}" data-lon="{lng:.6f}"></div>'
+    elif variante == 5:
+        # Ni coordonnées ni bloc de note principal
+        carte = '<div id="carte"></div>'
+    else:
+        carte = f'<a id="hotel_address" data-atlas-latlng="{lat:.6f},{lng:.6f}">Voir sur la carte</a>'
+
+    if variante == 5:
+        note = f'<span data-testid="review-score">{score}</span>'
+    else:
+        note = (f'<div data-testid="review-score-right-component"><div aria-hidden="true">{score}</div>'
+                f'<div>Fabuleux</div></div>')
+
+    if i % 5 == 2:
+        bloc_description = f'<div id="property_description_content"><p>{description}</p></div>'
+    else:
+        bloc_description = f'<p data-testid="property-description">{description}</p>'
+
+    return (
+        f'<html><head><title>{escape(nom)}</title>'
+        f'<meta name="description" content="{escape(nom)} à {escape(ville)}">{meta}</head><body>'
+        f'<h2>{escape(nom)}</h2>{carte}{note}{bloc_description}'
+        + '<div class="equipements">' + "<span>Équipement</span>" * 200 + '</div>'
+        + '</body></html>'
+    )
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    latence = 0.0
+    revision = 0
+
+    def do_GET(self):
+        time.sleep(self.latence)
+        url = urlparse(self.path)
+
+        if url.path == "/searchresults.fr.html":
+            ville = parse_qs(url.query).get("ss", [""])[0]
+            return self._envoyer(page_recherche(ville))
+
+        hotel = re.fullmatch(r"/hotel/fr/(.+)-(\d+)\.fr\.html", url.path)
+        if hotel:
+            ville = unquote(hotel.group(1)).replace("-", " ").title()
+            revision = self.server.revision
+            return self._envoyer(page_hotel(ville, int(hotel.group(2)), revision), conditionnel=True)
+
+        self.send_error(404)
+
+    def _envoyer(self, html, conditionnel=False):
+        corps = html.encode("utf-8")
+        if conditionnel:
+            etag = f'"{zlib.crc32(corps):08x}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(corps)))
+        if conditionnel:
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", self.date_time_string(DATE_PUBLICATION))
+        self.end_headers()
+        self.wfile.write(corps)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ServeurFixture(ThreadingHTTPServer):
+    # File d'attente listen() de 5 par défaut : au-delà, les connexions
+    # simultanées d'un crawl concurrent attendent la retransmission SYN (1 s)
+    request_queue_size = 128
+
+
+def demarrer(port=0, latence=0.05):
+    """Lance le site dans un thread ; renvoie (serveur, url de base)."""
+    handler = type("Handler", (FixtureHandler,), {"latence": latence})
+    serveur = ServeurFixture(("127.0.0.1", port), handler)
+    serveur.daemon_threads = True
+    serveur.revision = 0
+    threading.Thread(target=serveur.serve_forever, daemon=True).start()
+    return serveur, f"http://127.0.0.1:{serveur.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latence", type=float, default=0.05)
+    args = parser.parse_args()
+
+    serveur, url = demarrer(args.port, args.latence)
+    print(f"Site fixture sur {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        serveur.shutdown()
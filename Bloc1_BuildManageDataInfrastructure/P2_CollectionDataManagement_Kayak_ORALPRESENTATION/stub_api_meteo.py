@@ -0,0 +1,134 @@
+"""
+Faux services Nominatim et OpenWeatherMap locaux, pour exercer
+collecte_meteo.py sans clé d'API ni trafic vers les vrais services.
+
+- /search?q=<ville>, France&format=json : [{"lat": ..., "lon": ...}],
+  [] pour une ville contenant "Introuvable".
+- /data/2.5/forecast?lat=..&lon=..&appid=.. : 40 prévisions 3 h déterministes.
+  Sans appid : 401 comme le vrai service.
+
+Sur les deux services, une requête sur `taux_erreur` répond 503 avec
+Retry-After (relances du client).
+
+Chaque réponse est retardée de `latence` secondes. Le serveur compte les
+requêtes par service et garde l'heure des requêtes Nominatim (serveur.horaires)
+pour vérifier l'espacement d'une seconde.
+
+Usage : python stub_api_meteo.py [--port 8001] [--latence 0.2]
+"""
+import json
+import time
+import zlib
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+CONDITIONS = ["Clear", "Clouds", "Rain", "Mist", "Snow", "Drizzle"]
+
+
+def _graine(texte):
+    return zlib.crc32(texte.encode("utf-8"))
+
+
+def reponse_nominatim(requete):
+    if "Introuvable" in requete:
+        return []
+    graine = _graine(requete)
+    return [{
+        "lat": f"{42.5 + (graine % 10000) / 1100:.7f}",
+        "lon": f"{-4.5 + (graine // 10000 % 10000) / 800:.7f}",
+        "display_name": requete,
+    }]
+
+
+def reponse_forecast(lat, lon, n=40, debut=1_700_000_000):
+    graine = _graine(f"{float(lat):.4f},{float(lon):.4f}")
+    previsions = []
+    for k in range(n):
+        g = (graine + 7919 * k) % 100000
+        previsions.append({
+            "dt": debut + 3 * 3600 * k,
+            "main": {"temp": round(8 + g % 220 / 10, 2), "humidity": 40 + g % 55},
+            "wind": {"speed": round(g % 120 / 10, 2)},
+            "clouds": {"all": g % 101},
+            "weather": [{"main": CONDITIONS[g % len(CONDITIONS)]}],
+        })
+    return {"cod": "200", "cnt": n, "list": previsions}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    latence = 0.0
+    taux_erreur = 0.0
+
+    def do_GET(self):
+        time.sleep(self.latence)
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        if url.path == "/search":
+            with self.server.verrou:
+                self.server.compteurs["nominatim"] += 1
+                self.server.horaires.append(time.monotonic())
+            if random.random() < self.taux_erreur:
+                return self._json(503, {"message": "indisponible"}, {"Retry-After": "0"})
+            return self._json(200, reponse_nominatim(params.get("q", "")))
+
+        if url.path == "/data/2.5/forecast":
+            with self.server.verrou:
+                self.server.compteurs["forecast"] += 1
+            if not params.get("appid"):
+                return self._json(401, {"cod": 401, "message": "Invalid API key"})
+            if random.random() < self.taux_erreur:
+                return self._json(503, {"cod": 503, "message": "indisponible"}, {"Retry-After": "0"})
+            return self._json(200, reponse_forecast(params["lat"], params["lon"]))
+
+        self._json(404, {"message": "inconnu"})
+
+    def _json(self, statut, contenu, entetes=None):
+        corps = json.dumps(contenu).encode("utf-8")
+        self.send_response(statut)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(corps)))
+        for nom, valeur in (entetes or {}).items():
+            self.send_header(nom, valeur)
+        self.end_headers()
+        self.wfile.write(corps)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def intervalle_min_nominatim(serveur):
+    """Plus petit écart (s) entre deux requêtes Nominatim reçues, None si moins de deux."""
+    horaires = sorted(serveur.horaires)
+    ecarts = [b - a for a, b in zip(horaires, horaires[1:])]
+    return min(ecarts) if ecarts else None
+
+
+def demarrer(port=0, latence=0.2, taux_erreur=0.0):
+    """Lance les deux services dans un thread ; renvoie (serveur, url de base)."""
+    handler = type("Handler", (StubHandler,), {"latence": latence, "taux_erreur": taux_erreur})
+    serveur = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    serveur.daemon_threads = True
+    serveur.verrou = threading.Lock()
+    serveur.compteurs = {"nominatim": 0, "forecast": 0}
+    serveur.horaires = []
+    threading.Thread(target=serveur.serve_forever, daemon=True).start()
+    return serveur, f"http://127.0.0.1:{serveur.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latence", type=float, default=0.2)
+    parser.add_argument("--taux-erreur", type=float, default=0.0)
+    args = parser.parse_args()
+
+    serveur, url = demarrer(args.port, args.latence, args.taux_erreur)
+    print(f"Nominatim : {url}/search  OpenWeatherMap : {url}/data/2.5/forecast")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        serveur.shutdown()
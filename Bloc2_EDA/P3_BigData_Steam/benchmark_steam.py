@@ -0,0 +1,78 @@
+"""
+Spark local (steam_pipeline.py) contre Polars mono-machine (steam_polars.py)
+sur le même échantillon.
+
+Les deux moteurs écrivent leurs agrégats en CSV ; le script vérifie qu'ils
+sont identiques (mêmes lignes, flottants à une tolérance relative près,
+l'ordre de sommation différant d'un moteur à l'autre), puis compare les
+durées : démarrage de la JVM, ingestion + Parquet, analyses.
+
+Usage : python benchmark_steam.py [--jeux 55000] [--dossier bench_steam]
+"""
+import json
+import time
+import argparse
+from pathlib import Path
+
+import polars as pl
+from polars.testing import assert_frame_equal
+
+import steam_pipeline
+import steam_polars
+from echantillon_steam import generer
+
+FLOTTANTS = (pl.Float32, pl.Float64)
+
+
+def normaliser(df):
+    """Colonnes non flottantes en texte (true/"true", 5/5.0...), lignes triées."""
+    df = df.with_columns(pl.exclude(FLOTTANTS).cast(pl.String))
+    cles = [c for c, t in df.schema.items() if t not in FLOTTANTS]
+    return df.sort(cles + [c for c in df.columns if c not in cles], nulls_last=True)
+
+
+def comparer(dossier_spark, dossier_polars, noms):
+    ecarts = []
+    for nom in noms:
+        spark = normaliser(pl.read_csv(f"{dossier_spark}/{nom}/*.csv", infer_schema_length=None))
+        local = normaliser(pl.read_csv(f"{dossier_polars}/{nom}.csv", infer_schema_length=None))
+        try:
+            assert_frame_equal(spark, local, check_dtypes=False, check_exact=False, rtol=1e-9)
+        except AssertionError as erreur:
+            ecarts.append(nom)
+            print(f"  {nom} : DIFFÉRENT\n{erreur}")
+    return ecarts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jeux", type=int, default=55_000, help="taille de l'échantillon (~ fichier S3 complet)")
+    parser.add_argument("--dossier", default="bench_steam")
+    parser.add_argument("--partitions", type=int, default=8)
+    args = parser.parse_args()
+
+    dossier = Path(args.dossier)
+    dossier.mkdir(exist_ok=True)
+    entree = dossier / "steam_game_sample.json"
+    with open(entree, "w", encoding="utf-8") as f:
+        json.dump(generer(args.jeux), f, ensure_ascii=False)
+
+    debut = time.perf_counter()
+    spark = steam_pipeline.creer_session(partitions=args.partitions)
+    t_jvm = time.perf_counter() - debut
+    t_spark = steam_pipeline.executer(spark, str(entree), str(dossier / "spark"))
+    spark.stop()
+
+    t_polars = steam_polars.executer(str(entree), str(dossier / "polars"))
+
+    noms = sorted(p.name for p in (dossier / "spark" / "agregats").iterdir() if p.is_dir())
+    ecarts = comparer(dossier / "spark" / "agregats", dossier / "polars" / "agregats", noms)
+
+    print(f"\n{args.jeux} jeux, {len(noms)} agrégats : "
+          f"{'identiques' if not ecarts else f'{len(ecarts)} différent(s) : ' + ', '.join(ecarts)}")
+    print(f"{'':24}{'Spark local':>14}{'Polars':>12}")
+    print(f"{'démarrage (JVM)':24}{t_jvm:13.1f}s{0:11.1f}s")
+    print(f"{'ingestion + Parquet':24}{t_spark[0]:13.1f}s{t_polars[0]:11.1f}s")
+    print(f"{'analyses':24}{t_spark[1]:13.1f}s{t_polars[1]:11.1f}s")
+    total_spark, total_polars = t_jvm + sum(t_spark), sum(t_polars)
+    print(f"{'total':24}{total_spark:13.1f}s{total_polars:11.1f}s  (x{total_spark / total_polars:.1f})")
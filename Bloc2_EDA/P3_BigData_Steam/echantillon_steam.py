@@ -0,0 +1,80 @@
+"""
+Échantillon local de steam_game_output.json (même structure que le fichier
+S3 : un tableau JSON de {"id", "data": {...}}), pour lancer les pipelines
+sans Databricks ni accès au bucket.
+
+Valeurs synthétiques mais mêmes formats que les vraies données : prix en
+centimes dans une chaîne, owners en intervalle "20,000 .. 50,000", date
+"2020/5/14" (parfois vide), tags en objet {tag: votes} (liste vide si aucun),
+plateformes en objet de booléens, publisher parfois vide.
+
+Usage : python echantillon_steam.py [--jeux 5000] [--sortie steam_game_sample.json]
+"""
+import json
+import random
+import argparse
+
+GENRES = ["Action", "Adventure", "Casual", "Indie", "RPG", "Simulation", "Strategy", "Early Access",
+          "Free to Play", "Sports", "Racing", "Massively Multiplayer"]
+CATEGORIES = ["Single-player", "Steam Achievements", "Steam Cloud", "Full controller support", "Multi-player",
+              "Steam Trading Cards", "Partial Controller Support", "PvP", "Co-op", "Steam Leaderboards",
+              "Online PvP", "Remote Play Together", "Shared/Split Screen", "Stats", "Includes level editor"]
+TAGS = ["1980s", "1990's", "2D", "3D", "Action", "Action RPG", "Adventure", "Atmospheric", "Casual", "Colorful",
+        "Exploration", "First-Person", "Indie", "Multiplayer", "Open World", "Pixel Graphics", "Puzzle", "RPG",
+        "Shooter", "Simulation", "Singleplayer", "Story Rich", "Strategy", "Survival", "Horror", "Sci-fi",
+        "Fantasy", "Retro", "Funny", "Relaxing"]
+LANGUES = ["English", "German", "French", "Russian", "Simplified Chinese", "Spanish - Spain", "Japanese",
+           "Italian", "Portuguese - Brazil", "Korean"]
+OWNERS = ["0 .. 20,000", "20,000 .. 50,000", "50,000 .. 100,000", "100,000 .. 200,000", "200,000 .. 500,000",
+          "500,000 .. 1,000,000", "1,000,000 .. 2,000,000", "10,000,000 .. 20,000,000"]
+PRIX = [0, 0, 0, 0, 99, 199, 499, 499, 999, 1499, 1999, 2999, 3999, 5999]
+AGES = ["0", "0", "0", "0", "12", "16", "18", "MA 15+", "7"]
+PUBLISHERS = [f"Publisher {i}" for i in range(300)] + [""]
+
+
+def jeu(appid, rng):
+    prix_initial = rng.choice(PRIX)
+    remise = rng.choice([0] * 9 + [10, 25, 50, 70, 90]) if prix_initial else 0
+    prix = round(prix_initial * (100 - remise) / 100)
+    annee = rng.randint(2000, 2023)
+    date = "" if rng.random() < 0.02 else f"{annee}/{rng.randint(1, 12)}/{rng.randint(1, 28)}"
+    publisher = rng.choice(PUBLISHERS)
+    return {
+        "appid": appid,
+        "categories": rng.sample(CATEGORIES, rng.randint(1, 5)),
+        "ccu": rng.randint(0, 5000),
+        "developer": publisher.replace("Publisher", "Studio"),
+        "discount": str(remise),
+        "genre": ", ".join(rng.sample(GENRES, rng.randint(1, 4))),
+        "header_image": f"https://cdn.akamai.steamstatic.com/steam/apps/{appid}/header.jpg",
+        "initialprice": str(prix_initial),
+        "languages": ", ".join(["English"] + rng.sample(LANGUES[1:], rng.randint(0, 5))),
+        "name": f"Jeu {appid}",
+        "negative": rng.randint(0, 2000),
+        "owners": rng.choice(OWNERS),
+        "platforms": {"windows": rng.random() < 0.999, "mac": rng.random() < 0.23, "linux": rng.random() < 0.15},
+        "positive": rng.randint(0, 20000),
+        "price": str(prix),
+        "publisher": publisher,
+        "release_date": date,
+        "required_age": rng.choice(AGES),
+        "short_description": f"Description du jeu {appid}.",
+        # SteamSpy renvoie une liste vide, pas un objet, pour un jeu sans tag
+        "tags": {tag: rng.randint(1, 5000) for tag in rng.sample(TAGS, rng.randint(1, 12))} if rng.random() > 0.03 else [],
+    }
+
+
+def generer(n, graine=0):
+    rng = random.Random(graine)
+    return [{"id": str(10 * (i + 1)), "data": jeu(10 * (i + 1), rng)} for i in range(n)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jeux", type=int, default=5000)
+    parser.add_argument("--sortie", default="steam_game_sample.json")
+    args = parser.parse_args()
+
+    with open(args.sortie, "w", encoding="utf-8") as f:
+        json.dump(generer(args.jeux), f, ensure_ascii=False, indent=1)
+    print(f"{args.jeux} jeux écrits dans {args.sortie}")
@@ -0,0 +1,263 @@
+"""
+Version Spark locale du notebook Steam.ipynb, sans Databricks.
+
+1. Le JSON (multiline) est lu et parsé une seule fois, avec un schéma
+   explicite (tags en map<string,bigint>) ; tout le nettoyage du notebook
+   (prix, plateformes, dates, owners, genres, langues) tient en une seule
+   projection, gardée en cache (df_clean).
+2. df_clean est écrit en Parquet partitionné par release_year.
+3. Toutes les analyses du notebook (publishers, genres, catégories, tags,
+   sorties par année, prix, remises, langues, âges, plateformes, notes)
+   tournent ensuite depuis ce Parquet, relu une fois et mis en cache ; genres,
+   catégories et tags sont comptés ensemble en une seule agrégation. Chaque
+   résultat est écrit en CSV dans <sortie>/agregats/<nom>.
+
+Usage : python echantillon_steam.py && python steam_pipeline.py --entree steam_game_sample.json --sortie steam_sortie
+"""
+import time
+import argparse
+
+from pyspark import StorageLevel
+from pyspark.sql import SparkSession
+from pyspark.sql import functions as F
+from pyspark.sql.types import (
+    ArrayType, BooleanType, LongType, MapType, StringType, StructField, StructType,
+)
+
+PLATEFORMES = ["windows", "mac", "linux"]
+
+# Tags : {tag: votes} -> map<string,bigint>, au lieu d'un struct de plusieurs
+# centaines de champs inféré par Spark. La colonne est lue en texte JSON brut
+# puis convertie par from_json : un jeu sans tag ("tags": []) donne NULL
+# au lieu de faire échouer la ligne.
+SCHEMA_TAGS = MapType(StringType(), LongType())
+
+# Schéma explicite du fichier (printSchema du notebook) : pas de passe
+# d'inférence sur tout le JSON avant la lecture
+SCHEMA_BRUT = StructType([
+    StructField("id", StringType()),
+    StructField("data", StructType([
+        StructField("appid", LongType()),
+        StructField("categories", ArrayType(StringType())),
+        StructField("ccu", LongType()),
+        StructField("developer", StringType()),
+        StructField("discount", StringType()),
+        StructField("genre", StringType()),
+        StructField("header_image", StringType()),
+        StructField("initialprice", StringType()),
+        StructField("languages", StringType()),
+        StructField("name", StringType()),
+        StructField("negative", LongType()),
+        StructField("owners", StringType()),
+        StructField("platforms", StructType([
+            StructField(plateforme, BooleanType()) for plateforme in ["linux", "mac", "windows"]
+        ])),
+        StructField("positive", LongType()),
+        StructField("price", StringType()),
+        StructField("publisher", StringType()),
+        StructField("release_date", StringType()),
+        StructField("required_age", StringType()),
+        StructField("short_description", StringType()),
+        StructField("tags", StringType()),
+    ])),
+])
+
+
+def creer_session(nom="steam_pipeline", partitions=8, memoire="4g"):
+    return (
+        SparkSession.builder
+        .master("local[*]")
+        .appName(nom)
+        # 200 partitions de shuffle par défaut : bien trop pour une machine
+        .config("spark.sql.shuffle.partitions", partitions)
+        .config("spark.driver.memory", memoire)
+        .getOrCreate()
+    )
+
+
+def lire_brut(spark, chemin):
+    return spark.read.schema(SCHEMA_BRUT).json(chemin, multiLine=True)
+
+
+def nettoyer(df):
+    """Nettoyage du notebook (section Cleaning) en une seule projection."""
+    data = df.select("id", "data.*")
+
+    # Prix en centimes -> euros, remise recalculée (NULL si gratuit)
+    price = F.col("price").cast("int") / 100
+    initialprice = F.col("initialprice").cast("int") / 100
+    calc_discount = F.when(initialprice > 0, (initialprice - price) / initialprice * 100).otherwise(None)
+
+    # Dates : "2020/5/14" -> année, mois, date approximative au 1er du mois
+    release_date_raw = F.when(
+        F.col("release_date").isNull() | (F.col("release_date") == ""), None
+    ).otherwise(F.col("release_date"))
+    release_year = F.regexp_extract(release_date_raw, r"^(\d{4})", 1).cast("int")
+    release_month = F.regexp_extract(release_date_raw, r"^\d{4}/(\d{1,2})", 1).cast("int")
+    date_connue = release_year.isNotNull() & release_month.isNotNull()
+    mois = F.lpad(release_month.cast("string"), 2, "0")   # mois toujours sur 2 chiffres
+
+    # Owners : "20,000 .. 50,000" -> min, max, moyenne
+    bornes = F.split(F.regexp_replace("owners", " ", ""), r"\.\.")
+    owners_min = F.regexp_replace(bornes.getItem(0), ",", "").cast(LongType())
+    owners_max = F.regexp_replace(bornes.getItem(1), ",", "").cast(LongType())
+
+    remplacees = {"price", "initialprice", "release_date", "platforms", "owners", "tags"}
+    return data.select(
+        *[c for c in data.columns if c not in remplacees],
+        price.alias("price"),
+        initialprice.alias("initialprice"),
+        calc_discount.alias("calc_discount"),
+        F.split(F.col("languages"), ", ").alias("languages_array"),
+        F.col("platforms.windows").alias("windows"),
+        F.col("platforms.mac").alias("mac"),
+        F.col("platforms.linux").alias("linux"),
+        release_date_raw.alias("release_date_raw"),
+        release_year.alias("release_year"),
+        release_month.alias("release_month"),
+        F.when(date_connue, F.to_date(F.concat_ws("-", release_year, mois, F.lit("01")), "yyyy-MM-dd"))
+         .alias("release_date"),
+        F.when(date_connue, F.concat_ws("-", release_year, mois)).alias("release_year_month"),
+        owners_min.alias("owners_min"),
+        owners_max.alias("owners_max"),
+        ((owners_min + owners_max) / 2).cast(LongType()).alias("owners_mean"),
+        F.split(F.col("genre"), r",\s*").alias("genres_array"),
+        F.from_json("tags", SCHEMA_TAGS).alias("tags"),
+    )
+
+
+def ecrire_parquet(df_clean, dossier):
+    # Un fichier par année plutôt qu'un par (année, partition d'entrée)
+    (df_clean.repartition("release_year")
+             .write.mode("overwrite")
+             .partitionBy("release_year")
+             .parquet(dossier))
+
+
+def comptes_etiquettes(df):
+    """
+    Genres, catégories et tags comptés dans un seul job : les trois listes de
+    chaque jeu sont mises bout à bout en (type, valeur, poids), explosées une
+    fois, puis agrégées par (type, valeur).
+    jeux = nombre de jeux ; total = somme des poids (votes pour un tag, 1 sinon).
+    """
+    def etiquettes(type_, valeur, poids):
+        return F.struct(F.lit(type_).alias("type"), valeur.alias("valeur"), poids.cast(LongType()).alias("poids"))
+
+    vide = F.array().cast(ArrayType(StringType()))
+    toutes = F.concat(
+        F.transform(F.coalesce("genres_array", vide), lambda g: etiquettes("genre", g, F.lit(1))),
+        F.transform(F.coalesce("categories", vide), lambda c: etiquettes("category", c, F.lit(1))),
+        F.transform(F.map_entries(F.coalesce("tags", F.create_map().cast(SCHEMA_TAGS))),
+                    lambda t: etiquettes("tag", t["key"], t["value"])),
+    )
+    return (
+        df.select(F.explode(toutes).alias("e"))
+          .groupBy("e.type", "e.valeur")
+          .agg(F.count("*").alias("jeux"), F.sum("e.poids").alias("total"))
+    )
+
+
+def agregats(df):
+    """Analyses du notebook, en DataFrames Spark (évaluées à l'écriture)."""
+    revenue = F.col("price") * F.col("owners_mean")
+    total_reviews = F.col("positive") + F.col("negative")
+
+    df_genres = (
+        df.withColumn("genre_exploded", F.explode("genres_array"))
+          .withColumn("review_ratio", F.when(total_reviews > 0, F.col("positive") / total_reviews))
+          .persist(StorageLevel.MEMORY_AND_DISK)
+    )
+
+    ratings = (
+        df.filter(total_reviews > 100)
+          .withColumn("total_reviews", total_reviews)
+          .withColumn("positive_ratio", F.col("positive") / F.col("total_reviews"))
+          .withColumn("score_weighted", F.col("positive_ratio") * F.log(F.col("total_reviews")))
+    )
+    z = 1.96
+    n, p = F.col("total_reviews"), F.col("positive_ratio")
+    ratings = ratings.withColumn(
+        "wilson_score",
+        (p + z ** 2 / (2 * n) - z * F.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2))) / (1 + z ** 2 / n),
+    )
+    colonnes_notes = ["name", "publisher", "release_year", "total_reviews", "positive_ratio"]
+
+    etiquettes = comptes_etiquettes(df).persist(StorageLevel.MEMORY_AND_DISK)
+
+    def par_type(type_, colonne, mesure, alias):
+        return (etiquettes.filter(F.col("type") == type_)
+                          .select(F.col("valeur").alias(colonne), F.col(mesure).alias(alias))
+                          .orderBy(F.desc(alias)))
+
+    age = F.regexp_extract(F.col("required_age"), r"(\d+)", 1).cast("int")
+    age_pegi = F.when(age.isin(7, 10, 12, 16, 18), age).otherwise(F.lit(0))
+
+    return {
+        "publishers": df.groupBy("publisher").count().orderBy(F.desc("count")),
+        "publishers_revenue": df.groupBy("publisher").agg(F.sum(revenue).alias("total_revenue"))
+                                .orderBy(F.desc("total_revenue")),
+        "top_weighted": ratings.orderBy(F.desc("score_weighted")).limit(10).select(*colonnes_notes, "score_weighted"),
+        "top_wilson": ratings.orderBy(F.desc("wilson_score")).limit(10).select(*colonnes_notes, "wilson_score"),
+        "releases_per_year": df.groupBy("release_year").count().orderBy("release_year"),
+        "price_bins": df.filter(F.col("price") > 0).groupBy((F.floor(F.col("price") / 5) * 5).alias("price_bin"))
+                        .count().orderBy("price_bin"),
+        "discounts": df.groupBy((F.col("price") < F.col("initialprice")).alias("has_discount")).count(),
+        "languages": df.select(F.explode("languages_array").alias("language")).groupBy("language").count()
+                       .orderBy(F.desc("count")),
+        "age_pegi": df.groupBy(age_pegi.alias("required_age_pegi")).count().orderBy("required_age_pegi"),
+        "genres": par_type("genre", "genre_exploded", "jeux", "count"),
+        "genres_review_ratio": df_genres.groupBy("genre_exploded")
+                                        .agg(F.avg("review_ratio").alias("avg_review_ratio"),
+                                             F.count("*").alias("game_count"))
+                                        .orderBy(F.desc("avg_review_ratio")),
+        "publishers_genres": df_genres.groupBy("publisher", "genre_exploded").count()
+                                      .withColumnRenamed("count", "game_count").orderBy(F.desc("game_count")),
+        "genres_revenue": df_genres.groupBy("genre_exploded").agg(F.sum(revenue).alias("total_revenue"))
+                                   .orderBy(F.desc("total_revenue")),
+        "genres_platforms": df_genres.groupBy("genre_exploded").agg(
+            *[F.sum(F.when(F.col(plateforme), 1).otherwise(0)).alias(f"{plateforme}_count") for plateforme in PLATEFORMES],
+            F.countDistinct("id").alias("total_games"),
+        ).orderBy(F.desc("total_games")),
+        "categories": par_type("category", "category", "jeux", "count"),
+        "tags": par_type("tag", "tag", "total", "total_score"),
+        "platforms": df.agg(*[F.sum(F.col(plateforme).cast("int")).alias(f"{plateforme}_count") for plateforme in PLATEFORMES]),
+    }
+
+
+def ecrire_agregats(resultats, dossier):
+    durees = {}
+    for nom, resultat in resultats.items():
+        debut = time.perf_counter()
+        resultat.coalesce(1).write.mode("overwrite").csv(f"{dossier}/{nom}", header=True)
+        durees[nom] = time.perf_counter() - debut
+    return durees
+
+
+def executer(spark, entree, sortie):
+    debut = time.perf_counter()
+    df_clean = nettoyer(lire_brut(spark, entree)).persist(StorageLevel.MEMORY_AND_DISK)
+    n = df_clean.count()   # seule lecture du JSON ; l'écriture repart du cache
+    ecrire_parquet(df_clean, f"{sortie}/steam_clean")
+    df_clean.unpersist()
+    duree_ingestion = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    df = spark.read.parquet(f"{sortie}/steam_clean").cache()
+    durees = ecrire_agregats(agregats(df), f"{sortie}/agregats")
+    duree_analyses = time.perf_counter() - debut
+
+    print(f"{n} jeux : ingestion + Parquet {duree_ingestion:.1f} s, {len(durees)} agrégats {duree_analyses:.1f} s")
+    return duree_ingestion, duree_analyses
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pipeline Steam en Spark local")
+    parser.add_argument("--entree", default="steam_game_sample.json")
+    parser.add_argument("--sortie", default="steam_sortie")
+    parser.add_argument("--partitions", type=int, default=8, help="spark.sql.shuffle.partitions")
+    args = parser.parse_args()
+
+    spark = creer_session(partitions=args.partitions)
+    executer(spark, args.entree, args.sortie)
+    spark.stop()
@@ -0,0 +1,247 @@
+"""
+Moteur mono-machine (Polars) pour l'analyse Steam : mêmes étapes et mêmes
+agrégats que steam_pipeline.py, sans JVM ni cluster.
+
+1. Le JSON est parsé une fois par Polars (tags en liste de {tag, score} :
+   Polars n'a pas de type map), mis au schéma SCHEMA_BRUT, nettoyé en une
+   projection paresseuse, puis écrit en Parquet partitionné par release_year
+   par le moteur streaming.
+2. Les agrégats sont des LazyFrame lus depuis ce Parquet (scan_parquet) et
+   évalués ensemble par le moteur streaming : les colonnes inutiles ne sont
+   jamais lues et les données passent par lots.
+
+Usage : python steam_polars.py --entree steam_game_sample.json --sortie steam_sortie_polars
+"""
+import io
+import re
+import time
+import argparse
+from pathlib import Path
+
+import polars as pl
+
+PLATEFORMES = ["windows", "mac", "linux"]
+
+SCHEMA_BRUT = {
+    "id": pl.String,
+    "appid": pl.Int64,
+    "categories": pl.List(pl.String),
+    "ccu": pl.Int64,
+    "developer": pl.String,
+    "discount": pl.String,
+    "genre": pl.String,
+    "header_image": pl.String,
+    "initialprice": pl.String,
+    "languages": pl.String,
+    "name": pl.String,
+    "negative": pl.Int64,
+    "owners": pl.String,
+    "platforms": pl.Struct({plateforme: pl.Boolean for plateforme in ["linux", "mac", "windows"]}),
+    "positive": pl.Int64,
+    "price": pl.String,
+    "publisher": pl.String,
+    "release_date": pl.String,
+    "required_age": pl.String,
+    "short_description": pl.String,
+    "tags": pl.List(pl.Struct({"tag": pl.String, "score": pl.Int64})),
+}
+
+
+def lire_brut(chemin):
+    """
+    Parsé par Polars, sans boucle Python sur les jeux. Un tableau vide
+    ("tags": [], aucun tag) devient null, comme from_json côté Spark ; les
+    objets {tag: votes} sont alors lus en struct (un champ par tag rencontré),
+    remis en liste de {tag, score} par un unpivot.
+    """
+    texte = re.sub(rb'"tags"\s*:\s*\[\s*\]', b'"tags": null', Path(chemin).read_bytes())
+    jeux = pl.read_json(io.BytesIO(texte), infer_schema_length=None).lazy()
+    jeux = jeux.select("id", pl.col("data").struct.unnest()).with_row_index("ligne")
+
+    colonnes = jeux.collect_schema()
+    if isinstance(colonnes.get("tags"), pl.Struct):
+        tags = (
+            jeux.select("ligne", pl.col("tags").struct.unnest())
+                .unpivot(index="ligne", variable_name="tag", value_name="score")
+                .drop_nulls("score")
+                .group_by("ligne").agg(pl.struct("tag", "score").alias("tags"))
+        )
+        jeux = jeux.drop("tags").join(tags, on="ligne", how="left", maintain_order="left")
+
+    return jeux.select(
+        # Champ absent de tout le fichier : colonne nulle, au type du schéma
+        (pl.col(nom) if nom in jeux.collect_schema() else pl.lit(None)).cast(type_).alias(nom)
+        for nom, type_ in SCHEMA_BRUT.items()
+    )
+
+
+def nettoyer(lf):
+    """Même nettoyage que steam_pipeline.nettoyer (donc que le notebook)."""
+    price = pl.col("price").cast(pl.Int64, strict=False) / 100
+    initialprice = pl.col("initialprice").cast(pl.Int64, strict=False) / 100
+
+    release_date_raw = pl.when(pl.col("release_date") == "").then(None).otherwise(pl.col("release_date"))
+    release_year = release_date_raw.str.extract(r"^(\d{4})", 1).cast(pl.Int32, strict=False)
+    release_month = release_date_raw.str.extract(r"^\d{4}/(\d{1,2})", 1).cast(pl.Int32, strict=False)
+    date_connue = release_year.is_not_null() & release_month.is_not_null()
+    mois = release_month.cast(pl.String).str.zfill(2)
+
+    bornes = pl.col("owners").str.replace_all(" ", "", literal=True).str.split("..")
+    owners_min = bornes.list.get(0, null_on_oob=True).str.replace_all(",", "", literal=True).cast(pl.Int64, strict=False)
+    owners_max = bornes.list.get(1, null_on_oob=True).str.replace_all(",", "", literal=True).cast(pl.Int64, strict=False)
+
+    return lf.select(
+        pl.exclude("price", "initialprice", "release_date", "platforms", "owners"),
+        price.alias("price"),
+        initialprice.alias("initialprice"),
+        pl.when(initialprice > 0).then((initialprice - price) / initialprice * 100).alias("calc_discount"),
+        pl.col("languages").str.split(", ").alias("languages_array"),
+        *[pl.col("platforms").struct.field(plateforme).alias(plateforme) for plateforme in PLATEFORMES],
+        release_date_raw.alias("release_date_raw"),
+        release_year.alias("release_year"),
+        release_month.alias("release_month"),
+        # to_date de Spark renvoie NULL pour un mois invalide
+        pl.when(date_connue & release_month.is_between(1, 12)).then(pl.date(release_year, release_month, 1))
+          .alias("release_date"),
+        pl.when(date_connue).then(pl.concat_str(release_year.cast(pl.String), pl.lit("-"), mois))
+          .alias("release_year_month"),
+        owners_min.alias("owners_min"),
+        owners_max.alias("owners_max"),
+        ((owners_min + owners_max) / 2).cast(pl.Int64).alias("owners_mean"),
+        # split(",\s*") de Spark : Polars ne découpe que sur une chaîne fixe
+        pl.col("genre").str.replace_all(r",\s*", ",").str.split(",").alias("genres_array"),
+    )
+
+
+def ecrire_parquet(lf_clean, dossier):
+    # Écrit par le moteur streaming, sans matérialiser la table nettoyée
+    lf_clean.sink_parquet(pl.PartitionBy(dossier, key="release_year", include_key=False), mkdir=True)
+
+
+def lire_parquet(dossier):
+    return pl.scan_parquet(f"{dossier}/**/*.parquet", hive_partitioning=True)
+
+
+def comptes_etiquettes(lf):
+    """Genres, catégories et tags mis bout à bout puis comptés en une seule agrégation."""
+    genres = lf.select(pl.lit("genre").alias("type"), pl.col("genres_array").alias("valeur"),
+                       pl.lit(1, pl.Int64).alias("poids")).explode("valeur")
+    categories = lf.select(pl.lit("category").alias("type"), pl.col("categories").alias("valeur"),
+                           pl.lit(1, pl.Int64).alias("poids")).explode("valeur")
+    tags = (lf.select(pl.lit("tag").alias("type"), pl.col("tags")).explode("tags")
+              .select("type", pl.col("tags").struct.field("tag").alias("valeur"),
+                      pl.col("tags").struct.field("score").alias("poids")))
+    return (
+        pl.concat([genres, categories, tags])
+          .drop_nulls("valeur")    # explode de Spark : pas de ligne pour une liste vide ou NULL
+          .group_by("type", "valeur")
+          .agg(pl.len().alias("jeux"), pl.col("poids").sum().alias("total"))
+    )
+
+
+def agregats(lf):
+    revenue = pl.col("price") * pl.col("owners_mean")
+    total_reviews = pl.col("positive") + pl.col("negative")
+
+    genres = (
+        lf.with_columns(
+            pl.col("genres_array").alias("genre_exploded"),
+            pl.when(total_reviews > 0).then(pl.col("positive") / total_reviews).alias("review_ratio"),
+        ).explode("genre_exploded").drop_nulls("genre_exploded")
+    )
+
+    z = 1.96
+    n, p = pl.col("total_reviews"), pl.col("positive_ratio")
+    ratings = (
+        lf.filter(total_reviews > 100)
+          .with_columns(total_reviews.alias("total_reviews"))
+          .with_columns((pl.col("positive") / pl.col("total_reviews")).alias("positive_ratio"))
+          .with_columns(
+              (p * n.log()).alias("score_weighted"),
+              ((p + z ** 2 / (2 * n) - z * (p * (1 - p) / n + z ** 2 / (4 * n ** 2)).sqrt()) / (1 + z ** 2 / n))
+              .alias("wilson_score"),
+          )
+    )
+    colonnes_notes = ["name", "publisher", "release_year", "total_reviews", "positive_ratio"]
+
+    age = pl.col("required_age").str.extract(r"(\d+)", 1).cast(pl.Int32, strict=False)
+    age_pegi = pl.when(age.is_in([7, 10, 12, 16, 18])).then(age).otherwise(0)
+
+    etiquettes = comptes_etiquettes(lf)
+
+    def par_type(type_, colonne, mesure, alias):
+        return (etiquettes.filter(pl.col("type") == type_)
+                          .select(pl.col("valeur").alias(colonne), pl.col(mesure).alias(alias))
+                          .sort(alias, descending=True))
+
+    def compter(frame, *cles):
+        return frame.group_by(*cles).agg(pl.len().alias("count"))
+
+    return {
+        "publishers": compter(lf, "publisher").sort("count", descending=True),
+        "publishers_revenue": lf.group_by("publisher").agg(revenue.sum().alias("total_revenue"))
+                                .sort("total_revenue", descending=True),
+        "top_weighted": ratings.top_k(10, by="score_weighted").select(*colonnes_notes, "score_weighted"),
+        "top_wilson": ratings.top_k(10, by="wilson_score").select(*colonnes_notes, "wilson_score"),
+        "releases_per_year": compter(lf, "release_year").sort("release_year"),
+        "price_bins": compter(lf.filter(pl.col("price") > 0)
+                                .select(((pl.col("price") / 5).floor().cast(pl.Int64) * 5).alias("price_bin")),
+                              "price_bin").sort("price_bin"),
+        "discounts": compter(lf.select((pl.col("price") < pl.col("initialprice")).alias("has_discount")),
+                             "has_discount"),
+        "languages": compter(lf.select(pl.col("languages_array").alias("language")).explode("language")
+                               .drop_nulls("language"), "language").sort("count", descending=True),
+        "age_pegi": compter(lf.select(age_pegi.alias("required_age_pegi")), "required_age_pegi")
+                    .sort("required_age_pegi"),
+        "genres": par_type("genre", "genre_exploded", "jeux", "count"),
+        "genres_review_ratio": genres.group_by("genre_exploded")
+                                     .agg(pl.col("review_ratio").mean().alias("avg_review_ratio"),
+                                          pl.len().alias("game_count"))
+                                     .sort("avg_review_ratio", descending=True),
+        "publishers_genres": genres.group_by("publisher", "genre_exploded").agg(pl.len().alias("game_count"))
+                                   .sort("game_count", descending=True),
+        "genres_revenue": genres.group_by("genre_exploded").agg(revenue.sum().alias("total_revenue"))
+                                .sort("total_revenue", descending=True),
+        "genres_platforms": genres.group_by("genre_exploded").agg(
+            *[pl.col(plateforme).fill_null(False).cast(pl.Int64).sum().alias(f"{plateforme}_count")
+              for plateforme in PLATEFORMES],
+            pl.col("id").n_unique().alias("total_games"),
+        ).sort("total_games", descending=True),
+        "categories": par_type("category", "category", "jeux", "count"),
+        "tags": par_type("tag", "tag", "total", "total_score"),
+        "platforms": lf.select(*[pl.col(plateforme).cast(pl.Int64).sum().alias(f"{plateforme}_count")
+                                 for plateforme in PLATEFORMES]),
+    }
+
+
+def ecrire_agregats(resultats, dossier):
+    Path(dossier).mkdir(parents=True, exist_ok=True)
+    # Tous les agrégats évalués ensemble : sous-plans communs partagés
+    frames = pl.collect_all(list(resultats.values()), engine="streaming")
+    for nom, df in zip(resultats, frames):
+        # Chaînes entre guillemets, comme Spark : "" (publisher vide) reste distinct de NULL
+        df.write_csv(f"{dossier}/{nom}.csv", quote_style="non_numeric")
+
+
+def executer(entree, sortie):
+    debut = time.perf_counter()
+    lf_clean = nettoyer(lire_brut(entree))
+    ecrire_parquet(lf_clean, f"{sortie}/steam_clean")
+    duree_ingestion = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    resultats = agregats(lire_parquet(f"{sortie}/steam_clean"))
+    ecrire_agregats(resultats, f"{sortie}/agregats")
+    duree_analyses = time.perf_counter() - debut
+
+    print(f"Polars : ingestion + Parquet {duree_ingestion:.1f} s, {len(resultats)} agrégats {duree_analyses:.1f} s")
+    return duree_ingestion, duree_analyses
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pipeline Steam mono-machine (Polars)")
+    parser.add_argument("--entree", default="steam_game_sample.json")
+    parser.add_argument("--sortie", default="steam_sortie_polars")
+    args = parser.parse_args()
+
+    executer(args.entree, args.sortie)
@@ -0,0 +1,219 @@
+import re
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from pydantic import BaseModel
+import numpy as np
+import tensorflow as tf
+
+# ------------------------------------------------------
+# Settings
+# ------------------------------------------------------
+
+MODEL_PATH = "spam_detector.keras"   # exported by the last cells of ATT_SpamDetector.ipynb
+SEQ_LEN = 40                         # output_sequence_length of the TextVectorization layer
+THRESHOLD = 0.5
+MAX_BATCH_SIZE = 64                  # messages per model call
+MAX_WAIT_MS = 5                      # how long a batch waits for more messages
+
+logger = logging.getLogger("uvicorn.error")
+
+
+# ------------------------------------------------------
+# Model loading (once, at start-up)
+# ------------------------------------------------------
+
+model = tf.keras.models.load_model(MODEL_PATH)
+
+# First layer = TextVectorization, the rest = Embedding -> LSTM -> Dropout -> Dense.
+# They are split so that every batch is turned into one padded (batch, 40)
+# int tensor before it reaches the network.
+vectorizer = model.layers[0]
+tokens_input = tf.keras.Input(shape=(SEQ_LEN,), dtype="int64")
+x = tokens_input
+for layer in model.layers[1:]:
+    x = layer(x)
+classifier = tf.keras.Model(tokens_input, x)
+
+
+@tf.function(input_signature=[tf.TensorSpec([None], tf.string)])
+def vectorize(texts):
+    return vectorizer(texts)
+
+
+# Fixed input shape: traced once, whatever the batch size
+@tf.function(input_signature=[tf.TensorSpec([None, SEQ_LEN], tf.int64)])
+def score(tokens):
+    return tf.squeeze(classifier(tokens, training=False), axis=-1)
+
+
+def clean_text(text):
+    """Same cleaning as the notebook, applied before training."""
+    text = text.lower()
+    text = re.sub(r"http\S+", " ", text)
+    text = re.sub(r"[^a-z0-9\s\']", " ", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return text
+
+
+def predict_proba(messages):
+    """Spam probabilities for a list of raw messages, in one model call."""
+    tokens = vectorize(tf.constant([clean_text(m) for m in messages], dtype=tf.string))
+    return score(tokens).numpy()
+
+
+# ------------------------------------------------------
+# Micro-batching
+# ------------------------------------------------------
+
+class MicroBatcher:
+    """
+    Collects the messages of concurrent requests and sends them to the model
+    together: a batch leaves as soon as it holds MAX_BATCH_SIZE messages or
+    MAX_WAIT_MS after its first message. The model runs in a worker thread so
+    the event loop keeps accepting requests meanwhile.
+    """
+
+    def __init__(self, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = None
+        self.task = None
+
+    async def start(self):
+        self.queue = asyncio.Queue()
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self.task.cancel()
+
+    async def classify(self, messages):
+        # Large payloads are split so that no model call exceeds max_batch_size
+        futures = []
+        for start in range(0, len(messages), self.max_batch_size):
+            future = asyncio.get_running_loop().create_future()
+            await self.queue.put((messages[start:start + self.max_batch_size], future))
+            futures.append(future)
+        return np.concatenate(await asyncio.gather(*futures))
+
+    async def _next_batch(self, carry):
+        """Queued (messages, future) pairs totalling at most max_batch_size messages, and the next carry-over."""
+        loop = asyncio.get_running_loop()
+        pending = [carry or await self.queue.get()]
+        size = len(pending[0][0])
+        deadline = loop.time() + self.max_wait
+        while size < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if size + len(item[0]) > self.max_batch_size:
+                return pending, item      # does not fit: it opens the next batch
+            pending.append(item)
+            size += len(item[0])
+        return pending, None
+
+    async def _score(self, pending):
+        # Requests cancelled while waiting (client gone) are not scored
+        pending = [(batch, future) for batch, future in pending if not future.done()]
+        if not pending:
+            return
+        messages = [m for batch, _ in pending for m in batch]
+        try:
+            probas = await asyncio.get_running_loop().run_in_executor(None, predict_proba, messages)
+        except Exception as error:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        start = 0
+        for batch, future in pending:
+            # A client may also disconnect while its batch is in the model
+            if not future.done():
+                future.set_result(probas[start:start + len(batch)])
+            start += len(batch)
+
+    async def _run(self):
+        carry = None
+        while True:
+            pending, carry = await self._next_batch(carry)
+            try:
+                await self._score(pending)
+            except Exception:
+                # Never let one bad batch stop the loop: later requests would hang
+                logger.exception("micro-batch failed")
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(RuntimeError("micro-batch failed"))
+
+
+batcher = MicroBatcher()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    predict_proba(["warm up"])   # traces both tf.functions before the first request
+    await batcher.start()
+    yield
+    await batcher.stop()
+
+
+# -----------------------------------------------------
+# FastAPI initialization
+# -----------------------------------------------------
+
+app = FastAPI(
+    title="ATT Spam Detector API",
+    description="LSTM spam classifier for SMS messages.",
+    version="1.0",
+    docs_url="/swagger",
+    redoc_url="/redocumentation",
+    lifespan=lifespan,
+)
+
+
+# ------------------------------------------------------
+# Request schema
+# ------------------------------------------------------
+
+class ClassifyInput(BaseModel):
+    messages: list[str]
+
+
+# ------------------------------------------------------
+# /classify endpoint
+# ------------------------------------------------------
+
+@app.post("/classify")
+async def classify(payload: ClassifyInput):
+    """
+    POST /classify
+    Body:
+    {
+        "messages": ["Free entry in 2 a wkly comp to win FA Cup final tkts!", "Ok lar..."]
+    }
+    """
+    if not payload.messages:
+        return {"predictions": []}
+    probas = await batcher.classify(payload.messages)
+    return {
+        "predictions": [
+            {"label": "spam" if p >= THRESHOLD else "ham", "proba_spam": round(float(p), 4)}
+            for p in np.asarray(probas)
+        ]
+    }
+
+
+# ------------------------------------------------------
+# Health check
+# ------------------------------------------------------
+
+@app.get("/")
+def health():
+    return {"status": "ok", "message": "API running"}
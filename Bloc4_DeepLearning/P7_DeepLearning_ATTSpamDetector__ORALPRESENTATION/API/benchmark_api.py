@@ -0,0 +1,97 @@
+"""
+CPU throughput / latency benchmark of the spam detector.
+
+1. In-process: notebook-style model.predict on one message at a time against
+   predict_proba on padded (batch, 40) tensors, with a parity check on the
+   probabilities.
+2. Over HTTP (--url, API started with uvicorn): N concurrent clients each
+   sending one SMS per request to /classify, so the micro-batcher has to
+   group them.
+
+Usage:
+    python benchmark_api.py --messages 500
+    uvicorn api_app:app --port 8000 &
+    python benchmark_api.py --url http://127.0.0.1:8000 --clients 32 --requests 2000
+"""
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import requests
+
+
+def load_messages(path="../spam.csv"):
+    return pd.read_csv(path, encoding="latin-1")["v2"].astype(str).tolist()
+
+
+def report(name, latencies, total_time, n_messages):
+    latencies = np.array(latencies) * 1000
+    print(f"{name:28} {n_messages / total_time:9.0f} msg/s   "
+          f"p50 {np.percentile(latencies, 50):7.1f} ms   p95 {np.percentile(latencies, 95):7.1f} ms   "
+          f"p99 {np.percentile(latencies, 99):7.1f} ms")
+
+
+def in_process(messages, batch_size):
+    import tensorflow as tf
+    from api_app import model, predict_proba, clean_text
+
+    # Notebook: one model.predict per message
+    latencies = []
+    start = time.perf_counter()
+    reference = []
+    for message in messages:
+        t0 = time.perf_counter()
+        reference.append(model.predict(tf.constant([clean_text(message)]), verbose=0).ravel()[0])
+        latencies.append(time.perf_counter() - t0)
+    report("model.predict, 1 message", latencies, time.perf_counter() - start, len(messages))
+
+    # Service: padded batches through the traced tf.functions
+    latencies = []
+    probas = []
+    start = time.perf_counter()
+    for i in range(0, len(messages), batch_size):
+        t0 = time.perf_counter()
+        probas.append(predict_proba(messages[i:i + batch_size]))
+        latencies.append(time.perf_counter() - t0)
+    report(f"predict_proba, batch {batch_size}", latencies, time.perf_counter() - start, len(messages))
+
+    probas = np.concatenate(probas)
+    reference = np.array(reference)
+    same_labels = ((probas >= 0.5) == (reference >= 0.5)).mean()
+    print(f"parity: max |diff| = {np.abs(probas - reference).max():.2e}, same label for {same_labels:.2%} of messages")
+
+
+def over_http(url, messages, clients, n_requests):
+    session = requests.Session()
+    session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=clients))
+
+    def send(message):
+        t0 = time.perf_counter()
+        response = session.post(f"{url}/classify", json={"messages": [message]}, timeout=30)
+        response.raise_for_status()
+        return time.perf_counter() - t0
+
+    sample = [messages[i % len(messages)] for i in range(n_requests)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        latencies = list(pool.map(send, sample))
+    report(f"/classify, {clients} clients", latencies, time.perf_counter() - start, n_requests)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default="../spam.csv")
+    parser.add_argument("--messages", type=int, default=500, help="messages for the in-process comparison")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--url", help="running API, e.g. http://127.0.0.1:8000")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    messages = load_messages(args.data)
+    if args.url:
+        over_http(args.url.rstrip("/"), messages, args.clients, args.requests)
+    else:
+        in_process(messages[:args.messages], args.batch_size)
@@ -0,0 +1,95 @@
+"""
+Keras model against the pure-NumPy forward pass (spam_numpy.py) on spam.csv.
+
+Each backend runs in its own process so that start-up time (imports + model
+loading) and peak memory (max RSS) are measured separately. Both score all
+5,572 messages; the parent process then checks parity: same labels and
+probabilities within a small tolerance (float32 rounding).
+
+Usage: python export_numpy.py && python benchmark_numpy.py [--batch-size 64] [--single 200]
+"""
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+
+T0 = time.perf_counter()
+
+
+def run_backend(backend, data, out, batch_size, n_single):
+    import numpy as np
+    import pandas as pd
+
+    messages = pd.read_csv(data, encoding="latin-1")["v2"].astype(str).tolist()
+    if backend == "keras":
+        import tensorflow as tf
+        from spam_numpy import clean_text
+
+        model = tf.keras.models.load_model("spam_detector.keras")
+
+        def predict_proba(batch):
+            return model.predict(tf.constant([clean_text(m) for m in batch]), verbose=0).ravel()
+    else:
+        from spam_numpy import SpamLSTM
+
+        predict_proba = SpamLSTM.load("spam_lstm.npz", "vocab.tsv").predict_proba
+    predict_proba(["warm up"])
+    startup = time.perf_counter() - T0
+
+    latencies = []
+    for message in messages[:n_single]:
+        t = time.perf_counter()
+        predict_proba([message])
+        latencies.append(time.perf_counter() - t)
+
+    t = time.perf_counter()
+    probas = np.concatenate([predict_proba(messages[i:i + batch_size]) for i in range(0, len(messages), batch_size)])
+    throughput = len(messages) / (time.perf_counter() - t)
+    np.save(out, probas)
+
+    print(json.dumps({
+        "startup_s": startup,
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "p50_ms": float(np.percentile(latencies, 50)) * 1000,
+        "p95_ms": float(np.percentile(latencies, 95)) * 1000,
+        "msg_per_s": throughput,
+    }))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default="../spam.csv")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--single", type=int, default=200, help="messages scored one by one for latency")
+    parser.add_argument("--backend", choices=["keras", "numpy"], help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.backend:
+        run_backend(args.backend, args.data, args.out, args.batch_size, args.single)
+        sys.exit()
+
+    import numpy as np
+    import pandas as pd
+
+    results = {}
+    for backend in ["keras", "numpy"]:
+        command = [sys.executable, __file__, "--backend", backend, "--out", f"probas_{backend}.npy",
+                   "--data", args.data, "--batch-size", str(args.batch_size), "--single", str(args.single)]
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        results[backend] = json.loads(output.strip().splitlines()[-1])
+
+    keras_probas, numpy_probas = np.load("probas_keras.npy"), np.load("probas_numpy.npy")
+    labels = (pd.read_csv(args.data, encoding="latin-1")["v1"] == "spam").to_numpy()
+    print(f"parity on {len(labels)} messages: max |diff| = {np.abs(keras_probas - numpy_probas).max():.2e}, "
+          f"same label for {((keras_probas >= 0.5) == (numpy_probas >= 0.5)).mean():.2%}")
+    print(f"accuracy: keras {((keras_probas >= 0.5) == labels).mean():.4f}, "
+          f"numpy {((numpy_probas >= 0.5) == labels).mean():.4f}\n")
+
+    print(f"{'':22}{'Keras':>12}{'NumPy':>12}")
+    for key, name, fmt in [("startup_s", "start-up (s)", "{:12.2f}"), ("rss_mb", "peak RSS (MB)", "{:12.0f}"),
+                           ("p50_ms", "1 message p50 (ms)", "{:12.2f}"), ("p95_ms", "1 message p95 (ms)", "{:12.2f}"),
+                           ("msg_per_s", f"batch {args.batch_size} (msg/s)", "{:12.0f}")]:
+        print(f"{name:22}" + "".join(fmt.format(results[b][key]) for b in ["keras", "numpy"]))
@@ -0,0 +1,49 @@
+"""
+Export the trained spam model (spam_detector.keras) for spam_numpy.py:
+
+- spam_lstm.npz: Embedding, LSTM and Dense weights as NumPy arrays;
+- vocab.tsv: the full TextVectorization vocabulary in the meta.tsv format
+  (meta.tsv only holds the 1,000 most frequent tokens, for the Projector).
+
+TensorFlow is needed here only, not at inference time.
+
+Usage: python export_numpy.py [--model spam_detector.keras]
+"""
+import argparse
+
+import numpy as np
+import tensorflow as tf
+
+
+def export(model_path, weights_path, vocab_path):
+    model = tf.keras.models.load_model(model_path)
+    layers = {type(layer).__name__: layer for layer in model.layers}
+
+    kernel, recurrent_kernel, bias = layers["LSTM"].get_weights()
+    dense_kernel, dense_bias = layers["Dense"].get_weights()
+    np.savez(
+        weights_path,
+        embedding=layers["Embedding"].get_weights()[0],
+        lstm_kernel=kernel,
+        lstm_recurrent_kernel=recurrent_kernel,
+        lstm_bias=bias,
+        dense_kernel=dense_kernel,
+        dense_bias=dense_bias,
+    )
+
+    vocab = layers["TextVectorization"].get_vocabulary()
+    with open(vocab_path, "w", encoding="utf-8") as f:
+        for word in vocab[2:]:           # skip padding ('') and [UNK], as in meta.tsv
+            f.write(word + "\n")
+
+    print(f"Files written: {weights_path} and {vocab_path} ({len(vocab)} tokens)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="spam_detector.keras")
+    parser.add_argument("--weights", default="spam_lstm.npz")
+    parser.add_argument("--vocab", default="vocab.tsv")
+    args = parser.parse_args()
+
+    export(args.model, args.weights, args.vocab)
@@ -0,0 +1,93 @@
+"""
+Pure-NumPy inference for the spam LSTM: no TensorFlow at run time.
+
+Reads the arrays written by export_numpy.py (spam_lstm.npz) and a vocabulary
+file in the meta.tsv format (one token per line, line i = token id i + 2, ids
+0 and 1 being padding and [UNK]). Tokens are looked up through a plain dict.
+
+Forward pass, for a whole batch at once:
+- TextVectorization: strip punctuation, split on whitespace, ids, truncate /
+  pad to 40;
+- Embedding followed by the LSTM input projection, folded into one
+  (vocab, 4 * units) table computed at load time, so each step starts with a
+  row lookup instead of a matrix product;
+- LSTM (Keras gate order i, f, c, o), padded steps skipped as with mask_zero;
+- Dense + sigmoid. Dropout is a no-op at inference.
+"""
+import re
+
+import numpy as np
+
+SEQ_LEN = 40
+PAD, OOV = 0, 1
+
+# Same cleaning as the notebook, then what TextVectorization's
+# "lower_and_strip_punctuation" still removes after it (the apostrophes)
+_URL = re.compile(r"http\S+")
+_NOT_KEPT = re.compile(r"[^a-z0-9\s\']")
+_SPACES = re.compile(r"\s+")
+
+
+def clean_text(text):
+    text = text.lower()
+    text = _URL.sub(" ", text)
+    text = _NOT_KEPT.sub(" ", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+def tokenize(text):
+    return clean_text(text).replace("'", "").split()
+
+
+def load_vocab(path):
+    """{token: id} from a meta.tsv-style file."""
+    with open(path, encoding="utf-8") as f:
+        return {line.rstrip("\n"): i + 2 for i, line in enumerate(f)}
+
+
+def sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+class SpamLSTM:
+
+    def __init__(self, weights, vocab, dtype=np.float32):
+        embedding = weights["embedding"].astype(dtype)
+        kernel = weights["lstm_kernel"].astype(dtype)
+        self.recurrent_kernel = weights["lstm_recurrent_kernel"].astype(dtype)
+        self.units = self.recurrent_kernel.shape[0]
+        # x_t @ W + b for every token id, computed once
+        self.input_table = embedding @ kernel + weights["lstm_bias"].astype(dtype)
+        self.dense_kernel = weights["dense_kernel"].astype(dtype)
+        self.dense_bias = weights["dense_bias"].astype(dtype)
+        self.vocab = vocab
+        self.dtype = dtype
+
+    @classmethod
+    def load(cls, weights_path="spam_lstm.npz", vocab_path="vocab.tsv"):
+        with np.load(weights_path) as weights:
+            return cls(dict(weights), load_vocab(vocab_path))
+
+    def encode(self, messages):
+        """(batch, 40) int ids, post-padded with 0 like TextVectorization."""
+        ids = np.zeros((len(messages), SEQ_LEN), dtype=np.int64)
+        get = self.vocab.get
+        for row, message in enumerate(messages):
+            tokens = tokenize(message)[:SEQ_LEN]
+            ids[row, :len(tokens)] = [get(token, OOV) for token in tokens]
+        return ids
+
+    def predict_proba(self, messages):
+        ids = self.encode(messages)
+        lengths = (ids != PAD).sum(axis=1)
+        batch, u = len(ids), self.units
+        h = np.zeros((batch, u), dtype=self.dtype)
+        c = np.zeros((batch, u), dtype=self.dtype)
+        for t in range(int(lengths.max(initial=0))):
+            active = lengths > t
+            z = self.input_table[ids[active, t]] + h[active] @ self.recurrent_kernel
+            i, f = sigmoid(z[:, :u]), sigmoid(z[:, u:2 * u])
+            g, o = np.tanh(z[:, 2 * u:3 * u]), sigmoid(z[:, 3 * u:])
+            c[active] = f * c[active] + i * g
+            h[active] = o * np.tanh(c[active])
+        return sigmoid(h @ self.dense_kernel + self.dense_bias).ravel()
@@ -0,0 +1,107 @@
+"""
+Throughput of the SMS preprocessing: notebook version (four re.sub per
+message through .apply, then itertools.chain + Counter) against
+text_preprocessing.py (single regex pass, pandas string methods, chunked
+streaming with incremental counts).
+
+spam.csv is repeated up to --messages rows to get closer to production
+volumes; every variant must give the same cleaned messages and the same word
+counts as the notebook. A fuzz set of Unicode edge cases (non-breaking and
+exotic spaces inside URLs, letters whose lowercase differs between Python and
+Arrow, ASCII control characters) is checked first, message by message.
+
+Usage: python benchmark_preprocessing.py [--messages 1000000] [--chunksize 100000]
+"""
+import os
+import re
+import time
+import argparse
+import itertools
+import tempfile
+from collections import Counter
+
+import pandas as pd
+
+from text_preprocessing import STRING_DTYPE, TokenCounter, clean_series, clean_text, preprocess_file
+
+
+def clean_text_notebook(text):
+    text = text.lower()
+    text = re.sub(r"http\S+", " ", text)
+    text = re.sub(r"[^a-z0-9\s\']", " ", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return text
+
+
+FUZZ = [
+    "http://x\xa0word ok", "http://x\u2028y z", "http://x\x0bword ok", "a\x1cb http://y\x1fz",
+    "İstanbul trip", "STRASSE Straße ẞ", "ΣΟΦΟΣ σοφος", "ǅungla ﬁne", "Kelvin ok",
+    "１２３ ｆｕｌｌ", "naïve café 😀 http://é.com/ü x", "\u3000line\u00a0sep\u2009end",
+    "HTTP://UP.com x", "it's \tok\n", "http", "xhttp://a b", "£1000 prize! call 0800", "",
+]
+
+
+def notebook(messages):
+    clean = messages.apply(clean_text_notebook)
+    words = list(itertools.chain.from_iterable(clean.str.split()))
+    return clean, Counter(words)
+
+
+def single_pass_apply(messages):
+    clean = messages.apply(clean_text)
+    counter = TokenCounter()
+    counter.update(clean)
+    return clean, counter.counts
+
+
+def vectorised(messages):
+    clean = clean_series(messages)
+    counter = TokenCounter()
+    counter.update(clean)
+    return clean, counter.counts
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default="spam.csv")
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    args = parser.parse_args()
+
+    fuzz = pd.Series(FUZZ)
+    for message, clean in zip(FUZZ, clean_series(fuzz)):
+        assert clean == clean_text_notebook(message) == clean_text(message), (message, clean)
+    print(f"fuzz set: {len(FUZZ)} edge cases identical to the notebook")
+
+    dataset = pd.read_csv(args.data, encoding="latin-1", usecols=["v1", "v2"])
+    repeats = -(-args.messages // len(dataset))
+    dataset = pd.concat([dataset] * repeats, ignore_index=True).iloc[:args.messages]
+    messages = dataset["v2"].astype(str)
+    n = len(messages)
+
+    (reference, reference_counts), t_notebook = timed(notebook, messages)
+    rows = [("notebook: 4 x re.sub + chain/Counter", t_notebook, True)]
+    for name, function in [("single regex pass, .apply", single_pass_apply),
+                           (f"pandas str methods ({STRING_DTYPE})", vectorised)]:
+        (clean, counts), duration = timed(function, messages)
+        same = clean.astype(object).tolist() == reference.tolist() and counts == reference_counts
+        rows.append((name, duration, same))
+
+    # Streaming: read + clean + count chunk by chunk from a CSV on disk
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "sms.csv")
+        dataset.to_csv(path, index=False, encoding="latin-1")
+        counter, duration = timed(preprocess_file, path, None, args.chunksize)
+    rows.append((f"streaming, chunks of {args.chunksize:,} (with CSV read)", duration,
+                 counter.counts == reference_counts and counter.messages == n))
+
+    print(f"{n:,} messages, {len(reference_counts):,} distinct words\n")
+    for name, duration, same in rows:
+        print(f"{name:48} {n / duration:12,.0f} msg/s  x{t_notebook / duration:5.1f}  "
+              f"{'identical' if same else 'DIFFERENT'}")
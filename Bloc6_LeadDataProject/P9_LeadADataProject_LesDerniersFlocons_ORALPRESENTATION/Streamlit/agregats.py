@@ -0,0 +1,149 @@
+"""
+Cube d'agrégats (altitude x année x variable) pour l'onglet Tendances.
+
+Construit en un seul passage sur les données journalières : somme et nombre
+de valeurs par altitude de station et par année. Toute tranche d'altitude,
+y compris définie par l'utilisateur, est ensuite servie depuis le cube
+(quelques milliers de lignes) : moyenne = somme des sommes / somme des effectifs.
+
+Avec le dossier Parquet d'ingestion_meteo.py, le cube est construit depuis les
+agrégats annuels par station, mis à jour fichier par fichier (AgregatsAnnuels).
+"""
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from chargement import debut_annee_incomplete
+from stockage_meteo import EtatIngestion, ecrire_atomique
+
+VARIABLES_ANNUELLES = ['snowfall_sum', 'temperature_2m_mean', 'rain_sum', 'snowfall_water_equivalent_sum']
+
+
+class CubeAltitude:
+
+    def __init__(self, cube):
+        # Index (altitude, year), colonnes (variable, 'sum' | 'count')
+        self.cube = cube
+
+    @classmethod
+    def from_daily(cls, df, variables, limite=None):
+        """limite : 1er janvier exclu ; par défaut, début de la dernière année incomplète des données."""
+        ds = pd.to_datetime(df['date']).dt.tz_localize(None)
+        limite = debut_annee_incomplete(ds.max()) if limite is None else limite
+        garder = ds < limite
+
+        cube = (
+            df.loc[garder, list(variables)]
+            .groupby([df.loc[garder, 'altitude'], ds[garder].dt.year.rename('year')])
+            .agg(['sum', 'count'])
+        )
+        return cls(cube)
+
+    @classmethod
+    def from_annuels(cls, table, variables, limite=None):
+        """
+        Depuis les agrégats (station, altitude, année) d'AgregatsAnnuels :
+        pas de passage sur les données journalières. La table ne dit pas si la
+        dernière année est complète : limite (1er janvier exclu) vient des
+        points de reprise de l'ingestion ; None garde toutes les années.
+        """
+        if limite is not None:
+            table = table[table.index.get_level_values('year') < pd.Timestamp(limite).year]
+        cube = table.groupby(level=['altitude', 'year']).sum()
+        cube.columns = pd.MultiIndex.from_tuples([tuple(c.rsplit('_', 1)) for c in cube.columns])
+        return cls(cube[list(variables)])
+
+    @property
+    def altitudes(self):
+        return self.cube.index.get_level_values('altitude')
+
+    def par_tranches(self, variable, coupures):
+        """
+        Moyenne annuelle de `variable` pour chaque tranche [coupures[i], coupures[i+1]).
+        Renvoie un DataFrame long : tranche, ds, y.
+        """
+        tranches = pd.cut(self.altitudes, bins=coupures, right=False)
+        agg = self.cube[variable].groupby([tranches, self.cube.index.get_level_values('year')], observed=True).sum()
+        agg = agg[agg['count'] > 0]
+
+        annees = agg.index.get_level_values(1).astype(str)
+        return pd.DataFrame({
+            'tranche': agg.index.get_level_values(0),
+            'ds': pd.to_datetime(annees, format='%Y'),
+            'y': (agg['sum'] / agg['count']).to_numpy(),
+        })
+
+    def serie(self, variable, altitude_min=None, altitude_max=None):
+        """Série annuelle (ds, y) pour une tranche ; bornes absentes = pas de limite."""
+        bas = -np.inf if altitude_min is None else altitude_min
+        haut = np.inf if altitude_max is None else altitude_max
+        return self.par_tranches(variable, [bas, haut])[['ds', 'y']].reset_index(drop=True)
+
+
+class AgregatsAnnuels:
+    """
+    Somme et effectif de chaque variable par (station, altitude, année), tenus
+    à jour à partir du journal d'ingestion : seuls les fichiers Parquet pas
+    encore comptés sont relus, et seules les années qu'ils couvrent changent.
+    """
+
+    def __init__(self, dossier, variables=VARIABLES_ANNUELLES):
+        self.dossier = Path(dossier)
+        self.variables = list(variables)
+        # Table et liste des fichiers comptés dans un même fichier, écrit de façon atomique
+        self.chemin = self.dossier / "_agregats" / "annuels.pkl"
+
+    def _lire(self):
+        try:
+            with open(self.chemin, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return {'table': None, 'fichiers': set()}
+
+    def charger(self):
+        """Index (stations, altitude, year), colonnes <variable>_sum et <variable>_count."""
+        return self._lire()['table']
+
+    def mettre_a_jour(self):
+        """Ajoute les fichiers nouveaux du journal ; renvoie les (station, altitude, année) touchées."""
+        etat = self._lire()
+        ingestion = EtatIngestion(self.dossier)
+        journal = ingestion.lire_journal()
+        # Un fichier réécrit après une interruption figure deux fois au journal ;
+        # les entrées de compaction n'apportent pas de lignes nouvelles
+        entrees = {e['fichier']: e for e in journal if 'fichier' in e}
+        nouveaux = [f for f in dict.fromkeys(e['fichier'] for e in journal if 'fichier' in e)
+                    if f not in etat['fichiers']]
+        if not nouveaux:
+            return pd.MultiIndex.from_tuples([], names=['stations', 'altitude', 'year'])
+
+        colonnes = ['stations', 'altitude', 'date', *self.variables]
+        remplacants = ingestion.remplacants(journal)
+        parties = []
+        for f in nouveaux:
+            if f not in remplacants:
+                parties.append(pd.read_parquet(self.dossier / f, columns=colonnes))
+                continue
+            # Déjà fusionné par une compaction : seules ses dates sont relues dans le fichier qui le remplace
+            e = entrees[f]
+            parties.append(pd.read_parquet(
+                self.dossier / remplacants[f], columns=colonnes,
+                filters=[('date', '>=', pd.Timestamp(e['debut'])), ('date', '<=', pd.Timestamp(e['fin']))],
+            ))
+        df = pd.concat(parties, ignore_index=True)
+        delta = (
+            df.groupby(['stations', 'altitude', df['date'].dt.year.rename('year')])[self.variables]
+            .agg(['sum', 'count'])
+        )
+        delta.columns = [f"{variable}_{agg}" for variable, agg in delta.columns]
+
+        table = delta if etat['table'] is None else etat['table'].add(delta, fill_value=0)
+        etat = {'table': table, 'fichiers': etat['fichiers'] | set(nouveaux)}
+
+        def ecrire(tmp):
+            with open(tmp, 'wb') as f:
+                pickle.dump(etat, f)
+        ecrire_atomique(self.chemin, ecrire)
+        return delta.index
@@ -0,0 +1,107 @@
+"""
+Mémoire occupée par les données météo de l'application, avant / après.
+
+- avant : chargement d'origine (deux lectures complètes du fichier 148 stations,
+  float64 et chaînes object, plus le fichier complet).
+- apres : chargement compact (chargement.py), un seul DataFrame par fichier.
+
+Chaque variante tourne dans un processus séparé pour mesurer son pic de RSS.
+
+Les CSV ne sont pas versionnés : --synthetique N écrit dans un dossier
+temporaire deux fichiers de même forme (colonnes, types, dates texte avec
+fuseau, 1970-2024) pour N stations, dont les stations fermées.
+
+Usage : python benchmark_memoire.py [--dossier .] [--synthetique 148]
+"""
+import sys
+import argparse
+import resource
+import tempfile
+import subprocess
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from chargement import STATIONS_FERMEES, empreinte_memoire, lire_meteo_full, lire_meteo_stations
+from ingestion_meteo import VARIABLES
+
+BASE_DIR = Path(__file__).parent
+NOM_FULL = "donnees_meteo_avec_stations_et_altitudes_full.csv"
+NOM_STATIONS = "donnees_meteo_148_stations.csv"
+
+
+def pic_rss_mo():
+    # ru_maxrss est en Ko sous Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def generer_csv(chemin, n_stations, debut="1970-01-01", fin="2024-12-31", graine=0):
+    """CSV de même forme que ceux de l'application, écrit station par station."""
+    rng = np.random.default_rng(graine)
+    jours = pd.date_range(debut, fin, freq="D", tz="UTC").astype(str)   # "1970-01-01 00:00:00+00:00"
+    noms = (STATIONS_FERMEES + [f"Station {i}" for i in range(n_stations)])[:n_stations]
+    for i, station in enumerate(noms):
+        df = pd.DataFrame({
+            "Unnamed: 0_x": np.arange(i * len(jours), (i + 1) * len(jours)),
+            "date": jours,
+            "latitude": 45 + rng.random(),
+            "longitude": 6 + rng.random(),
+            **{v: rng.normal(0, 10, len(jours)).astype(np.float32).astype(np.float64) for v in VARIABLES},
+            "Unnamed: 0_y": float(i),
+            "stations": station,
+            "altitude": float(rng.integers(800, 2500)),
+        })
+        df.to_csv(chemin, mode="w" if i == 0 else "a", header=i == 0, index=False)
+
+
+def charger_avant(dossier):
+    df_full = pd.read_csv(dossier / NOM_FULL)
+    df_full['date'] = pd.to_datetime(df_full['date'])
+
+    frames = [df_full]
+    for colonne in ['temperature_2m_mean', 'snowfall_sum']:
+        df = pd.read_csv(dossier / NOM_STATIONS)
+        for station in STATIONS_FERMEES:
+            df = df.drop(df[df["stations"].apply(lambda x, station=station: station in x)].index)
+        frames.append(df[['stations', 'date', 'altitude', colonne]])
+    return frames
+
+
+def charger_apres(dossier):
+    return [lire_meteo_full(dossier / NOM_FULL), lire_meteo_stations(dossier / NOM_STATIONS)]
+
+
+def mesurer(variante, dossier):
+    base = pic_rss_mo()
+    frames = charger_avant(dossier) if variante == 'avant' else charger_apres(dossier)
+    taille = sum(empreinte_memoire(df) for df in frames)
+    print(f"{variante:>6} : DataFrames {taille:8.1f} Mo   pic RSS {pic_rss_mo():8.1f} Mo "
+          f"(dont {pic_rss_mo() - base:.1f} Mo de chargement)")
+
+
+def comparer(dossier):
+    for variante in ['avant', 'apres']:
+        subprocess.run([sys.executable, __file__, "--variante", variante, "--dossier", str(dossier)], check=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dossier", type=Path, default=BASE_DIR, help="dossier contenant les deux CSV")
+    parser.add_argument("--synthetique", type=int, metavar="N", help="CSV générés pour N stations")
+    parser.add_argument("--variante", choices=['avant', 'apres'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variante:
+        mesurer(args.variante, args.dossier)
+    elif args.synthetique:
+        with tempfile.TemporaryDirectory() as dossier:
+            dossier = Path(dossier)
+            # Même forme pour les deux fichiers : le complet garde aussi les stations fermées
+            generer_csv(dossier / NOM_FULL, args.synthetique)
+            (dossier / NOM_STATIONS).symlink_to(dossier / NOM_FULL)
+            taille = (dossier / NOM_FULL).stat().st_size / 1e6
+            print(f"CSV synthétiques : {args.synthetique} stations, {taille:.0f} Mo chacun")
+            comparer(dossier)
+    else:
+        comparer(args.dossier)
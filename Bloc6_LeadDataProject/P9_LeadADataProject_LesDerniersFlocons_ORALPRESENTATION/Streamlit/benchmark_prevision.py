@@ -0,0 +1,96 @@
+"""
+Comparaison Prophet / TrendForecaster sur les séries annuelles par station.
+
+- Précision : ajustement sur 1970-2019, erreur absolue moyenne (MAE) sur 2020-2024
+  pour les deux moteurs, et écart moyen entre les deux prévisions.
+- Vitesse : temps total pour ajuster + prévoir toutes les stations.
+
+Usage : python benchmark_prevision.py [donnees_meteo_148_stations.csv]
+"""
+import sys
+import time
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from prophet import Prophet
+
+from chargement import debut_annee_incomplete
+from prevision import TrendForecaster
+
+BASE_DIR = Path(__file__).parent
+HORIZON = 5
+
+logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+
+
+def series_annuelles(path):
+    df = pd.read_csv(path, usecols=['stations', 'date', 'temperature_2m_mean', 'snowfall_sum'])
+    df['ds'] = pd.to_datetime(df['date']).dt.tz_localize(None)
+    df = df[df['ds'] < debut_annee_incomplete(df['ds'].max())]
+    df['snowfall_sum'] = df['snowfall_sum'] / 100
+
+    annuel = (
+        df.groupby(['stations', pd.Grouper(key='ds', freq='YS')])
+        .agg(neige=('snowfall_sum', 'sum'), temperature=('temperature_2m_mean', 'mean'))
+        .reset_index()
+    )
+    return annuel
+
+
+def prevoir_prophet(train):
+    previsions = []
+    for station, df_s in train.groupby('stations'):
+        model = Prophet(
+            yearly_seasonality=False,
+            daily_seasonality=False,
+            weekly_seasonality=False,
+            changepoint_prior_scale=1,
+            seasonality_prior_scale=10
+        )
+        model.fit(df_s[['ds', 'y']])
+        forecast = model.predict(model.make_future_dataframe(HORIZON, freq='YS'))
+        previsions.append(forecast[['ds', 'yhat']].assign(stations=station))
+    return pd.concat(previsions, ignore_index=True)
+
+
+def prevoir_numpy(train):
+    model = TrendForecaster(changepoint_prior_scale=1).fit(train, by='stations')
+    forecast = model.predict(model.make_future_dataframe(HORIZON, freq='YS'))
+    return forecast[['stations', 'ds', 'yhat']]
+
+
+def comparer(annuel, variable):
+    df = annuel.rename(columns={variable: 'y'})[['stations', 'ds', 'y']]
+    coupure = df['ds'].max() - pd.DateOffset(years=HORIZON - 1)
+    train, test = df[df['ds'] < coupure], df[df['ds'] >= coupure]
+
+    resultats = {}
+    previsions = {}
+    for nom, moteur in [('prophet', prevoir_prophet), ('numpy', prevoir_numpy)]:
+        debut = time.perf_counter()
+        previsions[nom] = moteur(train)
+        duree = time.perf_counter() - debut
+
+        eval_ = test.merge(previsions[nom], on=['stations', 'ds'])
+        resultats[nom] = {
+            'secondes': duree,
+            'mae_test': np.abs(eval_['y'] - eval_['yhat']).mean(),
+        }
+
+    ecart = previsions['prophet'].merge(previsions['numpy'], on=['stations', 'ds'], suffixes=('_prophet', '_numpy'))
+    ecart = np.abs(ecart['yhat_prophet'] - ecart['yhat_numpy']).mean()
+
+    print(f"--- {variable} ({train['stations'].nunique()} stations) ---")
+    for nom, r in resultats.items():
+        print(f"{nom:>8} : {r['secondes']:8.2f} s   MAE test = {r['mae_test']:.3f}")
+    print(f"accélération x{resultats['prophet']['secondes'] / resultats['numpy']['secondes']:.0f}")
+    print(f"écart moyen |yhat_prophet - yhat_numpy| = {ecart:.3f}\n")
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else BASE_DIR / "donnees_meteo_148_stations.csv"
+    annuel = series_annuelles(path)
+    comparer(annuel, 'neige')
+    comparer(annuel, 'temperature')
@@ -0,0 +1,141 @@
+"""
+Cache partagé des prévisions par station.
+
+Clé : (station, variable, moteur, empreinte de la série annuelle). Si les
+données d'une station changent, l'empreinte change et la prévision est
+recalculée ; sinon elle est relue depuis la mémoire ou le disque.
+
+- Mémoire : LRU borné, partagé par toutes les sessions Streamlit du processus.
+- Disque : un fichier pickle par prévision, écrit de façon atomique
+  (fichier temporaire + os.replace), donc lisible sans verrou par
+  plusieurs processus. Éviction des fichiers les moins récemment utilisés.
+"""
+import os
+import pickle
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import pandas as pd
+
+
+def empreinte_serie(df):
+    """Empreinte stable d'une série annuelle (colonnes ds, y)."""
+    valeurs = pd.util.hash_pandas_object(df[['ds', 'y']], index=False).to_numpy()
+    return hashlib.sha1(valeurs.tobytes()).hexdigest()
+
+
+class ForecastCache:
+
+    def __init__(self, dossier, max_memoire=128, max_disque=2000):
+        self.dossier = Path(dossier)
+        self.dossier.mkdir(parents=True, exist_ok=True)
+        self.max_memoire = max_memoire
+        self.max_disque = max_disque
+
+        self._memoire = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits_memoire': 0, 'hits_disque': 0, 'misses': 0, 'evictions': 0}
+
+    @staticmethod
+    def cle(station, variable, moteur, df):
+        brut = f"{station}|{variable}|{moteur}|{empreinte_serie(df)}"
+        return hashlib.sha1(brut.encode('utf-8')).hexdigest()
+
+    def _chemin(self, cle):
+        return self.dossier / f"{cle}.pkl"
+
+    def get_or_compute(self, station, variable, moteur, df, calcul):
+        """
+        Renvoie la prévision en cache pour cette série, sinon appelle calcul()
+        (qui doit renvoyer un DataFrame) et l'enregistre.
+        """
+        cle = self.cle(station, variable, moteur, df)
+
+        with self._lock:
+            if cle in self._memoire:
+                self._memoire.move_to_end(cle)
+                self.stats['hits_memoire'] += 1
+                return self._memoire[cle]
+
+        forecast = self._lire_disque(cle)
+        if forecast is not None:
+            with self._lock:
+                self.stats['hits_disque'] += 1
+            self._garder_en_memoire(cle, forecast)
+            return forecast
+
+        forecast = calcul()
+        with self._lock:
+            self.stats['misses'] += 1
+        self._ecrire_disque(cle, forecast)
+        self._garder_en_memoire(cle, forecast)
+        return forecast
+
+    # ---------------------- MÉMOIRE ----------------------
+
+    def _garder_en_memoire(self, cle, forecast):
+        with self._lock:
+            self._memoire[cle] = forecast
+            self._memoire.move_to_end(cle)
+            while len(self._memoire) > self.max_memoire:
+                self._memoire.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    # ---------------------- DISQUE ----------------------
+
+    def _lire_disque(self, cle):
+        chemin = self._chemin(cle)
+        try:
+            forecast = pd.read_pickle(chemin)
+            os.utime(chemin)  # dernière utilisation, pour l'éviction LRU
+            return forecast
+        except (FileNotFoundError, EOFError, OSError, ValueError, pickle.UnpicklingError):
+            # Absent, ou supprimé / tronqué par un autre processus
+            return None
+
+    def _ecrire_disque(self, cle, forecast):
+        fd, tmp = tempfile.mkstemp(dir=self.dossier, suffix='.tmp')
+        os.close(fd)
+        try:
+            forecast.to_pickle(tmp)
+            os.replace(tmp, self._chemin(cle))
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self._evincer_disque()
+
+    def _evincer_disque(self):
+        fichiers = []
+        for chemin in self.dossier.glob('*.pkl'):
+            try:
+                fichiers.append((chemin.stat().st_mtime, chemin))
+            except FileNotFoundError:
+                continue
+
+        exces = len(fichiers) - self.max_disque
+        if exces <= 0:
+            return
+        for _, chemin in sorted(fichiers)[:exces]:
+            try:
+                chemin.unlink()
+                with self._lock:
+                    self.stats['evictions'] += 1
+            except FileNotFoundError:
+                pass
+
+    # ---------------------- STATISTIQUES ----------------------
+
+    def hit_rate(self):
+        with self._lock:
+            hits = self.stats['hits_memoire'] + self.stats['hits_disque']
+            total = hits + self.stats['misses']
+        return hits / total if total else 0.0
+
+    def clear(self):
+        with self._lock:
+            self._memoire.clear()
+        for chemin in self.dossier.glob('*.pkl'):
+            chemin.unlink(missing_ok=True)
@@ -0,0 +1,117 @@
+"""
+Lecture compacte des fichiers météo journaliers.
+
+Les DataFrames sont gardés en mémoire pendant toute la vie du processus
+Streamlit : mesures en float32, stations en catégorie, altitude en int16.
+Les coordonnées restent en float64 (précision utile pour la carte).
+Seules les colonnes utilisées par l'application sont lues, depuis les CSV
+ou depuis le dossier Parquet partitionné écrit par ingestion_meteo.py.
+"""
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Stations fermées : retirées de l'analyse par station (correspondance sur une partie du nom)
+STATIONS_FERMEES = [
+    "Alex", "Bozel", "Brison", "Burzier", "Cellier Valmorel", "Chamonix - les Pèlerins",
+    "Col de Creusaz", "Col des Aravis", "Col du Champet", "Col du Chaussy", "Col du Frêne",
+    "Col du Galibier", "Col du Plainpalais", "Col du Pré", "Col du Sommeiller", "Col du Tamié",
+    "Crey Rond", "Doucy en Bauges", "Drouzin-Le-Mont", "Entremont", "Granier sur Aime",
+    "Jarrier - La Tuvière", "La Sambuy", "Le Bouchet - Mont Charvin", "Le Cry - Salvagny",
+    "Le Petit Bornand", "Les Bossons - Chamonix", "Marthod", "Molliessoulaz", "Montisel",
+    "Notre Dame du pré", "Richebourg", "Saint Nicolas la Chapelle", "Saint-Jean de Sixt",
+    "Sainte Foy", "Saxel", "Serraval", "Seytroux", "Sixt Fer à Cheval", "St-Pierre d'Entremont",
+    "Termignon", "Thônes", "Thorens Glières", "Ugine", "Val Pelouse",
+    "Verthemex - Mont du Chat", "Villards sur Thônes"
+]
+
+COLONNES_FULL = [
+    "stations", "date", "altitude", "latitude", "longitude",
+    "temperature_2m_mean", "rain_sum", "snowfall_sum", "snowfall_water_equivalent_sum"
+]
+
+COLONNES_STATIONS = ["stations", "date", "altitude", "snowfall_sum", "temperature_2m_mean"]
+
+COORDONNEES = ["latitude", "longitude"]
+
+
+def est_fermee(noms):
+    """Masque booléen : le nom contient celui d'une station fermée."""
+    motif = "|".join(re.escape(station) for station in STATIONS_FERMEES)
+    return pd.Index(noms).str.contains(motif, regex=True)
+
+
+def lendemain(date_max):
+    """Premier jour absent des données (date_max : dernier jour disponible, fuseau ignoré)."""
+    date_max = pd.Timestamp(date_max)
+    if date_max.tzinfo is not None:
+        date_max = date_max.tz_localize(None)
+    return date_max.normalize() + pd.Timedelta(days=1)
+
+
+def debut_annee_incomplete(date_max):
+    """1er janvier de la première année incomplète : borne exclue des séries annuelles."""
+    return pd.Timestamp(lendemain(date_max).year, 1, 1)
+
+
+def debut_saison_incomplete(date_max):
+    """1er août de la première saison d'hiver (août à juillet) incomplète."""
+    jour = lendemain(date_max)
+    return pd.Timestamp(jour.year if jour.month >= 8 else jour.year - 1, 8, 1)
+
+
+def compacter(df):
+    """Réduit les types en place : float32, catégorie, int16."""
+    for col in df.columns:
+        if col in COORDONNEES:
+            continue
+        if col == "stations":
+            df[col] = df[col].astype("category")
+        elif col == "altitude":
+            altitude = df[col]
+            entier = altitude.notna().all() and (altitude == altitude.round()).all()
+            df[col] = altitude.astype(np.int16 if entier else np.float32)
+        elif pd.api.types.is_float_dtype(df[col]):
+            df[col] = df[col].astype(np.float32)
+    return df
+
+
+def empreinte_memoire(df):
+    """Taille en mémoire (Mo), chaînes comprises."""
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def lire_table(path, colonnes):
+    """CSV, ou dossier Parquet (annee=AAAA/*.parquet)."""
+    path = Path(path)
+    if path.is_dir():
+        df = pd.read_parquet(path, columns=colonnes)
+        df["stations"] = df["stations"].astype("category")
+        return df
+    return pd.read_csv(path, usecols=colonnes, dtype={"stations": "category"})
+
+
+def lire_meteo_full(path):
+    df = lire_table(path, COLONNES_FULL)
+    df["date"] = pd.to_datetime(df["date"])
+    return compacter(df)
+
+
+def lire_meteo_stations(path):
+    """
+    Un seul DataFrame pour la neige et la température de l'analyse par station
+    (stations fermées exclues, neige en mètres, dates sans fuseau).
+    """
+    df = lire_table(path, COLONNES_STATIONS)
+
+    # Filtre évalué une fois par nom de station, pas une fois par ligne
+    categories = df["stations"].cat.categories
+    fermees = categories[est_fermee(categories)]
+    df = df[~df["stations"].isin(fermees)].reset_index(drop=True)
+    df["stations"] = df["stations"].cat.remove_unused_categories()
+
+    df["date"] = pd.to_datetime(df["date"], utc=True).dt.tz_localize(None)
+    df["snowfall_sum"] = df["snowfall_sum"] / 100
+    return compacter(df)
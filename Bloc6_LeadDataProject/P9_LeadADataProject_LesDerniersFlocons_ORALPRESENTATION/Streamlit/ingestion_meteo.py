@@ -0,0 +1,260 @@
+"""
+Ingestion des données météo journalières depuis l'API historique Open-Meteo.
+
+- Un client HTTP partagé (pool de connexions), un nombre borné de requêtes
+  simultanées et un débit maximal, pour rester sous les quotas de l'API.
+- Nouvelles tentatives avec attente exponentielle sur 429 / 5xx / coupure réseau.
+- Chaque station est téléchargée par tranches de quelques années ; après chaque
+  tranche, la dernière date écrite est enregistrée (_etat/<station>.json).
+  Un téléchargement interrompu reprend là où il s'était arrêté.
+- Écriture directe en Parquet partitionné par année, lisible par l'application :
+      meteo_parquet/annee=1970/<station>-19700101-19701231.parquet
+  Une fois les tranches d'une station écrites, les années qui ont reçu plusieurs
+  fichiers sont compactées en un seul par (station, année).
+
+- Mode incrémental (--incremental, à lancer chaque jour) : seules les dates
+  postérieures à la dernière date de chaque station sont demandées, puis les
+  agrégats annuels des seules (station, année) touchées sont mis à jour.
+
+Usage : python ingestion_meteo.py [--debut 1970-01-01] [--fin 2024-12-31] [--incremental]
+                                  [--concurrence 8] [--url http://localhost:8080/v1/archive]
+"""
+import random
+import asyncio
+import logging
+import argparse
+from datetime import date, datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+import aiohttp
+import numpy as np
+import pandas as pd
+
+from agregats import AgregatsAnnuels
+from stockage_meteo import EtatIngestion, compacter, ecrire_partitions
+
+BASE_DIR = Path(__file__).parent
+
+URL_ARCHIVE = "https://archive-api.open-meteo.com/v1/archive"
+
+# Variables journalières du jeu de données de l'application
+VARIABLES = [
+    "temperature_2m_mean", "temperature_2m_max", "temperature_2m_min",
+    "soil_temperature_0_to_100cm_mean", "snowfall_sum", "snowfall_water_equivalent_sum",
+    "rain_sum", "sunshine_duration", "wind_speed_10m_mean", "cloud_cover_mean"
+]
+
+STATUTS_A_REESSAYER = {429, 500, 502, 503, 504}
+
+# L'API historique publie les données avec quelques jours de retard
+DELAI_PUBLICATION = timedelta(days=5)
+
+logger = logging.getLogger(__name__)
+
+
+def stations_depuis_csv(path):
+    """Une ligne par station : stations, latitude, longitude, altitude."""
+    df = pd.read_csv(path, usecols=["stations", "latitude", "longitude", "altitude"])
+    return df.drop_duplicates("stations").reset_index(drop=True)
+
+
+def tranches(debut, fin, annees):
+    """Découpe [debut, fin] en intervalles de `annees` années civiles au plus."""
+    while debut <= fin:
+        borne = min(date(debut.year + annees - 1, 12, 31), fin)
+        yield debut, borne
+        debut = borne + timedelta(days=1)
+
+
+def delai_retry_after(valeur):
+    """Secondes demandées par un en-tête Retry-After (délai ou date HTTP), None si absent ou illisible."""
+    if not valeur:
+        return None
+    try:
+        return max(0.0, float(valeur))
+    except ValueError:
+        pass
+    try:
+        echeance = parsedate_to_datetime(valeur)
+    except (TypeError, ValueError):
+        return None
+    if echeance.tzinfo is None:
+        echeance = echeance.replace(tzinfo=timezone.utc)
+    return max(0.0, (echeance - datetime.now(timezone.utc)).total_seconds())
+
+
+class ErreurTemporaire(Exception):
+
+    def __init__(self, statut, retry_after=None):
+        super().__init__(f"HTTP {statut}")
+        self.retry_after = retry_after
+
+
+class Limiteur:
+    """Espace les départs de requêtes d'au moins 1 / requetes_par_seconde."""
+
+    def __init__(self, requetes_par_seconde):
+        self.intervalle = 1 / requetes_par_seconde if requetes_par_seconde else 0.0
+        self._prochain = 0.0
+        self._lock = asyncio.Lock()
+
+    async def attendre(self):
+        async with self._lock:
+            maintenant = asyncio.get_running_loop().time()
+            attente = self._prochain - maintenant
+            self._prochain = max(maintenant, self._prochain) + self.intervalle
+        if attente > 0:
+            await asyncio.sleep(attente)
+
+
+class IngestionMeteo:
+
+    def __init__(self, dossier, url=URL_ARCHIVE, concurrence=8, requetes_par_seconde=5,
+                 tentatives=5, delai_base=1.0, annees_par_requete=10, timeout=60):
+        self.dossier = Path(dossier)
+        self.url = url
+        self.concurrence = concurrence
+        self.requetes_par_seconde = requetes_par_seconde
+        self.tentatives = tentatives
+        self.delai_base = delai_base
+        self.annees_par_requete = annees_par_requete
+        self.timeout = timeout
+        self.etat = EtatIngestion(self.dossier)
+        self.stats = {"requetes": 0, "nouvelles_tentatives": 0, "lignes": 0, "fichiers": 0, "compactions": 0}
+
+    # ---------------------- HTTP ----------------------
+
+    async def _telecharger(self, session, station, debut, fin):
+        params = {
+            "latitude": station.latitude,
+            "longitude": station.longitude,
+            "start_date": debut.isoformat(),
+            "end_date": fin.isoformat(),
+            "daily": ",".join(VARIABLES),
+            "timezone": "GMT",
+        }
+
+        for tentative in range(self.tentatives):
+            await self._limiteur.attendre()
+            try:
+                async with self._semaphore:
+                    self.stats["requetes"] += 1
+                    async with session.get(self.url, params=params) as reponse:
+                        if reponse.status in STATUTS_A_REESSAYER:
+                            raise ErreurTemporaire(reponse.status, reponse.headers.get("Retry-After"))
+                        if reponse.status >= 400:
+                            # Requête invalide : inutile de réessayer
+                            raise RuntimeError(f"{station.stations} : HTTP {reponse.status} {await reponse.text()}")
+                        donnees = await reponse.json(content_type=None)
+                return self._vers_dataframe(station, donnees)
+
+            except (ErreurTemporaire, aiohttp.ClientError, asyncio.TimeoutError) as erreur:
+                if tentative == self.tentatives - 1:
+                    raise
+                delai = delai_retry_after(getattr(erreur, "retry_after", None))
+                if delai is None:
+                    delai = self.delai_base * 2 ** tentative * (1 + random.random())
+                self.stats["nouvelles_tentatives"] += 1
+                logger.warning("%s [%s, %s] : %s, nouvel essai dans %.1f s",
+                               station.stations, debut, fin, erreur, delai)
+                await asyncio.sleep(delai)
+
+    @staticmethod
+    def _vers_dataframe(station, donnees):
+        journalier = donnees["daily"]
+        df = pd.DataFrame({"date": pd.to_datetime(journalier["time"])})
+        for variable in VARIABLES:
+            df[variable] = np.asarray(journalier.get(variable, [None] * len(df)), dtype=np.float32)
+
+        # Les derniers jours ne sont pas encore publiés par l'API (valeurs nulles)
+        df = df[df[VARIABLES].notna().any(axis=1)]
+
+        df.insert(0, "stations", station.stations)
+        df.insert(2, "altitude", station.altitude)
+        df.insert(3, "latitude", station.latitude)
+        df.insert(4, "longitude", station.longitude)
+        return df.reset_index(drop=True)
+
+    # ---------------------- STATIONS ----------------------
+
+    async def _station(self, session, station, debut, fin):
+        derniere = self.etat.lire(station.stations)
+        if derniere is not None:
+            debut = max(debut, derniere + timedelta(days=1))
+
+        lignes = 0
+        # L'année du point de reprise est recompactée au cas où une interruption l'aurait laissée inachevée
+        annees = {derniere.year} if derniere is not None else set()
+        for debut_tranche, fin_tranche in tranches(debut, fin, self.annees_par_requete):
+            df = await self._telecharger(session, station, debut_tranche, fin_tranche)
+            if df.empty:
+                continue
+            entrees = await asyncio.to_thread(ecrire_partitions, self.dossier, df)
+            # Journal avant le point de reprise : un fichier réécrit après une
+            # interruption apparaît deux fois au journal, jamais zéro
+            self.etat.journaliser(entrees)
+            self.etat.ecrire(station.stations, df["date"].max().date())
+
+            lignes += len(df)
+            self.stats["lignes"] += len(df)
+            self.stats["fichiers"] += len(entrees)
+            annees.update(e["annee"] for e in entrees)
+
+        for annee in sorted(annees):
+            if await asyncio.to_thread(compacter, self.dossier, self.etat, station.stations, annee):
+                self.stats["compactions"] += 1
+        return lignes
+
+    async def executer(self, stations, debut=date(1970, 1, 1), fin=date(2024, 12, 31)):
+        """
+        Télécharge [debut, fin] pour chaque station (DataFrame stations, latitude,
+        longitude, altitude). Renvoie {station: nombre de lignes écrites ou exception}.
+        """
+        self._semaphore = asyncio.Semaphore(self.concurrence)
+        self._limiteur = Limiteur(self.requetes_par_seconde)
+
+        connecteur = aiohttp.TCPConnector(limit=self.concurrence, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connecteur, timeout=timeout) as session:
+            resultats = await asyncio.gather(
+                *(self._station(session, station, debut, fin) for station in stations.itertuples(index=False)),
+                return_exceptions=True
+            )
+
+        bilan = dict(zip(stations["stations"], resultats))
+        for station, resultat in bilan.items():
+            if isinstance(resultat, Exception):
+                logger.error("%s : échec (%s), reprise possible en relançant l'ingestion", station, resultat)
+        return bilan
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingestion Open-Meteo vers Parquet partitionné")
+    parser.add_argument("--stations", default=BASE_DIR / "donnees_meteo_148_stations.csv")
+    parser.add_argument("--dossier", default=BASE_DIR / "meteo_parquet")
+    parser.add_argument("--debut", type=date.fromisoformat, default=date(1970, 1, 1))
+    parser.add_argument("--fin", type=date.fromisoformat, default=date(2024, 12, 31))
+    parser.add_argument("--incremental", action="store_true",
+                        help="jusqu'aux dernières données publiées, à partir de la dernière date de chaque station")
+    parser.add_argument("--concurrence", type=int, default=8)
+    parser.add_argument("--debit", type=float, default=5, help="requêtes par seconde au plus")
+    parser.add_argument("--url", default=URL_ARCHIVE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    ingestion = IngestionMeteo(args.dossier, url=args.url, concurrence=args.concurrence,
+                               requetes_par_seconde=args.debit)
+    fin = date.today() - DELAI_PUBLICATION if args.incremental else args.fin
+    bilan = asyncio.run(ingestion.executer(stations_depuis_csv(args.stations), args.debut, fin))
+
+    echecs = [station for station, r in bilan.items() if isinstance(r, Exception)]
+    print(f"{len(bilan) - len(echecs)} stations à jour, {len(echecs)} en échec ; {ingestion.stats}")
+
+    # Seuls les fichiers ajoutés depuis la dernière mise à jour sont relus
+    touchees = AgregatsAnnuels(args.dossier).mettre_a_jour()
+    print(f"agrégats annuels recalculés pour {len(touchees)} couples (station, année)")
+
+
+if __name__ == "__main__":
+    main()
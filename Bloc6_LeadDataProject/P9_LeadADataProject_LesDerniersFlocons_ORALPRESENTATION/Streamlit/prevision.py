@@ -0,0 +1,218 @@
+"""
+Prévision de tendance linéaire par morceaux, en NumPy.
+
+Alternative rapide à Prophet pour les séries annuelles de l'application
+(toutes saisonnalités désactivées) : même mise à l'échelle de ds et y,
+même placement des points de rupture, mêmes colonnes en sortie que
+``Prophet.predict`` et même rendu avec ``plot``.
+
+Plusieurs séries (une par station) sont ajustées en une seule résolution
+de moindres carrés pénalisés, résolue en lot avec ``np.linalg.solve``.
+"""
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+
+# Colonnes renvoyées par Prophet.predict lorsque aucune saisonnalité n'est active
+COLONNES_PREVISION = [
+    'ds', 'trend', 'yhat_lower', 'yhat_upper', 'trend_lower', 'trend_upper',
+    'additive_terms', 'additive_terms_lower', 'additive_terms_upper',
+    'multiplicative_terms', 'multiplicative_terms_lower', 'multiplicative_terms_upper',
+    'yhat'
+]
+
+
+class TrendForecaster:
+    """
+    Tendance linéaire par morceaux : y(t) = m + k.t + somme_j delta_j.(t - s_j)+
+
+    Les a priori de Prophet (k, m ~ N(0, 5), delta ~ Laplace(0, tau)) sont
+    approchés par une pénalité ridge, ce qui donne une solution fermée.
+    Les bandes d'incertitude suivent la méthode de Prophet : ruptures futures
+    simulées (fréquence et amplitude moyennes de l'historique) + bruit observé.
+    """
+
+    def __init__(self, n_changepoints=25, changepoint_range=0.8,
+                 changepoint_prior_scale=0.05, interval_width=0.8,
+                 uncertainty_samples=1000, random_state=0):
+        self.n_changepoints = n_changepoints
+        self.changepoint_range = changepoint_range
+        self.changepoint_prior_scale = changepoint_prior_scale
+        self.interval_width = interval_width
+        self.uncertainty_samples = uncertainty_samples
+        self.random_state = random_state
+
+    # ---------------------- AJUSTEMENT ----------------------
+
+    def fit(self, df, by=None):
+        """
+        df : colonnes 'ds' et 'y' (format Prophet).
+        by : colonne identifiant les séries pour en ajuster plusieurs à la fois.
+        """
+        self.by = by
+        if by is None:
+            df = df.assign(_serie=0)
+            by = '_serie'
+
+        self.history = df[[by, 'ds', 'y']].dropna().copy()
+        self.history['ds'] = pd.to_datetime(self.history['ds'])
+
+        pivot = self.history.pivot_table(index='ds', columns=by, values='y', aggfunc='mean').sort_index()
+        self.series = pivot.columns
+        self.ds_history = pivot.index
+
+        Y = pivot.to_numpy(dtype=np.float64).T  # (séries, dates)
+        W = (~np.isnan(Y)).astype(np.float64)
+
+        # Mise à l'échelle identique à Prophet
+        self.start = self.ds_history.min()
+        self.t_scale = max((self.ds_history.max() - self.start).total_seconds(), 1.0)
+        t = self._temps(self.ds_history)
+
+        self.y_scale = np.nanmax(np.abs(Y), axis=1)
+        self.y_scale[~(self.y_scale > 0)] = 1.0
+        Ys = np.nan_to_num(Y / self.y_scale[:, None])
+
+        # Points de rupture : répartis sur les premiers 80 % de l'historique
+        hist_size = int(np.floor(len(t) * self.changepoint_range))
+        n_cp = max(min(self.n_changepoints, hist_size - 1), 0)
+        cp_index = np.linspace(0, hist_size - 1, n_cp + 1).round().astype(int)[1:]
+        self.changepoints_t = t[cp_index]
+
+        X = self._base(t)
+        penalite = np.concatenate([[1 / 25, 1 / 25], np.full(n_cp, 1 / self.changepoint_prior_scale ** 2)])
+
+        # Deux passes : la pénalité est exprimée en unités de la variance du bruit
+        sigma2 = np.full(len(Y), 0.01)
+        for _ in range(2):
+            A = np.einsum('st,tp,tq->spq', W, X, X) + sigma2[:, None, None] * np.diag(penalite)
+            b = np.einsum('st,tp->sp', W * Ys, X)
+            self.params = np.linalg.solve(A, b[..., None])[..., 0]
+
+            residus = (Ys - self.params @ X.T) * W
+            sigma2 = np.maximum((residus ** 2).sum(axis=1) / np.maximum(W.sum(axis=1), 1), 1e-8)
+
+        self.sigma = np.sqrt(sigma2)
+        return self
+
+    def _temps(self, ds):
+        return ((pd.DatetimeIndex(ds) - self.start).total_seconds() / self.t_scale).to_numpy()
+
+    def _base(self, t):
+        return np.column_stack([np.ones_like(t), t, np.clip(t[:, None] - self.changepoints_t, 0, None)])
+
+    # ---------------------- PRÉVISION ----------------------
+
+    def make_future_dataframe(self, periods, freq='YS', include_history=True):
+        last = self.ds_history.max()
+        dates = pd.date_range(start=last, periods=periods + 1, freq=freq)
+        dates = dates[dates > last][:periods]
+        if include_history:
+            dates = self.ds_history.append(dates)
+        return pd.DataFrame({'ds': dates})
+
+    def predict(self, future=None):
+        if future is None:
+            future = self.make_future_dataframe(0)
+
+        ds = pd.DatetimeIndex(pd.to_datetime(future['ds']))
+        t = self._temps(ds)
+        trend = self.params @ self._base(t).T  # (séries, dates), à l'échelle
+
+        trend_lower, trend_upper, yhat_lower, yhat_upper = self._incertitude(t, trend)
+
+        n_series, n_dates = trend.shape
+        scale = self.y_scale[:, None]
+        zeros = np.zeros(n_series * n_dates)
+
+        forecast = pd.DataFrame({
+            'ds': np.tile(ds.to_numpy(), n_series),
+            'trend': (trend * scale).ravel(),
+            'yhat_lower': (yhat_lower * scale).ravel(),
+            'yhat_upper': (yhat_upper * scale).ravel(),
+            'trend_lower': (trend_lower * scale).ravel(),
+            'trend_upper': (trend_upper * scale).ravel(),
+            'additive_terms': zeros,
+            'additive_terms_lower': zeros,
+            'additive_terms_upper': zeros,
+            'multiplicative_terms': zeros,
+            'multiplicative_terms_lower': zeros,
+            'multiplicative_terms_upper': zeros,
+            'yhat': (trend * scale).ravel(),
+        }, columns=COLONNES_PREVISION)
+
+        if self.by is not None:
+            forecast.insert(0, self.by, np.repeat(self.series.to_numpy(), n_dates))
+        return forecast
+
+    def _incertitude(self, t, trend):
+        alpha = (1 - self.interval_width) / 2
+        trend_lower, trend_upper = trend.copy(), trend.copy()
+
+        # Historique : la tendance est fixe, seul le bruit d'observation compte
+        z = NormalDist().inv_cdf(1 - alpha)
+        yhat_lower = trend - z * self.sigma[:, None]
+        yhat_upper = trend + z * self.sigma[:, None]
+
+        futur = np.flatnonzero(t > 1)
+        if len(futur) == 0 or self.uncertainty_samples == 0:
+            return trend_lower, trend_upper, yhat_lower, yhat_upper
+
+        # Futur : ruptures simulées sur chaque intervalle entre deux dates prévues
+        rng = np.random.default_rng(self.random_state)
+        n_series, n_samples = len(trend), self.uncertainty_samples
+        n_cp = len(self.changepoints_t)
+        deltas = self.params[:, 2:]
+        mean_delta = (np.abs(deltas).mean(axis=1) if n_cp else np.zeros(n_series)) + 1e-8
+
+        t_futur = t[futur]
+        debut = np.concatenate([[1.0], t_futur[:-1]])
+        largeur = t_futur - debut
+
+        n_ruptures = rng.poisson(max(n_cp, 1) * largeur, size=(n_series, n_samples, len(futur)))
+        k_max = max(int(n_ruptures.max()), 1)
+        positions = debut[:, None] + rng.random((n_series, n_samples, len(futur), k_max)) * largeur[:, None]
+        actives = np.arange(k_max) < n_ruptures[..., None]
+        amplitudes = rng.laplace(0, 1, positions.shape) * mean_delta[:, None, None, None] * actives
+
+        echantillons = np.repeat(trend[:, None, futur], n_samples, axis=1)
+        for j, tj in enumerate(t_futur):
+            echantillons[:, :, j] += (amplitudes * np.clip(tj - positions, 0, None)).sum(axis=(2, 3))
+
+        bruit = rng.normal(0, 1, echantillons.shape) * self.sigma[:, None, None]
+        quantiles = [alpha, 1 - alpha]
+        trend_lower[:, futur], trend_upper[:, futur] = np.quantile(echantillons, quantiles, axis=1)
+        yhat_lower[:, futur], yhat_upper[:, futur] = np.quantile(echantillons + bruit, quantiles, axis=1)
+
+        return trend_lower, trend_upper, yhat_lower, yhat_upper
+
+    # ---------------------- AFFICHAGE ----------------------
+
+    def plot(self, forecast, serie=None, xlabel='ds', ylabel='y', figsize=(10, 6)):
+        """Même rendu que Prophet.plot : points observés, tendance, bande d'incertitude."""
+        history = self.history
+        if self.by is not None:
+            history = history[history[self.by] == serie]
+            forecast = forecast[forecast[self.by] == serie]
+        return tracer_prevision(history, forecast, xlabel, ylabel, figsize)
+
+
+def tracer_prevision(history, forecast, xlabel='ds', ylabel='y', figsize=(10, 6)):
+    """
+    Même rendu que Prophet.plot à partir de l'historique (ds, y) et d'une prévision :
+    utilisable sans le modèle, par exemple pour une prévision relue depuis le cache.
+    """
+    fig = plt.figure(facecolor='w', figsize=figsize)
+    ax = fig.add_subplot(111)
+    ax.plot(history['ds'], history['y'], 'k.', label='Observed data points')
+    ax.plot(forecast['ds'], forecast['yhat'], ls='-', c='#0072B2', label='Forecast')
+    ax.fill_between(forecast['ds'], forecast['yhat_lower'], forecast['yhat_upper'],
+                    color='#0072B2', alpha=0.2, label='Uncertainty interval')
+    ax.grid(True, which='major', c='gray', ls='-', lw=1, alpha=0.2)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    fig.tight_layout()
+    return fig
@@ -0,0 +1,173 @@
+"""
+Organisation du dossier Parquet des données météo journalières.
+
+    meteo_parquet/
+        annee=1970/<station>-19700101-19701231.parquet
+        ...
+        _etat/<station>.json      dernière date écrite par station (high-water mark)
+        _etat/journal.jsonl       une ligne par fichier ajouté ou compacté, dans l'ordre d'écriture
+        _agregats/                agrégats annuels tenus à jour (agregats.py)
+
+Les dossiers préfixés par "_" et les fichiers préfixés par "." sont ignorés
+par pd.read_parquet. Partagé par l'ingestion (ingestion_meteo.py), les
+agrégats incrémentaux et l'application.
+"""
+import os
+import re
+import json
+import tempfile
+import threading
+import unicodedata
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+
+def slug(station):
+    """Nom de fichier stable pour une station (sans accents ni espaces)."""
+    ascii_ = unicodedata.normalize("NFKD", station).encode("ascii", "ignore").decode()
+    return re.sub(r"[^A-Za-z0-9]+", "_", ascii_).strip("_").lower()
+
+
+def ecrire_atomique(chemin, ecrire):
+    """ecrire(tmp) puis renommage : un lecteur ne voit jamais de fichier partiel."""
+    chemin = Path(chemin)
+    chemin.parent.mkdir(parents=True, exist_ok=True)
+    # Préfixe "." : ignoré par pd.read_parquet pendant l'écriture
+    fd, tmp = tempfile.mkstemp(dir=chemin.parent, prefix=".", suffix=".tmp")
+    os.close(fd)
+    try:
+        ecrire(tmp)
+        os.replace(tmp, chemin)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def ecrire_partitions(dossier, df):
+    """
+    Un fichier par (année, station) ; le nom porte les dates couvertes, donc un
+    ajout ultérieur dans la même année crée un nouveau fichier à côté, fusionné
+    ensuite par compacter(). Renvoie les entrées de journal correspondantes.
+    """
+    entrees = []
+    station = df["stations"].iloc[0]
+    for annee, part in df.groupby(df["date"].dt.year):
+        debut, fin = part["date"].min(), part["date"].max()
+        relatif = f"annee={annee}/{slug(station)}-{debut:%Y%m%d}-{fin:%Y%m%d}.parquet"
+        ecrire_atomique(Path(dossier) / relatif, lambda tmp, part=part: part.to_parquet(tmp, index=False))
+        entrees.append({
+            "fichier": relatif, "station": station, "annee": int(annee),
+            "debut": debut.date().isoformat(), "fin": fin.date().isoformat(),
+        })
+    return entrees
+
+
+def compacter(dossier, etat, station, annee):
+    """
+    Réécrit les fichiers de `station` pour `annee` en un seul, nommé d'après
+    les dates couvertes. Ordre : nouveau fichier, entrée de journal
+    ("compacte" + "remplace"), puis suppression des anciens. La fusion repart
+    des fichiers sur disque (jours en double retirés) : relancée après une
+    interruption, elle termine le travail. Renvoie l'entrée, None si un seul fichier.
+    """
+    partition = Path(dossier) / f"annee={annee}"
+    anciens = sorted(partition.glob(f"{slug(station)}-*.parquet"))
+    if len(anciens) < 2:
+        return None
+
+    df = pd.concat([pd.read_parquet(p) for p in anciens], ignore_index=True)
+    df = df.drop_duplicates("date", keep="last").sort_values("date").reset_index(drop=True)
+    debut, fin = df["date"].min(), df["date"].max()
+    relatif = f"annee={annee}/{slug(station)}-{debut:%Y%m%d}-{fin:%Y%m%d}.parquet"
+    ecrire_atomique(Path(dossier) / relatif, lambda tmp: df.to_parquet(tmp, index=False))
+
+    remplaces = [str(p.relative_to(dossier)) for p in anciens if str(p.relative_to(dossier)) != relatif]
+    entree = {
+        "compacte": relatif, "remplace": remplaces, "station": station, "annee": int(annee),
+        "debut": debut.date().isoformat(), "fin": fin.date().isoformat(),
+    }
+    etat.journaliser([entree])
+    for ancien in remplaces:
+        (Path(dossier) / ancien).unlink(missing_ok=True)
+    return entree
+
+
+class EtatIngestion:
+    """Dernière date écrite par station et journal des fichiers ajoutés."""
+
+    def __init__(self, dossier):
+        self.dossier = Path(dossier) / "_etat"
+        self.journal = self.dossier / "journal.jsonl"
+        self._lock = threading.Lock()
+
+    def _chemin(self, station):
+        return self.dossier / f"{slug(station)}.json"
+
+    def lire(self, station):
+        try:
+            with open(self._chemin(station), encoding="utf-8") as f:
+                return date.fromisoformat(json.load(f)["derniere_date"])
+        except FileNotFoundError:
+            return None
+
+    def ecrire(self, station, derniere_date):
+        contenu = json.dumps({"station": station, "derniere_date": derniere_date.isoformat()}, ensure_ascii=False)
+        ecrire_atomique(self._chemin(station), lambda tmp: Path(tmp).write_text(contenu, encoding="utf-8"))
+
+    def toutes(self):
+        etats = {}
+        for chemin in self.dossier.glob("*.json"):
+            with open(chemin, encoding="utf-8") as f:
+                contenu = json.load(f)
+            etats[contenu["station"]] = date.fromisoformat(contenu["derniere_date"])
+        return etats
+
+    def journaliser(self, entrees):
+        # Ajout en fin de fichier : les lignes déjà lues ne changent jamais
+        lignes = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entrees)
+        with self._lock:
+            self.dossier.mkdir(parents=True, exist_ok=True)
+            with open(self.journal, "a", encoding="utf-8") as f:
+                f.write(lignes)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def lire_journal(self):
+        if not self.journal.exists():
+            return []
+        with open(self.journal, encoding="utf-8") as f:
+            # Une dernière ligne incomplète (écriture en cours) est ignorée
+            return [json.loads(ligne) for ligne in f if ligne.endswith("\n")]
+
+    def remplacants(self, journal=None):
+        """{fichier supprimé par une compaction : fichier qui contient aujourd'hui ses lignes}."""
+        journal = self.lire_journal() if journal is None else journal
+        remplace = {}
+        for e in journal:
+            for ancien in e.get("remplace", []):
+                remplace[ancien] = e["compacte"]
+
+        def actuel(fichier):
+            # Compactions successives : le fichier d'une compaction peut être remplacé à son tour
+            while fichier in remplace:
+                fichier = remplace[fichier]
+            return fichier
+        return {ancien: actuel(ancien) for ancien in remplace}
+
+    def fichiers_actuels(self, journal=None):
+        """Fichiers de données qui doivent être sur disque d'après le journal."""
+        journal = self.lire_journal() if journal is None else journal
+        fichiers = {e.get("fichier", e.get("compacte")) for e in journal}
+        return fichiers - set(self.remplacants(journal))
+
+
+def version_donnees(dossier):
+    """Change à chaque ajout ou compaction de fichiers : sert de clé aux caches de l'application."""
+    journal = Path(dossier) / "_etat" / "journal.jsonl"
+    try:
+        stat = journal.stat()
+    except FileNotFoundError:
+        return 0
+    return stat.st_size
@@ -6,10 +6,19 @@ import pandas as pd
 import numpy as np
 import warnings
 import folium
+from folium.plugins import FastMarkerCluster
 from streamlit_folium import st_folium
 from prophet import Prophet
 from pathlib import Path
 
+from prevision import TrendForecaster, tracer_prevision
+from cache_previsions import ForecastCache, empreinte_serie
+from survie import SurvieStations, ModeleCox, tracer_courbes
+from agregats import CubeAltitude, AgregatsAnnuels
+from chargement import (lire_meteo_full, lire_meteo_stations, lire_table, est_fermee,
+                        debut_annee_incomplete, debut_saison_incomplete)
+from stockage_meteo import EtatIngestion, version_donnees
+
 # Répertoire racine
 BASE_DIR = Path(__file__).parent
 
@@ -21,23 +30,47 @@ st.set_page_config(page_title="Les Derniers Flocons", layout="wide")
 
 # ---------------------- FONCTIONS DE CHARGEMENT ----------------------
 
-@st.cache_data
-def load_data_full():
-    df_full = pd.read_csv(BASE_DIR / "donnees_meteo_avec_stations_et_altitudes_full.csv")
-    df_full['date'] = pd.to_datetime(df_full['date'])
-    df_full['year'] = df_full['date'].dt.year
+# Écrit par ingestion_meteo.py ; à défaut, les CSV livrés avec l'application
+DOSSIER_PARQUET = BASE_DIR / "meteo_parquet"
+
+# Le dossier Parquet ne contient que les 148 stations de l'ingestion : le jeu
+# complet reste lu depuis son CSV
+SOURCES_PARQUET = {"donnees_meteo_148_stations.csv": DOSSIER_PARQUET}
+
+
+def source_meteo(nom_csv):
+    dossier = SOURCES_PARQUET.get(nom_csv)
+    return dossier if dossier is not None and dossier.is_dir() else BASE_DIR / nom_csv
+
+
+def version_meteo():
+    # Change après chaque ingestion incrémentale : les chargements ci-dessous en dépendent
+    return version_donnees(DOSSIER_PARQUET)
 
-    df_filtered = df_full[df_full['year'] < 2025]
-    df_filtered2 = df_full[df_full['date'] < '2024-08-01']
-    df_filtered2['season'] = df_filtered2['date'].apply(lambda x: x.year if x.month >= 8 else x.year - 1)
+
+@st.cache_resource(max_entries=1)
+def load_data_full(version=0):
+    # Partagé en lecture seule entre les sessions (pas de copie à chaque appel)
+    df_full = lire_meteo_full(source_meteo("donnees_meteo_avec_stations_et_altitudes_full.csv"))
+    df_full['year'] = df_full['date'].dt.year.astype(np.int16)
+
+    # Années et saisons incomplètes exclues, d'après la dernière date des données
+    date_max = df_full['date'].max()
+    annee_limite = debut_annee_incomplete(date_max).year
+    saison_limite = debut_saison_incomplete(date_max).tz_localize(df_full['date'].dt.tz)
+
+    df_filtered = df_full[df_full['year'] < annee_limite]
+    df_filtered2 = df_full[df_full['date'] < saison_limite]
+    # Saison d'hiver : d'août à juillet, rattachée à l'année de début
+    season = (df_filtered2['year'] - (df_filtered2['date'].dt.month < 8)).rename('season')
 
     df_yearly = df_full.groupby('year')[['rain_sum', 'snowfall_water_equivalent_sum']].sum().reset_index()
-    df_yearly = df_yearly[df_yearly['year'] != 2025]
+    df_yearly = df_yearly[df_yearly['year'] < annee_limite]
     df_yearly_mean = df_filtered.groupby('year')['temperature_2m_mean'].mean().reset_index()
     df_yearly_mean2 = df_filtered.groupby('year')['rain_sum'].mean().reset_index()
     df_yearly_mean3 = df_filtered.groupby('year')['snowfall_sum'].mean().reset_index()
 
-    seasonal_snowfall = df_filtered2.groupby('season')['snowfall_sum'].sum().reset_index()
+    seasonal_snowfall = df_filtered2.groupby(season)['snowfall_sum'].sum().reset_index()
     seasonal_snowfall['snowfall_sum'] = seasonal_snowfall['snowfall_sum'] / 1000
     seasonal_snowfall = seasonal_snowfall.sort_values('season')
 
@@ -59,67 +92,33 @@ def load_data_full():
     return df_full, x1, y1, x2, y2, x3, y3, df_yearly, seasonal_snowfall, quad_curve, quad_curve2, quad_curve3
 
 
-@st.cache_data
-def load_data_prophet():
-    df_prophet = pd.read_csv(BASE_DIR / "donnees_meteo_148_stations.csv")
-    stations_fermees = [
-        "Alex", "Bozel", "Brison", "Burzier", "Cellier Valmorel", "Chamonix - les Pèlerins",
-        "Col de Creusaz", "Col des Aravis", "Col du Champet", "Col du Chaussy", "Col du Frêne",
-        "Col du Galibier", "Col du Plainpalais", "Col du Pré", "Col du Sommeiller", "Col du Tamié",
-        "Crey Rond", "Doucy en Bauges", "Drouzin-Le-Mont", "Entremont", "Granier sur Aime",
-        "Jarrier - La Tuvière", "La Sambuy", "Le Bouchet - Mont Charvin", "Le Cry - Salvagny",
-        "Le Petit Bornand", "Les Bossons - Chamonix", "Marthod", "Molliessoulaz", "Montisel",
-        "Notre Dame du pré", "Richebourg", "Saint Nicolas la Chapelle", "Saint-Jean de Sixt",
-        "Sainte Foy", "Saxel", "Serraval", "Seytroux", "Sixt Fer à Cheval", "St-Pierre d'Entremont",
-        "Termignon", "Thônes", "Thorens Glières", "Ugine", "Val Pelouse",
-        "Verthemex - Mont du Chat", "Villards sur Thônes"
-    ]
-
-    for station in stations_fermees:
-        suppression = df_prophet[df_prophet["stations"].apply(lambda x: station in x)].index
-        df_prophet = df_prophet.drop(suppression)
-
-    df_prophet = df_prophet.drop(columns=[
-        "Unnamed: 0_x", "Unnamed: 0_y", "latitude", "longitude",
-        "snowfall_water_equivalent_sum", "wind_speed_10m_mean", "soil_temperature_0_to_100cm_mean",
-        "temperature_2m_max", "sunshine_duration", "temperature_2m_mean",
-        "cloud_cover_mean", "rain_sum", "temperature_2m_min"
-    ], axis=1)
-
-    df_prophet["snowfall_sum"] = df_prophet["snowfall_sum"] / 100
-
-    return df_prophet
+@st.cache_resource(max_entries=1)
+def load_data_prophet(version=0):
+    # Neige et température dans un seul DataFrame compact, partagé en lecture seule
+    return lire_meteo_stations(source_meteo("donnees_meteo_148_stations.csv"))
 
 
-@st.cache_data
-def load_data_prophet2():
-    df_prophet2 = pd.read_csv(BASE_DIR / "donnees_meteo_148_stations.csv")
-
-    stations_fermees = [
-        "Alex", "Bozel", "Brison", "Burzier", "Cellier Valmorel", "Chamonix - les Pèlerins",
-        "Col de Creusaz", "Col des Aravis", "Col du Champet", "Col du Chaussy", "Col du Frêne",
-        "Col du Galibier", "Col du Plainpalais", "Col du Pré", "Col du Sommeiller", "Col du Tamié",
-        "Crey Rond", "Doucy en Bauges", "Drouzin-Le-Mont", "Entremont", "Granier sur Aime",
-        "Jarrier - La Tuvière", "La Sambuy", "Le Bouchet - Mont Charvin", "Le Cry - Salvagny",
-        "Le Petit Bornand", "Les Bossons - Chamonix", "Marthod", "Molliessoulaz", "Montisel",
-        "Notre Dame du pré", "Richebourg", "Saint Nicolas la Chapelle", "Saint-Jean de Sixt",
-        "Sainte Foy", "Saxel", "Serraval", "Seytroux", "Sixt Fer à Cheval", "St-Pierre d'Entremont",
-        "Termignon", "Thônes", "Thorens Glières", "Ugine", "Val Pelouse",
-        "Verthemex - Mont du Chat", "Villards sur Thônes"
-    ]
-
-    for station in stations_fermees:
-        suppression = df_prophet2[df_prophet2["stations"].apply(lambda x: station in x)].index
-        df_prophet2 = df_prophet2.drop(suppression)
-
-    df_prophet2 = df_prophet2.drop(columns=[
-        "Unnamed: 0_x", "Unnamed: 0_y", "latitude", "longitude",
-        "snowfall_water_equivalent_sum", "snowfall_sum", "wind_speed_10m_mean",
-        "soil_temperature_0_to_100cm_mean", "temperature_2m_max",
-        "sunshine_duration", "cloud_cover_mean", "rain_sum", "temperature_2m_min"
-    ], axis=1)
-
-    return df_prophet2
+@st.cache_data(max_entries=1)
+def limite_stations(version=0):
+    # 1er janvier de la dernière année incomplète : d'après les points de reprise
+    # de l'ingestion, sinon d'après les données des stations
+    etats = EtatIngestion(DOSSIER_PARQUET).toutes() if DOSSIER_PARQUET.is_dir() else {}
+    date_max = max(etats.values()) if etats else load_data_prophet(version)['date'].max()
+    return debut_annee_incomplete(date_max)
+
+
+@st.cache_resource(max_entries=1)
+def load_cube_altitude(version=0):
+    # Agrégats (altitude x année) de la neige et de la température, construits une seule fois
+    variables = ['snowfall_sum', 'temperature_2m_mean']
+    table = AgregatsAnnuels(DOSSIER_PARQUET).charger()
+    if table is None:
+        return CubeAltitude.from_daily(load_data_prophet(version), variables, limite_stations(version))
+
+    # Agrégats annuels tenus à jour par l'ingestion : mêmes filtres que load_data_prophet
+    table = table[~est_fermee(table.index.get_level_values('stations'))]
+    table = table.assign(snowfall_sum_sum=table['snowfall_sum_sum'] / 100)
+    return CubeAltitude.from_annuels(table, variables, limite_stations(version))
 
 
 @st.cache_data
@@ -127,53 +126,165 @@ def load_data_result():
     return pd.read_csv(BASE_DIR / "df_combined_cox_results.csv")
 
 
-# ---------------------- CHARGEMENT DES DONNÉES ----------------------
-df_meteo_full, x1, y1, x2, y2, x3, y3, df_yearly, seasonal_snowfall, quad_curve, quad_curve2, quad_curve3 = load_data_full()
-df_prophet = load_data_prophet()
-df_prophet2 = load_data_prophet2()
-df_result = load_data_result()
+@st.cache_resource
+def load_survie_stations():
+    # Matrice stations x années, partagée (lecture seule) entre les sessions
+    return SurvieStations.from_dataframe(load_data_result())
+
+
+@st.cache_resource
+def load_modele_cox():
+    # Exporté par LesDerniersFlocons_SurvivalAnalysis.ipynb
+    path = BASE_DIR / "cox_model.json"
+    return ModeleCox.from_json(path) if path.exists() else None
+
+
+@st.cache_data(max_entries=1)
+def load_features_cox(features, version=0):
+    # Moyennes annuelles par station sur la dernière année complète, comme à l'entraînement.
+    # Unités brutes (neige en cm) : pas le DataFrame compact de load_data_prophet
+    df = lire_table(source_meteo("donnees_meteo_148_stations.csv"), ["stations", "date", *features])
+    dates = pd.to_datetime(df["date"], utc=True)
+    derniere_complete = debut_annee_incomplete(dates.max()).year - 1
+    df = df[dates.dt.year == derniere_complete]
+    df_features = df.groupby("stations", observed=True)[list(features)].mean().dropna()
+    return df_features.index.to_numpy(), df_features.to_numpy(dtype=np.float64)
+
+
+# ---------------------- PRÉVISIONS ----------------------
+
+MOTEURS_PREVISION = ["Prophet", "Tendance NumPy (rapide)"]
+
+
+def ajuster_prevision(df, moteur, periods=5):
+    # Les deux moteurs exposent la même interface : fit / make_future_dataframe / predict / plot
+    if moteur == "Prophet":
+        model = Prophet(
+            yearly_seasonality=False,
+            daily_seasonality=False,
+            weekly_seasonality=False,
+            changepoint_prior_scale=1,
+            seasonality_prior_scale=10
+        )
+    else:
+        model = TrendForecaster(changepoint_prior_scale=1)
+    model.fit(df[['ds', 'y']])
+    future = model.make_future_dataframe(periods=periods, freq='YS')
+    return model, model.predict(future)
+
+
+@st.cache_resource(max_entries=256)
+def prevision_cachee(cle, moteur, _df):
+    # Une prévision par (série, moteur) : la clé contient l'empreinte de la série,
+    # donc seule une tranche dont les données ont changé est réajustée
+    return ajuster_prevision(_df, moteur)
+
+
+@st.cache_resource
+def get_cache_previsions():
+    # Partagé par toutes les sessions du processus, et entre processus via le disque
+    return ForecastCache(BASE_DIR / "cache_previsions")
+
+
+@st.cache_resource(max_entries=4)
+def ajuster_previsions_stations(_df, colonne, agg, version=0, periods=5):
+    # Moteur NumPy : toutes les stations ajustées en une seule résolution
+    df = _df[['stations', 'date', colonne]].copy()
+    df['ds'] = pd.to_datetime(df['date']).dt.tz_localize(None)
+    df = df[df['ds'] < limite_stations(version)]
+
+    df_agg = (
+        df.groupby(['stations', pd.Grouper(key='ds', freq='YS')], observed=True)[colonne]
+        .agg(agg)
+        .rename('y')
+        .reset_index()
+    )
+
+    model = TrendForecaster(changepoint_prior_scale=1).fit(df_agg, by='stations')
+    forecast = model.predict(model.make_future_dataframe(periods=periods, freq='YS'))
+    return model, forecast
+
+
+# ---------------------- CARTE DES STATIONS ----------------------
+
+# Callback JS : un marqueur par ligne [latitude, longitude, popup]
+CALLBACK_MARQUEUR = """
+function (row) {
+    var marker = L.marker(new L.LatLng(row[0], row[1]));
+    marker.bindPopup(row[2]);
+    return marker;
+}
+"""
+
+
+@st.cache_data(max_entries=1)
+def load_stations_carte(version=0):
+    # Une ligne par station : coordonnées float64 + texte du popup
+    # Utiliser df_full ici pour avoir toutes les stations
+    df_full = load_data_full(version)[0]
+    df_map = df_full.drop_duplicates(subset=['latitude', 'longitude'])
+    coords = df_map[['latitude', 'longitude']].to_numpy(dtype=np.float64)
+    popups = (
+        "Station: " + df_map['stations'].astype(str)
+        + "<br>Altitude: " + df_map['altitude'].astype(str) + "m"
+    ).to_numpy()
+    return coords, popups
+
+
+@st.cache_resource
+def build_carte_stations(mode, _coords, _popups):
+    # Construite une seule fois par mode, puis partagée entre les reruns et les sessions
+    m = folium.Map(location=[46.0, 7.5], zoom_start=8)
+
+    if mode == "clusters":
+        data = np.column_stack([_coords, _popups]).tolist()
+        FastMarkerCluster(data, callback=CALLBACK_MARQUEUR).add_to(m)
+    else:
+        for (lat, lon), popup in zip(_coords, _popups):
+            folium.Marker(
+                location=[lat, lon],
+                popup=popup,
+                icon=folium.Icon(color='blue')
+            ).add_to(m)
+
+    return m
 
 
 # ---------------------- TITRE ----------------------
 st.title("❄️ Les Derniers Flocons")
 st.markdown('<style>div.block-container{padding-top:2rem;}</style>', unsafe_allow_html=True)
 
+moteur_prevision = st.sidebar.radio(
+    "Moteur de prévision :",
+    options=MOTEURS_PREVISION,
+    key="moteur_prevision"
+)
 
-# ---------------------- TABS ----------------------
-tab_accueil, tab_apropos, tab_visualisation, tab_tendances, tab_station, tab_risque = st.tabs([
-    "🏠 Accueil",
-    "ℹ️ À Propos",
-    "📊 Visualisation des Données Météo",
-    "📈 Tendances Météorologiques",
-    "🌨️ Ma Station",
-    "🔍 Stations à Risques"
-])
 
 # ====================== ONGLET ACCUEIL ======================
-with tab_accueil:
+def onglet_accueil():
     container_accueil = st.container(border=True)
     container_accueil2 = st.container(border=True)
 
-    # Utiliser df_meteo_full ici pour avoir toutes les stations
-    df_map = df_meteo_full.drop_duplicates(subset=['latitude', 'longitude'])
-
-    # Créer la carte de base avec un centre défini et un zoom par défaut
-    m = folium.Map(location=[46.0, 7.5], zoom_start=8)
-
-    # Ajouter des marqueurs pour chaque station de ski
-    for _, row in df_map.iterrows():
-        folium.Marker(
-            location=[row['latitude'], row['longitude']],
-            popup=f"Station: {row['stations']}<br>Altitude: {row['altitude']}m",
-            icon=folium.Icon(color='blue')
-        ).add_to(m)
+    coords_stations, popups_stations = load_stations_carte(version_meteo())
 
     # Affichage du titre de la page
     container_homeTitle = st.container(border=True)
     container_homeTitle.header("🗺️ Carte des stations de ski des Alpes")
 
-    # Affichage de la carte dans Streamlit
-    st_folium(m, width=1500)
+    mode_carte = st.radio(
+        "Affichage de la carte :",
+        options=["clusters", "marqueurs"],
+        format_func=lambda x: "Regroupée (rapide)" if x == "clusters" else "Un marqueur par station",
+        horizontal=True,
+        key="mode_carte"
+    )
+
+    # Carte en cache : pas de reconstruction à chaque rerun
+    m = build_carte_stations(mode_carte, coords_stations, popups_stations)
+
+    # returned_objects=[] : zoom / déplacement ne relancent pas le script
+    st_folium(m, width=1500, returned_objects=[], key=f"carte_{mode_carte}")
 
     container_accueil2.markdown(
         "Bienvenue sur **Les Derniers Flocons**, un projet visant à fournir des "
@@ -185,7 +296,7 @@ with tab_accueil:
 
 
 # ====================== ONGLET À PROPOS ======================
-with tab_apropos:
+def onglet_apropos():
     container_apropos2 = st.container(border=True)
 
     texte_apropos = """
@@ -256,7 +367,9 @@ En éclairant les tendances climatiques locales, elle permet d’anticiper les e
 
 
 # ====================== ONGLET VISUALISATION DES DONNÉES ======================
-with tab_visualisation:
+def onglet_visualisation():
+    _, x1, y1, x2, y2, x3, y3, df_yearly, seasonal_snowfall, quad_curve, quad_curve2, quad_curve3 = load_data_full(version_meteo())
+
     # -------- Graphique 1 : Températures moyennes annuelles --------
     col_edafig1, col_edaint1 = st.columns(2)
 
@@ -358,64 +471,33 @@ en lien avec le réchauffement climatique."""
         container_int3.markdown(texte4)
 
 # ====================== ONGLET TENDANCES MÉTÉOROLOGIQUES ======================
-with tab_tendances:
+def onglet_tendances():
+    cube = load_cube_altitude(version_meteo())
+
     colv1, colv2 = st.columns(2)
     with colv1:
         st.container(border=True).subheader("📗 Historiques et prévisions neigeuses par altitude")
     with colv2:
         st.container(border=True).subheader("📘 Historiques et prévisions de températures par altitude")
 
-    # Préparation des données
-    df_selection = df_prophet.copy()
-    df_selection['ds'] = pd.to_datetime(df_selection['date']).dt.tz_localize(None)
-    df_selection = df_selection.rename(columns={'snowfall_sum': 'y'})
-    df_selection = df_selection[df_selection['ds'] < "2025-01-01"]
-
-    df_selection2 = df_prophet2.copy()
-    df_selection2['ds'] = pd.to_datetime(df_selection2['date']).dt.tz_localize(None)
-    df_selection2 = df_selection2.rename(columns={'temperature_2m_mean': 'y'})
-    df_selection2 = df_selection2[df_selection2['ds'] < "2025-01-01"]
-
-    def afficher_double_prevision(df_neige, df_temp, condition, titre_neige, titre_temp,
+    def afficher_double_prevision(altitude_min, altitude_max, titre_neige, titre_temp,
                                   interpretation_neige, interpretation_temp,
                                   ylim_neige=(1, 8), ylim_temp=(0, 12)):
 
-        # Préparation des données neige
-        df_n = df_neige[condition]
-        df_n = (
-            df_n.set_index('ds')
-            .resample('YS')
-            .agg({'y': 'mean', 'altitude': 'first'})
-            .dropna()
-            .reset_index()
-        )
+        # Séries annuelles de la tranche, lues dans le cube (pas de parcours des données journalières)
+        cle = f"{altitude_min}_{altitude_max}"
+
+        df_n = cube.serie('snowfall_sum', altitude_min, altitude_max)
         df_n['y'] *= 365  # passage en cumul annuel
 
-        # Préparation des données température
-        df_t = df_temp[condition]
-        df_t = (
-            df_t.set_index('ds')
-            .resample('YS')
-            .agg({'y': 'mean', 'altitude': 'first'})
-            .dropna()
-            .reset_index()
-        )
+        df_t = cube.serie('temperature_2m_mean', altitude_min, altitude_max)
 
         col1, col2 = st.columns(2)
 
         # -------- Neige --------
         if len(df_n) >= 3:
             with col1:
-                model_n = Prophet(
-                    yearly_seasonality=False,
-                    daily_seasonality=False,
-                    weekly_seasonality=False,
-                    changepoint_prior_scale=1,
-                    seasonality_prior_scale=10
-                )
-                model_n.fit(df_n[['ds', 'y']])
-                future_n = model_n.make_future_dataframe(5, freq='YS')
-                forecast_n = model_n.predict(future_n)
+                model_n, forecast_n = prevision_cachee(f"neige_{cle}_{empreinte_serie(df_n)}", moteur_prevision, df_n)
                 fig_n = model_n.plot(forecast_n)
                 plt.ylim(ylim_neige)
                 plt.title(titre_neige)
@@ -433,16 +515,7 @@ with tab_tendances:
         # -------- Température --------
         if len(df_t) >= 3:
             with col2:
-                model_t = Prophet(
-                    yearly_seasonality=False,
-                    daily_seasonality=False,
-                    weekly_seasonality=False,
-                    changepoint_prior_scale=1,
-                    seasonality_prior_scale=10
-                )
-                model_t.fit(df_t[['ds', 'y']])
-                future_t = model_t.make_future_dataframe(5, freq='YS')
-                forecast_t = model_t.predict(future_t)
+                model_t, forecast_t = prevision_cachee(f"temperature_{cle}_{empreinte_serie(df_t)}", moteur_prevision, df_t)
                 fig_t = model_t.plot(forecast_t)
                 fig_t.axes[0].get_lines()[0].set_color('darkorange')
                 fig_t.axes[0].collections[0].set_facecolor('moccasin')
@@ -463,8 +536,8 @@ with tab_tendances:
 
     # -------- 1. Toutes stations confondues --------
     afficher_double_prevision(
-        df_selection, df_selection2,
-        condition=slice(None),
+        altitude_min=None,
+        altitude_max=None,
         titre_neige="Prévision annuelle des chutes de neige - toutes stations",
         titre_temp="Prévision annuelle des températures moyennes - toutes stations",
         interpretation_neige="""
@@ -481,8 +554,8 @@ L’élévation de la température moyenne sur plusieurs années consécutives e
 
     # -------- 2. Altitude < 1000m --------
     afficher_double_prevision(
-        df_selection, df_selection2,
-        condition=(df_selection["altitude"] < 1000),
+        altitude_min=None,
+        altitude_max=1000,
         titre_neige="Neige annuelle - Altitude < 1000m",
         titre_temp="Températures annuelles - Altitude < 1000m",
         interpretation_neige="""
@@ -499,8 +572,8 @@ L’évolution actuelle suggère que les hivers seront de moins en moins rigoure
 
     # -------- 3. 1000m à 1300m --------
     afficher_double_prevision(
-        df_selection, df_selection2,
-        condition=(df_selection["altitude"] >= 1000) & (df_selection["altitude"] < 1300),
+        altitude_min=1000,
+        altitude_max=1300,
         titre_neige="Neige annuelle - 1000 à 1300m",
         titre_temp="Températures annuelles - 1000 à 1300m",
         interpretation_neige="""
@@ -515,8 +588,8 @@ On observe une tendance de fond à l’augmentation des températures moyennes,
 
     # -------- 4. 1300m à 1600m --------
     afficher_double_prevision(
-        df_selection, df_selection2,
-        condition=(df_selection["altitude"] >= 1300) & (df_selection["altitude"] < 1600),
+        altitude_min=1300,
+        altitude_max=1600,
         titre_neige="Neige annuelle - 1300 à 1600m",
         titre_temp="Températures annuelles - 1300 à 1600m",
         interpretation_neige="""
@@ -531,8 +604,8 @@ C’est une zone stratégique où l’adaptation est encore possible, mais qui n
 
     # -------- 5. > 1600m --------
     afficher_double_prevision(
-        df_selection, df_selection2,
-        condition=(df_selection["altitude"] >= 1600),
+        altitude_min=1600,
+        altitude_max=None,
         titre_neige="Neige annuelle - > 1600m",
         titre_temp="Températures annuelles - > 1600m",
         interpretation_neige="""
@@ -546,9 +619,39 @@ Cette altitude est cruciale pour maintenir l’activité touristique hivernale :
 """
     )
 
+    # -------- 6. Tranche personnalisée --------
+    st.container(border=True).subheader("🎚️ Tranche d'altitude personnalisée")
+    altitudes = cube.altitudes
+    alt_min, alt_max = int(np.nanmin(altitudes)), int(np.nanmax(altitudes))
+    bas, haut = st.slider(
+        "Altitude des stations (m)",
+        min_value=alt_min,
+        max_value=alt_max + 1,
+        value=(alt_min, alt_max + 1),
+        step=50,
+        key="tranche_personnalisee"
+    )
+    afficher_double_prevision(
+        altitude_min=bas,
+        altitude_max=haut,
+        titre_neige=f"Neige annuelle - {bas} à {haut}m",
+        titre_temp=f"Températures annuelles - {bas} à {haut}m",
+        interpretation_neige=f"""
+Cumul annuel moyen des chutes de neige pour les stations situées entre {bas} et {haut} mètres, et sa projection sur cinq ans.
+""",
+        interpretation_temp=f"""
+Température moyenne annuelle des stations situées entre {bas} et {haut} mètres, et sa projection sur cinq ans.
+"""
+    )
+
 
 # ====================== ONGLET MA STATION ======================
-with tab_station:
+@st.fragment
+def onglet_station():
+    version = version_meteo()
+    df_prophet = load_data_prophet(version)
+    limite = limite_stations(version)
+
     st.markdown("## 🔍 Analyse climatique par station", unsafe_allow_html=True)
 
     station_selectionnee = st.selectbox(
@@ -558,12 +661,14 @@ with tab_station:
         label_visibility="visible"
     )
 
+    cache_previsions = get_cache_previsions()
+
     if station_selectionnee:
         # --- Prévision neige ---
         df_neige_station = df_prophet[df_prophet["stations"] == station_selectionnee].copy()
         df_neige_station['ds'] = pd.to_datetime(df_neige_station['date']).dt.tz_localize(None)
         df_neige_station = df_neige_station.rename(columns={'snowfall_sum': 'y'})
-        df_neige_station = df_neige_station[df_neige_station['ds'] < "2025-01-01"]
+        df_neige_station = df_neige_station[df_neige_station['ds'] < limite]
 
         df_neige_agg = (
             df_neige_station
@@ -575,10 +680,10 @@ with tab_station:
         )
 
         # --- Prévision température ---
-        df_temp_station = df_prophet2[df_prophet2["stations"] == station_selectionnee].copy()
+        df_temp_station = df_prophet[df_prophet["stations"] == station_selectionnee].copy()
         df_temp_station['ds'] = pd.to_datetime(df_temp_station['date']).dt.tz_localize(None)
         df_temp_station = df_temp_station.rename(columns={'temperature_2m_mean': 'y'})
-        df_temp_station = df_temp_station[df_temp_station['ds'] < "2025-01-01"]
+        df_temp_station = df_temp_station[df_temp_station['ds'] < limite]
 
         df_temp_agg = (
             df_temp_station
@@ -594,17 +699,15 @@ with tab_station:
         # --- Graphique neige ---
         with col1:
             if len(df_neige_agg) >= 3:
-                model_neige = Prophet(
-                    yearly_seasonality=False,
-                    daily_seasonality=False,
-                    weekly_seasonality=False,
-                    changepoint_prior_scale=1,
-                    seasonality_prior_scale=10
-                )
-                model_neige.fit(df_neige_agg[['ds', 'y']])
-                future_neige = model_neige.make_future_dataframe(periods=5, freq='YS')
-                forecast_neige = model_neige.predict(future_neige)
-                fig_neige = model_neige.plot(forecast_neige)
+                if moteur_prevision == "Prophet":
+                    forecast_neige = cache_previsions.get_or_compute(
+                        station_selectionnee, "neige", moteur_prevision, df_neige_agg,
+                        lambda: ajuster_prevision(df_neige_agg, moteur_prevision)[1]
+                    )
+                    fig_neige = tracer_prevision(df_neige_agg, forecast_neige)
+                else:
+                    model_neige, forecast_neige = ajuster_previsions_stations(df_prophet, 'snowfall_sum', 'sum', version)
+                    fig_neige = model_neige.plot(forecast_neige, serie=station_selectionnee)
                 plt.title(f"Prévision annuelle des chutes de neige – {station_selectionnee}")
                 plt.xlabel("Année")
                 plt.ylabel("Cumul neige (m)")
@@ -616,7 +719,7 @@ with tab_station:
                     st.markdown("❓ **Interprétation :**")
                     st.markdown(f"""
 Ce graphique montre les prévisions des chutes de neige annuelles pour la station **{station_selectionnee}**.  
-Grâce aux données historiques, le modèle **Prophet** extrapole les cumuls de neige possibles jusqu’en 2029.  
+Grâce aux données historiques, le modèle **{moteur_prevision}** extrapole les cumuls de neige possibles jusqu’en 2029.  
 La tendance révélée permet d’anticiper la viabilité future de l’activité hivernale à cette altitude.  
 Une baisse progressive pourrait indiquer une vulnérabilité accrue aux effets du réchauffement climatique.
 """)
@@ -626,17 +729,15 @@ Une baisse progressive pourrait indiquer une vulnérabilité accrue aux effets d
         # --- Graphique température ---
         with col2:
             if len(df_temp_agg) >= 3:
-                model_temp = Prophet(
-                    yearly_seasonality=False,
-                    daily_seasonality=False,
-                    weekly_seasonality=False,
-                    changepoint_prior_scale=1,
-                    seasonality_prior_scale=10
-                )
-                model_temp.fit(df_temp_agg[['ds', 'y']])
-                future_temp = model_temp.make_future_dataframe(periods=5, freq='YS')
-                forecast_temp = model_temp.predict(future_temp)
-                fig_temp = model_temp.plot(forecast_temp)
+                if moteur_prevision == "Prophet":
+                    forecast_temp = cache_previsions.get_or_compute(
+                        station_selectionnee, "temperature", moteur_prevision, df_temp_agg,
+                        lambda: ajuster_prevision(df_temp_agg, moteur_prevision)[1]
+                    )
+                    fig_temp = tracer_prevision(df_temp_agg, forecast_temp)
+                else:
+                    model_temp, forecast_temp = ajuster_previsions_stations(df_prophet, 'temperature_2m_mean', 'mean', version)
+                    fig_temp = model_temp.plot(forecast_temp, serie=station_selectionnee)
                 fig_temp.axes[0].get_lines()[0].set_color('darkorange')
                 fig_temp.axes[0].collections[0].set_facecolor('moccasin')
                 plt.title(f"Prévision annuelle des températures moyennes – {station_selectionnee}")
@@ -650,18 +751,28 @@ Une baisse progressive pourrait indiquer une vulnérabilité accrue aux effets d
                     st.markdown("❓ **Interprétation :**")
                     st.markdown(f"""
 Ce graphique présente l’évolution des **températures moyennes annuelles** enregistrées à **{station_selectionnee}**.  
-Le modèle **Prophet** capte les tendances à long terme et projette leur poursuite sur les prochaines années.  
+Le modèle **{moteur_prevision}** capte les tendances à long terme et projette leur poursuite sur les prochaines années.  
 Une pente ascendante signale un réchauffement local progressif, avec des conséquences possibles sur la **durée d’enneigement**, la biodiversité et l’écosystème de montagne.  
 C’est un indicateur clé pour suivre l’impact du changement climatique station par station.
 """)
             else:
                 st.warning("Pas assez de données pour la prévision des températures.")
+
+        stats = cache_previsions.stats
+        st.caption(
+            f"Cache des prévisions : {cache_previsions.hit_rate():.0%} de succès "
+            f"({stats['hits_memoire']} mémoire, {stats['hits_disque']} disque, "
+            f"{stats['misses']} calculs, {stats['evictions']} évictions)"
+        )
     else:
         st.info("Veuillez sélectionner une station.")
 
 
 # ====================== ONGLET STATIONS À RISQUES ======================
-with tab_risque:
+@st.fragment
+def onglet_risque():
+    survie = load_survie_stations()
+
     container_analyses = st.container()
     col_analyse1, col_analyse2 = st.columns(2)
 
@@ -703,43 +814,105 @@ Les comparaisons entre stations permettent d’identifier celles qui sont les pl
         container_res1 = st.container()
         container_res1.header("🏆 Résultats")
 
-        def plot_survival_curves(df):
-            if df.empty:
-                st.write("Les données sont vides !")
-                return
-
-            fig, ax = plt.subplots(figsize=(12, 8))
-
-            for idx, row in df.iterrows():
-                survie_values = row.iloc[0:65].values[::2]
-                station_name = row['station']
-                ax.plot(survie_values, label=station_name)
+        def plot_survival_curves(noms, courbes):
+            fig, ax = tracer_courbes(noms, courbes)
 
             ax.set_title("Courbes de survie des stations", fontsize=16)
             ax.set_xlabel("Années", fontsize=12)
             ax.set_ylabel("Probabilité de survie", fontsize=12)
-            ax.legend(loc='best', bbox_to_anchor=(1, 1))
             ax.grid(True)
             plt.tight_layout()
 
             st.pyplot(fig)
 
-        def show_survival_curves(df_result):
-            if df_result.empty:
+        def show_survival_curves(survie):
+            if len(survie.stations) == 0:
                 st.write("Les données sont vides !")
                 return
 
-            station_names = df_result['station'].tolist()
             selected_stations = st.multiselect(
                 "Choisir les stations à afficher",
-                station_names
+                survie.stations.tolist()
             )
-            df_filtered = df_result[df_result['station'].isin(selected_stations)]
+            noms, courbes = survie.courbes(selected_stations)
 
-            if df_filtered.empty:
+            if len(noms) == 0:
                 st.write("Aucune station sélectionnée.")
                 return
 
-            plot_survival_curves(df_filtered)
+            plot_survival_curves(noms, courbes)
+
+        def show_top_risque(survie):
+            n_stations = len(survie.stations)
+            if n_stations == 0:
+                return
+
+            st.subheader("⚠️ Stations les plus à risque", divider="gray")
+            col_n, col_annee = st.columns(2)
+            n = col_n.number_input("Nombre de stations", min_value=1, max_value=n_stations,
+                                   value=min(10, n_stations), step=1)
+            annee = col_annee.slider("Horizon (années)", min_value=0,
+                                     max_value=survie.matrice.shape[1] - 1,
+                                     value=survie.matrice.shape[1] - 1)
+
+            noms, probas = survie.top_risque(int(n), annee)
+            st.dataframe(
+                pd.DataFrame({"Station": noms, "Probabilité de survie": probas.round(3)}),
+                hide_index=True,
+                use_container_width=True
+            )
+
+        def show_scenario_rechauffement(modele):
+            st.subheader("🌡️ Scénario de réchauffement", divider="gray")
+            if modele is None:
+                st.info("Modèle de Cox non exporté (cox_model.json absent).")
+                return
+
+            stations, X = load_features_cox(tuple(modele.features), version_meteo())
+            delta = st.slider("Réchauffement (°C)", min_value=0.0, max_value=4.0, value=1.5, step=0.5)
+            selection = st.multiselect("Stations à comparer", stations.tolist(), key="stations_scenario")
+            if not selection:
+                st.write("Aucune station sélectionnée.")
+                return
+
+            # Toutes les stations x {actuel, +delta} en une seule opération
+            annees = np.arange(survie.matrice.shape[1])
+            decalages = np.stack([np.zeros(len(modele.features)), modele.decalage_rechauffement(delta)])
+            courbes = modele.survie_scenarios(X, decalages, annees)
+
+            idx = np.flatnonzero(np.isin(stations, selection))
+            fig, ax = tracer_courbes(stations[idx], courbes[1, idx])
+            for courbe in courbes[0, idx]:
+                ax.plot(annees, courbe, ls='--', c='gray', alpha=0.6)
+
+            ax.set_title(f"Courbes de survie : actuel (pointillés) vs +{delta:.1f} °C", fontsize=16)
+            ax.set_xlabel("Années", fontsize=12)
+            ax.set_ylabel("Probabilité de survie", fontsize=12)
+            ax.grid(True)
+            plt.tight_layout()
+            st.pyplot(fig)
 
-        show_survival_curves(df_result)
+        show_survival_curves(survie)
+        show_top_risque(survie)
+        show_scenario_rechauffement(load_modele_cox())
+
+
+# ---------------------- NAVIGATION ----------------------
+# Contrairement à st.tabs, seul l'onglet affiché est exécuté à chaque rerun
+ONGLETS = {
+    "🏠 Accueil": onglet_accueil,
+    "ℹ️ À Propos": onglet_apropos,
+    "📊 Visualisation des Données Météo": onglet_visualisation,
+    "📈 Tendances Météorologiques": onglet_tendances,
+    "🌨️ Ma Station": onglet_station,
+    "🔍 Stations à Risques": onglet_risque,
+}
+
+onglet_actif = st.radio(
+    "Navigation",
+    options=list(ONGLETS),
+    horizontal=True,
+    key="onglet_actif",
+    label_visibility="collapsed"
+)
+ONGLETS[onglet_actif]()
@@ -0,0 +1,78 @@
+"""
+Serveur local imitant l'API historique Open-Meteo, pour essayer l'ingestion
+sans réseau : valeurs synthétiques déterministes, erreurs 503 / 429 injectées
+au hasard pour exercer les nouvelles tentatives. Dès que le taux d'erreur est
+non nul, les deux premières requêtes reçoivent un 429 puis un 503, quelle que
+soit la graine.
+
+Usage : python stub_open_meteo.py [--port 8080] [--taux-erreur 0.1]
+        python ingestion_meteo.py --url http://localhost:8080/v1/archive --dossier /tmp/meteo_parquet
+        python verifier_ingestion.py     (scénario complet contre ce serveur, lancé en interne)
+"""
+import time
+import random
+import argparse
+from datetime import date
+from collections import Counter
+from email.utils import formatdate
+
+import numpy as np
+import pandas as pd
+from aiohttp import web
+
+
+def reponse_archive(latitude, longitude, debut, fin, variables):
+    jours = pd.date_range(debut, fin, freq="D")
+    graine = int(abs(latitude * 1000 + longitude * 10)) % 2 ** 32
+    rng = np.random.default_rng(graine)
+    saison = np.cos(2 * np.pi * (jours.dayofyear.to_numpy() - 15) / 365.25)
+
+    daily = {"time": [j.strftime("%Y-%m-%d") for j in jours]}
+    for variable in variables:
+        if "temperature" in variable:
+            valeurs = 5 - 8 * saison + rng.normal(0, 3, len(jours))
+        else:
+            valeurs = np.clip(rng.normal(1, 2, len(jours)) + 2 * saison, 0, None)
+        daily[variable] = np.round(valeurs, 2).tolist()
+
+    return {"latitude": latitude, "longitude": longitude, "timezone": "GMT", "daily": daily}
+
+
+def creer_app(taux_erreur=0.0, compteur=None, graine=None):
+    """compteur (Counter, optionnel) : réponses servies par statut ; graine : erreurs reproductibles."""
+    compteur = compteur if compteur is not None else Counter()
+    rng = random.Random(graine)
+    forcees = iter([429, 503] if taux_erreur > 0 else [])
+
+    async def archive(request):
+        statut = next(forcees, None)
+        if statut is None and rng.random() < taux_erreur:
+            statut = rng.choice([429, 503])
+        if statut is not None:
+            compteur[statut] += 1
+            # Retry-After en secondes ou en date HTTP : les deux formes sont valides
+            retry_after = rng.choice(["0", formatdate(time.time(), usegmt=True)])
+            return web.Response(status=statut, headers={"Retry-After": retry_after} if statut == 429 else None)
+
+        q = request.query
+        try:
+            debut = date.fromisoformat(q["start_date"])
+            fin = date.fromisoformat(q["end_date"])
+            corps = reponse_archive(float(q["latitude"]), float(q["longitude"]),
+                                    debut, fin, q["daily"].split(","))
+        except (KeyError, ValueError) as erreur:
+            return web.json_response({"error": True, "reason": str(erreur)}, status=400)
+        compteur[200] += 1
+        return web.json_response(corps)
+
+    app = web.Application()
+    app.router.add_get("/v1/archive", archive)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--taux-erreur", type=float, default=0.1)
+    args = parser.parse_args()
+    web.run_app(creer_app(args.taux_erreur), port=args.port)
@@ -0,0 +1,154 @@
+"""
+Courbes de survie des stations (modèle de Cox).
+
+Les résultats de df_combined_cox_results.csv sont chargés une fois dans une
+matrice (stations x années) indexée par nom de station : sélection, tracé
+et classement des stations à risque se font sans parcourir le DataFrame.
+
+ModeleCox rejoue le modèle exporté par LesDerniersFlocons_SurvivalAnalysis.ipynb
+(cox_model.json) : S(t | x) = exp(-H0(t) . exp(x.beta)), calculé pour toutes
+les stations et tous les scénarios en une seule opération matricielle.
+"""
+import json
+
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
+
+# Colonnes de df_combined_cox_results.csv : probabilités de survie, puis 'station'
+N_COLONNES_SURVIE = 65
+PAS = 2
+
+# Au-delà, la légende n'est plus lisible
+MAX_LEGENDE = 20
+
+
+class SurvieStations:
+
+    def __init__(self, stations, matrice):
+        self.stations = np.asarray(stations)
+        self.matrice = np.asarray(matrice, dtype=np.float64)
+        self.index = {station: i for i, station in enumerate(self.stations)}
+
+    @classmethod
+    def from_dataframe(cls, df):
+        matrice = df.iloc[:, 0:N_COLONNES_SURVIE].to_numpy(dtype=np.float64)[:, ::PAS]
+        return cls(df['station'].to_numpy(), matrice)
+
+    def lignes(self, stations):
+        return np.fromiter((self.index[s] for s in stations if s in self.index), dtype=np.intp)
+
+    def courbes(self, stations):
+        """Noms et courbes (une ligne par station) des stations demandées."""
+        idx = self.lignes(stations)
+        return self.stations[idx], self.matrice[idx]
+
+    def top_risque(self, n=10, annee=None):
+        """
+        Les n stations à la plus faible probabilité de survie à l'horizon donné
+        (dernière année disponible par défaut), de la plus à la moins exposée.
+        """
+        annee = self.matrice.shape[1] - 1 if annee is None else annee
+        survie = self.matrice[:, annee]
+        n = min(n, len(survie))
+        if n == 0:
+            return self.stations[:0], survie[:0]
+
+        idx = np.argpartition(survie, n - 1)[:n]
+        idx = idx[np.argsort(survie[idx])]
+        return self.stations[idx], survie[idx]
+
+
+def tracer_courbes(noms, courbes, ax=None):
+    """Toutes les courbes en un seul LineCollection."""
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(12, 8))
+    else:
+        fig = ax.figure
+
+    annees = np.arange(courbes.shape[1])
+    segments = np.stack([np.broadcast_to(annees, courbes.shape), courbes], axis=-1)
+    couleurs = plt.cm.tab20(np.arange(len(courbes)) % 20)
+
+    ax.add_collection(LineCollection(segments, colors=couleurs, linewidths=1.5))
+    ax.set_xlim(annees[0], annees[-1])
+    ax.set_ylim(max(courbes.min() - 0.05, 0) if courbes.size else 0, 1.02)
+
+    if len(noms) <= MAX_LEGENDE:
+        poignees = [Line2D([], [], color=c) for c in couleurs]
+        ax.legend(poignees, noms, loc='best', bbox_to_anchor=(1, 1))
+
+    return fig, ax
+
+
+class ModeleCox:
+    """Coefficients, standardisation et risque cumulé de base d'un CoxPHSurvivalAnalysis."""
+
+    def __init__(self, features, coef, mean, scale, times, cum_baseline_hazard):
+        self.features = list(features)
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.scale[self.scale == 0] = 1.0
+        self.times = np.asarray(times, dtype=np.float64)
+        self.cum_baseline_hazard = np.asarray(cum_baseline_hazard, dtype=np.float64)
+
+    @classmethod
+    def from_json(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls(**json.load(f))
+
+    @classmethod
+    def from_sksurv(cls, cox, X_train):
+        """X_train : features non standardisées ayant servi à l'entraînement."""
+        return cls(
+            features=X_train.columns,
+            coef=cox.coef_,
+            mean=X_train.mean().to_numpy(),
+            scale=X_train.std(ddof=0).to_numpy(),
+            times=cox.cum_baseline_hazard_.x,
+            cum_baseline_hazard=cox.cum_baseline_hazard_.y,
+        )
+
+    def to_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'features': self.features,
+                'coef': self.coef.tolist(),
+                'mean': self.mean.tolist(),
+                'scale': self.scale.tolist(),
+                'times': self.times.tolist(),
+                'cum_baseline_hazard': self.cum_baseline_hazard.tolist(),
+            }, f)
+
+    def risque_cumule_base(self, annees):
+        """H0(t) : fonction en escalier, nulle avant le premier événement."""
+        idx = np.searchsorted(self.times, annees, side='right') - 1
+        return np.where(idx >= 0, self.cum_baseline_hazard[np.clip(idx, 0, None)], 0.0)
+
+    def scores(self, X):
+        """exp(x.beta) sur les features standardisées ; X : (..., n_features)."""
+        return np.exp(((np.asarray(X, dtype=np.float64) - self.mean) / self.scale) @ self.coef)
+
+    def survie(self, X, annees):
+        """Courbes de survie : (..., n_annees) pour X de forme (..., n_features)."""
+        h0 = self.risque_cumule_base(np.asarray(annees, dtype=np.float64))
+        return np.exp(-self.scores(X)[..., None] * h0)
+
+    def survie_scenarios(self, X, decalages, annees):
+        """
+        X : (n_stations, n_features), decalages : (n_scenarios, n_features) ajoutés
+        aux features de chaque station. Renvoie (n_scenarios, n_stations, n_annees).
+        """
+        X = np.asarray(X, dtype=np.float64)
+        decalages = np.asarray(decalages, dtype=np.float64)
+        return self.survie(X[None, :, :] + decalages[:, None, :], annees)
+
+    def decalage_rechauffement(self, delta_celsius):
+        """Scénario « +x °C » : décale les températures de l'air et du sol."""
+        decalage = np.zeros(len(self.features))
+        for i, feature in enumerate(self.features):
+            if feature.startswith(('temperature_', 'soil_temperature_')):
+                decalage[i] = delta_celsius
+        return decalage
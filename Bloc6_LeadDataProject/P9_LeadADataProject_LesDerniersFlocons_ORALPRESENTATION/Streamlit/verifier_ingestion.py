@@ -0,0 +1,164 @@
+"""
+Vérification de bout en bout de l'ingestion contre le serveur local
+(stub_open_meteo.py), sans réseau :
+
+1. ingestion de quelques stations avec des 429 / 503 injectés, interrompue
+   (tâche annulée) après quelques réponses ;
+2. reprise : les stations repartent de leur point de reprise (_etat) ;
+3. contrôle du dossier Parquet : chaque station a chaque jour une seule fois,
+   avec les valeurs servies par le stub ; points de reprise à la date de fin ;
+   journal et fichiers sur disque identiques, un seul fichier par (station, année) ;
+4. deux passages incrémentaux dans la même année : seuls les jours nouveaux
+   sont demandés, le second ajout est compacté avec le premier, et les
+   agrégats annuels restent égaux à ceux recalculés depuis les données.
+
+S'arrête sur une AssertionError au premier écart.
+
+Usage : python verifier_ingestion.py [--taux-erreur 0.2] [--graine 1]
+"""
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+from datetime import date, timedelta
+from collections import Counter
+from contextlib import suppress
+
+import numpy as np
+import pandas as pd
+from aiohttp import web
+
+from agregats import AgregatsAnnuels
+from ingestion_meteo import VARIABLES, IngestionMeteo, tranches
+from stockage_meteo import EtatIngestion
+from stub_open_meteo import creer_app, reponse_archive
+
+STATIONS = pd.DataFrame({
+    "stations": ["Val Thorens", "Les Gets", "Chamrousse"],
+    "latitude": [45.297, 46.158, 45.125],
+    "longitude": [6.580, 6.669, 5.876],
+    "altitude": [2300, 1172, 1650],
+})
+DEBUT, FIN = date(1970, 1, 1), date(1979, 12, 31)
+FINS_INCREMENTALES = [date(1980, 2, 15), date(1980, 3, 31)]
+ANNEES_PAR_REQUETE = 2
+
+
+def ingestion(dossier, url):
+    return IngestionMeteo(dossier, url=url, concurrence=2, requetes_par_seconde=0,
+                          delai_base=0.01, annees_par_requete=ANNEES_PAR_REQUETE)
+
+
+def attendu(station, debut, fin):
+    """Ce que le stub sert pour [debut, fin], découpé en tranches comme l'ingestion."""
+    parties = []
+    for a, b in tranches(debut, fin, ANNEES_PAR_REQUETE):
+        daily = reponse_archive(station.latitude, station.longitude, a, b, VARIABLES)["daily"]
+        parties.append(pd.DataFrame({"date": pd.to_datetime(daily["time"]),
+                                     **{v: np.asarray(daily[v], dtype=np.float32) for v in VARIABLES}}))
+    return pd.concat(parties, ignore_index=True)
+
+
+def verifier_dossier(dossier, troncons):
+    """troncons : [(debut, fin)] ingérés successivement, dans l'ordre."""
+    df = pd.read_parquet(dossier)
+    for station in STATIONS.itertuples(index=False):
+        lignes = df[df["stations"] == station.stations].sort_values("date").reset_index(drop=True)
+        ref = pd.concat([attendu(station, a, b) for a, b in troncons], ignore_index=True)
+        assert not lignes["date"].duplicated().any(), f"{station.stations} : jours en double"
+        assert lignes["date"].tolist() == ref["date"].tolist(), f"{station.stations} : jours manquants"
+        for variable in VARIABLES:
+            np.testing.assert_allclose(lignes[variable].to_numpy(), ref[variable].to_numpy(), rtol=1e-6,
+                                       err_msg=f"{station.stations} : {variable}")
+        assert (lignes["altitude"] == station.altitude).all()
+
+    etat = EtatIngestion(dossier)
+    fin = troncons[-1][1]
+    assert etat.toutes() == {s: fin for s in STATIONS["stations"]}, etat.toutes()
+
+    fichiers = list(Path(dossier).glob("annee=*/*.parquet"))
+    sur_disque = {str(p.relative_to(dossier)) for p in fichiers}
+    au_journal = etat.fichiers_actuels()
+    assert sur_disque == au_journal, sur_disque ^ au_journal
+    par_station_annee = Counter((p.parent.name, p.name.split("-")[0]) for p in fichiers)
+    assert set(par_station_annee.values()) == {1}, par_station_annee.most_common(3)
+    return len(df)
+
+
+def verifier_agregats(dossier):
+    """Agrégats tenus à jour fichier par fichier == agrégats recalculés depuis tout le dossier."""
+    agregats = AgregatsAnnuels(dossier)
+    df = pd.read_parquet(dossier)
+    ref = df.groupby(["stations", "altitude", df["date"].dt.year.rename("year")])[agregats.variables].agg(["sum", "count"])
+    ref.columns = [f"{variable}_{agg}" for variable, agg in ref.columns]
+    table = agregats.charger().sort_index()
+    pd.testing.assert_frame_equal(table, ref.sort_index(), check_dtype=False, rtol=1e-6)
+
+
+async def scenario(dossier, taux_erreur, graine):
+    compteur = Counter()
+    runner = web.AppRunner(creer_app(taux_erreur, compteur, graine))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/v1/archive"
+
+    try:
+        # 1. Interruption après quelques réponses
+        tache = asyncio.create_task(ingestion(dossier, url).executer(STATIONS, DEBUT, FIN))
+        while compteur[200] < 4:
+            await asyncio.sleep(0.001)
+        tache.cancel()
+        with suppress(asyncio.CancelledError):
+            await tache
+        partiel = EtatIngestion(dossier).toutes()
+        assert any(partiel.get(s) != FIN for s in STATIONS["stations"]), "interruption trop tardive"
+        print(f"interrompu : points de reprise {partiel}")
+
+        # 2. Reprise
+        reprise = ingestion(dossier, url)
+        bilan = await reprise.executer(STATIONS, DEBUT, FIN)
+        assert not [s for s, r in bilan.items() if isinstance(r, Exception)], bilan
+        # Rien n'est retéléchargé avant le point de reprise de chaque station
+        attendues = sum((FIN - partiel[s]).days if s in partiel else (FIN - DEBUT).days + 1
+                        for s in STATIONS["stations"])
+        assert reprise.stats["lignes"] == attendues, (reprise.stats, attendues)
+        n = verifier_dossier(dossier, [(DEBUT, FIN)])
+        print(f"reprise : {reprise.stats}, {n} lignes vérifiées")
+
+        # 3. Passages incrémentaux : uniquement les jours après le point de reprise
+        troncons, precedente = [(DEBUT, FIN)], FIN
+        for i, fin in enumerate(FINS_INCREMENTALES):
+            incremental = ingestion(dossier, url)
+            await incremental.executer(STATIONS, DEBUT, fin)
+            nouveaux = len(STATIONS) * (fin - precedente).days
+            assert incremental.stats["lignes"] == nouveaux, incremental.stats
+            # Le second passage ajoute un fichier à côté de celui du premier dans annee=1980
+            assert incremental.stats["compactions"] == (len(STATIONS) if i else 0), incremental.stats
+            troncons.append((precedente + timedelta(days=1), fin))
+            n = verifier_dossier(dossier, troncons)
+
+            # Le premier passage compte tout l'historique, le second seulement 1980,
+            # dont le fichier a déjà été fusionné par la compaction
+            touchees = AgregatsAnnuels(dossier).mettre_a_jour()
+            premiere = precedente.year if i else DEBUT.year
+            assert len(touchees) == len(STATIONS) * (fin.year - premiere + 1), touchees
+            verifier_agregats(dossier)
+            print(f"incrémental jusqu'au {fin} : {incremental.stats}, {n} lignes vérifiées")
+            precedente = fin
+    finally:
+        await runner.cleanup()
+
+    # Le stub force un 429 puis un 503 sur les deux premières requêtes
+    assert taux_erreur == 0 or (compteur[429] and compteur[503]), f"erreurs injectées : {compteur}"
+    print(f"stub : {compteur[200]} réponses 200, {compteur[429]} x 429, {compteur[503]} x 503 — OK")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--taux-erreur", type=float, default=0.2)
+    parser.add_argument("--graine", type=int, default=1, help="erreurs injectées par le stub au-delà du premier 429 et du premier 503")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as dossier:
+        asyncio.run(scenario(dossier, args.taux_erreur, args.graine))